@@ -0,0 +1,30 @@
+"""Synthetic movie catalogs for the benchmarks."""
+import random
+
+from movies.domain.model import Actor, Director, Genre, Movie
+
+GENRES = ['Action', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 'Drama', 'Family', 'Fantasy', 'History',
+          'Horror', 'Music', 'Musical', 'Mystery', 'Romance', 'Sci-Fi', 'Sport', 'Thriller', 'War', 'Western']
+
+
+def synthetic_movies(size, seed=235):
+    # Movies are generated in id (ranking) order with sorted titles, like a catalog loaded from a ranked data file.
+    rng = random.Random(seed)
+    number_of_actors = max(size // 2, 1)
+    number_of_directors = max(size // 5, 1)
+
+    for i in range(size):
+        movie = Movie(f'Movie {i:08d}', 1950 + rng.randrange(70))
+        movie.add_id(i + 1)
+        movie.description = f'Synthetic movie number {i}.'
+        movie.runtime_minutes = rng.randint(70, 200)
+        movie.rating = round(rng.uniform(1, 9.5), 1)
+        movie.votes = int(rng.paretovariate(1) * 1000)
+        movie.revenue_millions = round(rng.uniform(0, 900), 2) if rng.random() < 0.85 else None
+        movie.metascore = rng.randint(10, 100) if rng.random() < 0.9 else None
+        for genre in rng.sample(GENRES, rng.randint(1, 3)):
+            movie.add_genre(Genre(genre))
+        movie.add_director(Director(f'Director {rng.randrange(number_of_directors):08d}'))
+        for _ in range(4):
+            movie.add_actor(Actor(f'Actor {rng.randrange(number_of_actors):08d}'))
+        yield movie
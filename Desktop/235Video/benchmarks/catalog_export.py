@@ -0,0 +1,62 @@
+"""Compare reading the catalog through the JSON API, as a streamed NDJSON export and a page at a time, with scraping it
+from the ranking pages, and report the time and the peak memory allocated while reading it.
+
+Run from the project directory:
+
+    $ python -m benchmarks.catalog_export
+"""
+import time
+import tracemalloc
+
+from benchmarks.home_page import DATA_PATH
+from movies import create_app
+
+
+def export(client):
+    # Reads the response a chunk at a time, as a downstream job would, rather than buffering it.
+    response = client.get('/api/export/movies.ndjson')
+    lines = sum(chunk.count(b'\n') for chunk in response.response)
+    response.close()
+    return lines
+
+
+def api_pages(client):
+    movies = 0
+    url = '/api/movies?limit=100'
+    while url is not None:
+        page = client.get(url).json
+        movies += len(page['movies'])
+        url = page['links']['next']
+    return movies
+
+
+def scrape(client):
+    movies = 0
+    for page in range(1, 101):
+        movies += client.get(f'/movies_by_ranking?page={page}&per_page=10').data.count(b'<movie ')
+    return movies
+
+
+def measure(function, client):
+    tracemalloc.start()
+    start = time.perf_counter()
+    movies = function(client)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return movies, seconds, peak
+
+
+def main():
+    app = create_app({'TESTING': True, 'TEST_DATA_PATH': DATA_PATH})
+    client = app.test_client()
+
+    for name, function in [('NDJSON export', export), ('API pages of 100', api_pages),
+                           ('ranking pages of 10', scrape)]:
+        function(client)
+        movies, seconds, peak = measure(function, client)
+        print(f'{name:24} {movies:6} movies {seconds * 1000:9.1f} ms  peak {peak / 2 ** 20:6.2f} MiB')
+
+
+if __name__ == '__main__':
+    main()
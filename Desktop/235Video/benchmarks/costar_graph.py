@@ -0,0 +1,70 @@
+"""Measure building the co-star graph from the movies in the data file, and the time of its queries: an actor's
+co-stars, their top collaborators, whether two actors worked together, and degrees of separation between pairs of
+actors, checked against a plain one-ended breadth first search.
+
+Run from the project directory:
+
+    $ python -m benchmarks.costar_graph [pairs]
+"""
+import os
+import random
+import sys
+import time
+from collections import deque
+
+from movies.adapters.costar_graph import CostarGraph
+from movies.adapters.memory_repository import MemoryRepository, load_movies_and_tags
+from movies.showcase.services import get_casts
+
+DATA_PATH = os.path.join('movies', 'adapters', 'data')
+
+
+def one_ended_degrees(graph, name, other_name):
+    # The length of the shortest chain by a breadth first search from one end only.
+    distances = {name: 0}
+    queue = deque([name])
+    while queue:
+        actor = queue.popleft()
+        if actor == other_name:
+            return distances[actor]
+        for costar, _ in graph.costars(actor):
+            if costar not in distances:
+                distances[costar] = distances[actor] + 1
+                queue.append(costar)
+    return None
+
+
+def timed(function, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        function()
+    return (time.perf_counter() - start) / count
+
+
+def main(pairs):
+    repo = MemoryRepository()
+    load_movies_and_tags(DATA_PATH, repo)
+
+    start = time.perf_counter()
+    graph = CostarGraph(get_casts(repo))
+    print(f'build: {graph.number_of_actors} actors, {graph.number_of_pairs} co-star pairs in '
+          f'{(time.perf_counter() - start) * 1000:.1f} ms')
+
+    names = [actor.actor_full_name for actor in repo.get_actors()]
+    random.seed(42)
+    samples = [(random.choice(names), random.choice(names)) for _ in range(pairs)]
+
+    for name, other_name in samples:
+        path = graph.path(name, other_name)
+        assert (None if path is None else len(path) - 1) == one_ended_degrees(graph, name, other_name)
+
+    print(f'costars            {timed(lambda: graph.costars("Chris Pratt"), 1000) * 1e6:9.1f} us')
+    print(f'top 5 costars      {timed(lambda: graph.costars("Chris Pratt", 5), 1000) * 1e6:9.1f} us')
+    print(f'worked_with        {timed(lambda: graph.worked_with("Chris Pratt", "Zoe Saldana"), 1000) * 1e6:9.1f} us')
+    print(f'path (two-ended)   {timed(lambda: [graph.path(*pair) for pair in samples], 1) / pairs * 1e6:9.1f} us')
+    print(f'path (one-ended)   '
+          f'{timed(lambda: [one_ended_degrees(graph, *pair) for pair in samples], 1) / pairs * 1e6:9.1f} us')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,61 @@
+"""Measure the memory held per movie by the domain model, with entities shared through an EntityRegistry and with a
+fresh Actor, Director and Genre for every occurrence.
+
+Run from the project directory:
+
+    $ python -m benchmarks.domain_memory [size ...]
+"""
+import gc
+import random
+import sys
+import tracemalloc
+
+from benchmarks.catalog import GENRES
+from movies.adapters.ingestion import rows_to_movies
+from movies.domain.model import Actor, Director, EntityRegistry, Genre
+
+CHUNK_SIZE = 10000
+
+
+class PerOccurrence:
+    """ Stands in for an EntityRegistry but creates a new entity every time, as the original loader did. """
+
+    actor = staticmethod(Actor)
+    director = staticmethod(Director)
+    genre = staticmethod(Genre)
+
+
+def synthetic_rows(first, last, rng):
+    # Rows as parsed from the data file, with freshly created strings for every field.
+    number_of_actors = max(last // 2, 1)
+    number_of_directors = max(last // 5, 1)
+    return [(i + 1, f'Movie {i:08d}', 1950 + rng.randrange(70), f'Synthetic movie number {i}.',
+             [''.join(genre) for genre in rng.sample(GENRES, rng.randint(1, 3))],  # Copies of the genre names.
+             f'Director {rng.randrange(number_of_directors):08d}',
+             [f'Actor {rng.randrange(number_of_actors):08d}' for _ in range(4)],
+             (rng.randint(70, 200), 7.0, 1000, 50.0, 60))
+            for i in range(first, last)]
+
+
+def bytes_per_movie(size, registry):
+    rng = random.Random(235)
+    gc.collect()
+    tracemalloc.start()
+    movies = list()
+    for first in range(0, size, CHUNK_SIZE):
+        movies.extend(rows_to_movies(synthetic_rows(first, min(first + CHUNK_SIZE, size), rng), registry))
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return memory / size
+
+
+def main(size):
+    print(f'{size} movies')
+    print(f'  shared entities          {bytes_per_movie(size, EntityRegistry()):8.0f} bytes/movie')
+    print(f'  entity per occurrence    {bytes_per_movie(size, PerOccurrence()):8.0f} bytes/movie')
+
+
+if __name__ == '__main__':
+    for size in [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]:
+        main(size)
@@ -0,0 +1,42 @@
+"""Measure per-request latency of the home page.
+
+Run from the project directory:
+
+    $ python -m benchmarks.home_page
+"""
+import os
+import statistics
+import time
+
+from movies import create_app
+
+DATA_PATH = os.path.join('movies', 'adapters', 'data')
+
+
+def time_requests(client, url, requests):
+    timings = list()
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    return timings
+
+
+def main(requests=200):
+    app = create_app({'TESTING': True, 'TEST_DATA_PATH': DATA_PATH})
+    client = app.test_client()
+
+    # Warm up Jinja's template cache before measuring.
+    time_requests(client, '/', 5)
+    timings = time_requests(client, '/', requests)
+
+    timings.sort()
+    print(f'GET / x {requests}')
+    print(f'  mean   {statistics.mean(timings) * 1000:8.3f} ms')
+    print(f'  median {statistics.median(timings) * 1000:8.3f} ms')
+    print(f'  p99    {timings[int(len(timings) * 0.99) - 1] * 1000:8.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
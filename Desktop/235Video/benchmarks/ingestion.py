@@ -0,0 +1,55 @@
+"""Measure CSV ingestion rates for synthetic catalogs, parsing in-process and in a process pool.
+
+Run from the project directory:
+
+    $ python -m benchmarks.ingestion [size ...]
+"""
+import csv
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.catalog import synthetic_movies
+from movies.adapters.ingestion import ingest_movies, parse_movie_blocks
+from movies.adapters.memory_repository import MemoryRepository
+
+HEADER = ['Rank', 'Title', 'Genre', 'Description', 'Director', 'Actors', 'Year', 'Runtime (Minutes)', 'Rating',
+          'Votes', 'Revenue (Millions)', 'Metascore']
+
+
+def write_catalog(filename, size):
+    with open(filename, 'w', encoding='utf-8', newline='') as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(HEADER)
+        for movie in synthetic_movies(size):
+            writer.writerow([
+                movie.id, movie.title, ','.join(genre.genre_name for genre in movie.genres), movie.description,
+                movie.director.director_full_name, ', '.join(actor.actor_full_name for actor in movie.actors),
+                movie.release_year, movie.runtime_minutes, movie.rating, movie.votes,
+                'N/A' if movie.revenue_millions is None else movie.revenue_millions,
+                'N/A' if movie.metascore is None else movie.metascore])
+
+
+def parse_only(filename, workers):
+    start = time.perf_counter()
+    rows = sum(len(parsed_rows) for parsed_rows in parse_movie_blocks(filename, workers))
+    return rows / (time.perf_counter() - start)
+
+
+def main(size):
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'movies.csv')
+        write_catalog(filename, size)
+
+        print(f'{size} rows, {os.cpu_count()} CPUs')
+        print(f'  parse, in-process   {parse_only(filename, 1):12,.0f} rows/s')
+        print(f'  parse, process pool {parse_only(filename, None):12,.0f} rows/s')
+        for workers, label in [(1, 'in-process'), (None, 'process pool')]:
+            stats = ingest_movies(filename, MemoryRepository(), workers)
+            print(f'  load, {label:<13} {stats.rows_per_second:12,.0f} rows/s  ({stats.seconds:.2f} s)')
+
+
+if __name__ == '__main__':
+    for size in [int(arg) for arg in sys.argv[1:]] or [1000, 100000, 1000000]:
+        main(size)
@@ -0,0 +1,38 @@
+"""Measure sorting and filtering movie ids by numeric attributes, from the attribute columns and from Movie objects.
+
+Run from the project directory:
+
+    $ python -m benchmarks.movie_attributes [size ...]
+"""
+import sys
+import time
+
+from benchmarks.catalog import synthetic_movies
+from movies.adapters.memory_repository import MemoryRepository
+
+
+def timed(label, function, repetitions=10):
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        result = function()
+    elapsed = (time.perf_counter() - start) / repetitions
+    print(f'  {label:<44} {elapsed * 1000:8.2f} ms  ({len(result)} movies)')
+
+
+def main(size):
+    repo = MemoryRepository()
+    repo.add_movies(list(synthetic_movies(size)))
+    movie_ids = repo.get_movie_ids_for_genre('Drama')
+    print(f'{size} movies, {len(movie_ids)} dramas')
+
+    timed('sort dramas by votes, columns', lambda: repo.sort_movie_ids(movie_ids, 'votes'))
+    timed('sort dramas by votes, Movie objects',
+          lambda: sorted(repo.get_movies_by_id(movie_ids), key=lambda movie: movie.votes, reverse=True))
+    timed('dramas rated 8+, columns', lambda: list(repo.filter_movie_ids(movie_ids, 'rating', 8)))
+    timed('dramas rated 8+, Movie objects',
+          lambda: [movie for movie in repo.get_movies_by_id(movie_ids) if movie.rating >= 8])
+
+
+if __name__ == '__main__':
+    for size in [int(arg) for arg in sys.argv[1:]] or [100000]:
+        main(size)
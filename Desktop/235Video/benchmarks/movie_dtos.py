@@ -0,0 +1,40 @@
+"""Measure the cost of converting a page of movies with many reviews to dicts, as the showcase views do.
+
+Run from the project directory:
+
+    $ python -m benchmarks.movie_dtos [reviews ...]
+"""
+import sys
+import time
+
+import movies.showcase.services as services
+from benchmarks.catalog import synthetic_movies
+from movies.adapters.memory_repository import MemoryRepository
+from movies.domain.model import User, make_review
+
+
+def main(reviews_per_movie, requests=1000):
+    repo = MemoryRepository()
+    repo.add_movies(list(synthetic_movies(3)))
+    user = User('reviewer', 'password')
+    repo.add_user(user)
+    start = time.perf_counter()
+    for movie in repo.get_movies_by_id([1, 2, 3]):
+        for i in range(reviews_per_movie):
+            repo.add_review(make_review(f'Review {i}', user, movie))
+    adding = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        # A listing page shows each movie's review count, and one page of reviews for the movie being viewed.
+        movies = services.get_movies_by_id([1, 2, 3], repo)
+        len(movies[0]['reviews'])
+        movies[1]['reviews'].page()
+    elapsed = time.perf_counter() - start
+    print(f'  3 movies x {reviews_per_movie:>6} reviews  {elapsed / requests * 1e6:10.1f} us/page  '
+          f'{adding / max(3 * reviews_per_movie, 1) * 1e6:8.1f} us/review added')
+
+
+if __name__ == '__main__':
+    for reviews in [int(arg) for arg in sys.argv[1:]] or [0, 100, 10000, 100000]:
+        main(reviews)
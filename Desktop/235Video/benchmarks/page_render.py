@@ -0,0 +1,77 @@
+"""Measure per-request latency of the listing pages with and without the rendered-fragment and page caches, and of
+conditional GETs answered with 304 Not Modified.
+
+Run from the project directory:
+
+    $ python -m benchmarks.page_render
+"""
+import statistics
+import time
+
+import movies.utilities.utilities as utilities
+from benchmarks.home_page import DATA_PATH, time_requests
+from movies import create_app
+
+URLS = [
+    '/',
+    '/movies_by_ranking?id=1',
+    '/movies_by_genre?genre=Action',
+    '/movies_by_actor?actor=Chris+Pratt',
+    '/movies_by_genre?genre=Drama&after=990',
+    '/movies_by_genre?genre=Drama&sort=rating&cursor=510',
+    '/movies_by_year?decade=2010&cursor=900',
+]
+
+
+def time_conditional_requests(client, url, requests):
+    etag = client.get(url).headers['ETag']
+    timings = list()
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(url, headers={'If-None-Match': etag})
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 304
+    return timings
+
+
+def main(requests=200):
+    app = create_app({'TESTING': True, 'TEST_DATA_PATH': DATA_PATH})
+    client = app.test_client()
+    with app.test_request_context():
+        fragment_cache = utilities.get_fragment_cache()
+        page_cache = utilities.get_page_cache()
+
+    for label, fragment_bytes, page_bytes in [('uncached', 0, 0),
+                                              ('fragments cached', utilities.FRAGMENT_CACHE_BYTES, 0),
+                                              ('fragments and pages cached', utilities.FRAGMENT_CACHE_BYTES,
+                                               utilities.PAGE_CACHE_BYTES)]:
+        for cache, max_bytes in [(fragment_cache, fragment_bytes), (page_cache, page_bytes)]:
+            cache.clear()
+            cache.max_bytes = max_bytes
+        before = fragment_cache.stats()
+
+        print(label)
+        for url in URLS:
+            # Warm up Jinja's template cache (and the caches) before measuring.
+            time_requests(client, url, 5)
+            timings = sorted(time_requests(client, url, requests))
+            print(f'  GET {url:<52} median {statistics.median(timings) * 1000:8.3f} ms  '
+                  f'p99 {timings[int(len(timings) * 0.99) - 1] * 1000:8.3f} ms')
+
+        if label == 'fragments cached':
+            # Counters are cumulative, so report this pass as the difference from before it.
+            stats = fragment_cache.stats()
+            hits = stats['hits'] - before['hits']
+            lookups = hits + stats['misses'] - before['misses']
+            saved = stats['bytes_saved'] - before['bytes_saved']
+            print(f'  fragment hit rate {hits / lookups:.1%}, {saved / 2 ** 20:.1f} MiB of rendering saved, '
+                  f'{stats["bytes"] / 2 ** 10:.1f} KiB cached')
+
+    print('conditional GET, If-None-Match')
+    for url in URLS[1:]:
+        timings = time_conditional_requests(client, url, requests)
+        print(f'  GET {url:<52} median {statistics.median(timings) * 1000:8.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
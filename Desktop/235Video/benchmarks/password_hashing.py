@@ -0,0 +1,47 @@
+"""Measure password hashing under a burst of concurrent logins: hashes on the request threads, and in a bounded pool of
+worker processes, with the throughput, the latency of each login and the peak queue depth.
+
+Run from the project directory:
+
+    $ python -m benchmarks.password_hashing [logins] [concurrency]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from movies.authentication.hashing import DEFAULT_ITERATIONS, HashingBusyException, PasswordHasher
+
+
+def login(hasher, password_hash):
+    start = time.perf_counter()
+    try:
+        hasher.check(password_hash, 'Abcd1234')
+    except HashingBusyException:
+        return None
+    return time.perf_counter() - start
+
+
+def main(count, concurrency):
+    print(f'{count} logins from {concurrency} threads, {DEFAULT_ITERATIONS} iterations, {os.cpu_count()} CPUs')
+    for workers in sorted({0, 2, os.cpu_count()}):
+        hasher = PasswordHasher(workers=workers, max_pending=4 * max(workers, 1), wait=30)
+        password_hash = hasher.hash('Abcd1234')
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as threads:
+                timings = list(threads.map(lambda _: login(hasher, password_hash), range(count)))
+            seconds = time.perf_counter() - start
+        finally:
+            hasher.close()
+
+        completed = sorted(timing for timing in timings if timing is not None)
+        stats = hasher.stats()
+        print(f'  {workers} workers: {len(completed) / seconds:8,.1f} logins/s, '
+              f'p50 {completed[len(completed) // 2] * 1000:7.1f} ms, '
+              f'p99 {completed[int(len(completed) * 0.99)] * 1000:7.1f} ms, '
+              f'peak queue {stats["peak_pending"]}/{stats["max_pending"]}, rejected {stats["rejected"]}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 32)
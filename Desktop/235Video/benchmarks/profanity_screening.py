@@ -0,0 +1,84 @@
+"""Measure review screening throughput: better_profanity, the compiled matcher one review and one batch at a time, and
+publishing reviews with synchronous screening and through the moderation queue.
+
+Reviews are made from the movie descriptions in the data file, with a swear word in one review in twenty. Run from the
+project directory:
+
+    $ python -m benchmarks.profanity_screening [reviews]
+"""
+import os
+import random
+import sys
+import time
+
+import movies.showcase.services as services
+from better_profanity import profanity
+from movies.adapters.memory_repository import MemoryRepository, populate
+from movies.domain.model import User
+from movies.showcase.moderation import BATCH_SIZE, ModerationQueue
+from movies.utilities.profanity_filter import get_matcher
+
+DATA_PATH = os.path.join('movies', 'adapters', 'data')
+
+
+def make_reviews(repo, count, seed=235):
+    rng = random.Random(seed)
+    descriptions = [movie.description for movie in repo.get_movies_by_id(range(1, 1001))]
+    reviews = list()
+    for _ in range(count):
+        review = ' '.join(rng.sample(descriptions, 2))
+        if rng.random() < 0.05:
+            review += ' Total bullshit.'
+        reviews.append(review)
+    return reviews
+
+
+def report(label, count, seconds):
+    print(f'  {label:<40} {count / seconds:12,.0f} reviews/s')
+
+
+def main(count):
+    repo = MemoryRepository()
+    populate(DATA_PATH, repo)
+    repo.add_user(User('reviewer', 'password'))
+    reviews = make_reviews(repo, count)
+    matcher = get_matcher()
+    print(f'{count} reviews, {os.cpu_count()} CPUs')
+
+    start = time.perf_counter()
+    for review in reviews[:count // 10]:
+        profanity.contains_profanity(review)
+    report('screen, better_profanity', count // 10, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for review in reviews:
+        matcher.contains_profanity(review)
+    report('screen, matcher', count, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(0, count, BATCH_SIZE):
+        matcher.screen(reviews[i:i + BATCH_SIZE])
+    report(f'screen, matcher in batches of {BATCH_SIZE}', count, time.perf_counter() - start)
+
+    def publish(movie_id, review_text, username):
+        services.add_review(movie_id, review_text, username, repo)
+
+    start = time.perf_counter()
+    for i, review in enumerate(reviews):
+        if not matcher.contains_profanity(review):
+            publish(i % 1000 + 1, review, 'reviewer')
+    report('publish, screened on submission', count, time.perf_counter() - start)
+
+    for workers in sorted({1, os.cpu_count()}):
+        moderation_queue = ModerationQueue(publish, workers)
+        start = time.perf_counter()
+        for i, review in enumerate(reviews):
+            moderation_queue.submit(i % 1000 + 1, review, 'reviewer')
+        submitted = time.perf_counter() - start
+        moderation_queue.join()
+        report(f'submit, queued ({workers} workers)', count, submitted)
+        report(f'publish, queued ({workers} workers)', count, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
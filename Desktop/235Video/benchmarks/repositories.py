@@ -0,0 +1,119 @@
+"""Compare MemoryRepository and SqliteRepository method by method, on the movies in the data file with a batch of users
+and reviews, and report the time per call of each AbstractRepository method.
+
+Run from the project directory:
+
+    $ python -m benchmarks.repositories [calls]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from movies.adapters import sqlite_repository
+from movies.adapters.memory_repository import MemoryRepository, load_movies_and_tags
+from movies.adapters.sqlite_repository import SqliteRepository
+from movies.domain.model import Movie, User, make_review
+
+DATA_PATH = os.path.join('movies', 'adapters', 'data')
+USERS = 100
+REVIEWS = 5000
+BATCH_SIZE = 500
+
+
+def calls(repo):
+    # One representative call of each AbstractRepository method, by name.
+    movie = repo.get_movie(500)
+    page_ids = list(range(1, 1001))
+    return [
+        ('get_user', lambda: repo.get_user('user42')),
+        ('get_movie', lambda: repo.get_movie(500)),
+        ('get_movies_by_release_year', lambda: repo.get_movies_by_release_year(2016)),
+        ('get_movie_ids_for_release_year', lambda: repo.get_movie_ids_for_release_year(2016)),
+        ('get_movies_by_year_range (page of 10)', lambda: repo.get_movies_by_year_range(2010, 2019, 10, 200)),
+        ('count_movies_by_year_range', lambda: repo.count_movies_by_year_range(2010, 2019)),
+        ('get_number_of_movies', lambda: repo.get_number_of_movies()),
+        ('get_first_movie', lambda: repo.get_first_movie()),
+        ('get_last_movie', lambda: repo.get_last_movie()),
+        ('get_movies_by_id (page of 10)', lambda: repo.get_movies_by_id(range(100, 110))),
+        ('get_movie_ids_for_actor', lambda: repo.get_movie_ids_for_actor('Chris Pratt')),
+        ('get_movie_ids_for_director', lambda: repo.get_movie_ids_for_director('Ridley Scott')),
+        ('get_movie_ids_for_genre', lambda: repo.get_movie_ids_for_genre('Drama')),
+        ('sort_movie_ids (1000 ids)', lambda: repo.sort_movie_ids(page_ids, 'rating')),
+        ('filter_movie_ids (1000 ids)', lambda: list(repo.filter_movie_ids(page_ids, 'rating', 7))),
+        ('get_id_of_previous_movie', lambda: repo.get_id_of_previous_movie(movie)),
+        ('get_id_of_next_movie', lambda: repo.get_id_of_next_movie(movie)),
+        ('get_rank_index (page of 10 by rating)', lambda: repo.get_rank_index('rating').page(50, 10)),
+        ('get_actors', lambda: repo.get_actors()),
+        ('get_genres', lambda: repo.get_genres()),
+        ('get_directors', lambda: repo.get_directors()),
+        ('get_name_completions', lambda: repo.get_name_completions('chr')),
+        ('search_movie_ids_by_text', lambda: repo.search_movie_ids_by_text('space adventure')),
+        ('get_catalog_version', lambda: repo.get_catalog_version()),
+        ('get_entity_version', lambda: repo.get_entity_version()),
+        ('get_review_version', lambda: repo.get_review_version()),
+        ('get_review', lambda: repo.get_review(REVIEWS // 2)),
+        ('get_reviews_for_movie (page of 10)', lambda: repo.get_reviews_for_movie(7, 10, after=REVIEWS // 2)),
+        ('get_reviews_for_user (page of 10)', lambda: repo.get_reviews_for_user('user42', 10)),
+        ('count_reviews_for_movie', lambda: repo.count_reviews_for_movie(7)),
+        ('count_reviews_for_user', lambda: repo.count_reviews_for_user('user42')),
+    ]
+
+
+def fill(repo):
+    # Loads the catalog, users and reviews, and returns the time each took per item.
+    start = time.perf_counter()
+    if isinstance(repo, SqliteRepository):
+        sqlite_repository.populate(DATA_PATH, repo)
+    else:
+        load_movies_and_tags(DATA_PATH, repo)
+    loading = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(USERS):
+        repo.add_user(User(f'user{i}', 'password'))
+    adding_users = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(REVIEWS):
+        repo.add_review(make_review(f'Review {i}', repo.get_user(f'user{i % USERS}'), repo.get_movie(i % 50 + 1)))
+    adding_reviews = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for batch in range(0, REVIEWS, BATCH_SIZE):
+        repo.add_reviews([make_review(f'Review {i}', repo.get_user(f'user{i % USERS}'), repo.get_movie(i % 50 + 1))
+                          for i in range(batch, batch + BATCH_SIZE)])
+    adding_review_batches = time.perf_counter() - start
+
+    start = time.perf_counter()
+    repo.add_movie(Movie('One More', 2020))
+    adding_movie = time.perf_counter() - start
+
+    return [('load catalog', loading, repo.get_number_of_movies()), ('add_user', adding_users, USERS),
+            ('add_review', adding_reviews, REVIEWS),
+            (f'add_reviews (batches of {BATCH_SIZE})', adding_review_batches, REVIEWS),
+            ('add_movie', adding_movie, 1)]
+
+
+def timed(function, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        function()
+    return (time.perf_counter() - start) / count
+
+
+def main(count):
+    with tempfile.TemporaryDirectory() as directory:
+        memory_repo = MemoryRepository()
+        sqlite_repo = SqliteRepository(os.path.join(directory, 'movies.sqlite3'))
+        print(f'{"":40} {"memory":>12} {"sqlite":>12}')
+        for (name, memory_seconds, items), (_, sqlite_seconds, _) in zip(fill(memory_repo), fill(sqlite_repo)):
+            print(f'{name:40} {memory_seconds / items * 1e6:9.1f} us {sqlite_seconds / items * 1e6:9.1f} us')
+
+        for (name, memory_call), (_, sqlite_call) in zip(calls(memory_repo), calls(sqlite_repo)):
+            print(f'{name:40} {timed(memory_call, count) * 1e6:9.1f} us {timed(sqlite_call, count) * 1e6:9.1f} us')
+        sqlite_repo.close()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
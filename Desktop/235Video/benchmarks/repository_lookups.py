@@ -0,0 +1,48 @@
+"""Measure MemoryRepository load and name-lookup times for large synthetic catalogs.
+
+Run from the project directory:
+
+    $ python -m benchmarks.repository_lookups [size ...]
+"""
+import random
+import sys
+import time
+
+from benchmarks.catalog import synthetic_movies
+from movies.adapters.memory_repository import MemoryRepository
+from movies.domain.model import User
+
+
+def timed(label, function, operations):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f'  {label:<28} {elapsed:8.3f} s  {elapsed / operations * 1e6:8.3f} us/op')
+
+
+def main(size):
+    print(f'{size} movies, {size} users')
+    repo = MemoryRepository()
+    movies = list(synthetic_movies(size))
+    users = [User(f'user{i}', 'password') for i in range(size)]
+
+    def load():
+        for movie in movies:
+            repo.add_movie(movie)
+        for user in users:
+            repo.add_user(user)
+
+    timed('load', load, 2 * size)
+
+    lookups = 100000
+    user_names = [f'USER{random.randrange(size)}' for _ in range(lookups)]
+    actor_names = [f'actor {random.randrange(size // 2):08d}' for _ in range(lookups)]
+
+    timed('get_user', lambda: [repo.get_user(name) for name in user_names], lookups)
+    timed('get_movie_ids_for_actor', lambda: [repo.get_movie_ids_for_actor(name) for name in actor_names], lookups)
+    timed('genre page slice', lambda: [repo.get_movie_ids_for_genre('sci-fi')[-3:] for _ in range(lookups)], lookups)
+
+
+if __name__ == '__main__':
+    for size in [int(arg) for arg in sys.argv[1:]] or [1000, 100000]:
+        main(size)
@@ -0,0 +1,39 @@
+"""Measure multi-criteria query latency over a synthetic catalog.
+
+Run from the project directory:
+
+    $ python -m benchmarks.search_engine [size]
+"""
+import sys
+import time
+
+from benchmarks.catalog import synthetic_movies
+from movies.adapters.memory_repository import MemoryRepository
+from movies.search.services import search_movies
+
+QUERIES = [
+    'genre=Sci-Fi AND director=Director 00000042 AND year=2010-2016',
+    'genre=Sci-Fi AND genre=Drama AND year=2010-2016',
+    'genre=Drama AND year=2012',
+    'genre=Comedy AND genre=Romance',
+    'actor=Actor 00000007 OR actor=Actor 00000011 OR director=Director 00000003',
+    'year=1990-1999',
+]
+
+
+def main(size=100000, repetitions=1000):
+    repo = MemoryRepository()
+    for movie in synthetic_movies(size):
+        repo.add_movie(movie)
+
+    print(f'{size} movies, first page of 10 results')
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            movie_ids, has_next_page = search_movies(query, repo)
+        elapsed = (time.perf_counter() - start) / repetitions
+        print(f'  {elapsed * 1000:7.3f} ms  {len(movie_ids):2d} results  {query}')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
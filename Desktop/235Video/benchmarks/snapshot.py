@@ -0,0 +1,47 @@
+"""Compare startup time and peak RSS when populating from the CSV file and from a snapshot.
+
+Each measurement runs in a fresh Python process, as a new gunicorn worker would. Run from the project directory:
+
+    $ python -m benchmarks.snapshot [size ...]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.ingestion import write_catalog
+from movies.adapters.memory_repository import MemoryRepository, populate, snapshot_filename
+
+CHILD = """
+import resource, sys, time
+from movies.adapters.memory_repository import MemoryRepository, populate
+start = time.perf_counter()
+populate(sys.argv[1], MemoryRepository())
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def start_up(data_path):
+    output = subprocess.run([sys.executable, '-c', CHILD, data_path], check=True, capture_output=True, text=True)
+    seconds, max_rss_kib = output.stdout.split()
+    return float(seconds), int(max_rss_kib) / 1024
+
+
+def main(size):
+    with tempfile.TemporaryDirectory() as directory:
+        write_catalog(os.path.join(directory, 'Data1000Movies.csv'), size)
+        csv_seconds, csv_rss = start_up(directory)
+
+        repo = MemoryRepository()
+        populate(directory, repo)
+        repo.write_snapshot(snapshot_filename(directory))
+        snapshot_seconds, snapshot_rss = start_up(directory)
+
+        print(f'{size} movies, {os.path.getsize(snapshot_filename(directory)) / 2 ** 20:.1f} MiB snapshot')
+        print(f'  csv       {csv_seconds:8.2f} s  {csv_rss:8.1f} MiB peak RSS')
+        print(f'  snapshot  {snapshot_seconds:8.2f} s  {snapshot_rss:8.1f} MiB peak RSS')
+
+
+if __name__ == '__main__':
+    for size in [int(arg) for arg in sys.argv[1:]] or [1000, 100000]:
+        main(size)
@@ -0,0 +1,56 @@
+"""Measure full-text index build time, size and BM25 query latency over synthetic descriptions.
+
+Run from the project directory:
+
+    $ python -m benchmarks.text_search [size ...]
+"""
+import random
+import sys
+import time
+from itertools import accumulate
+import tracemalloc
+
+from movies.adapters.text_index import TextIndex
+
+VOCABULARY_SIZE = 50000
+WORDS_PER_DESCRIPTION = 25
+
+
+def synthetic_documents(size, seed=235):
+    # Word frequencies follow Zipf's law, as they do in natural language.
+    rng = random.Random(seed)
+    vocabulary = [f'w{rank}' for rank in range(VOCABULARY_SIZE)]
+    cumulative_weights = list(accumulate(1 / (rank + 1) for rank in range(VOCABULARY_SIZE)))
+    for movie_id in range(1, size + 1):
+        words = rng.choices(vocabulary, cum_weights=cumulative_weights, k=WORDS_PER_DESCRIPTION + 3)
+        yield movie_id, ' '.join(words[:3]), ' '.join(words[3:])
+
+
+def main(size):
+    documents = list(synthetic_documents(size))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = TextIndex()
+    for movie_id, title, description in documents:
+        index.add_document(movie_id, title, description)
+    elapsed = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f'{size} descriptions, {index.number_of_terms} terms')
+    print(f'  build   {elapsed:8.2f} s  ({size / elapsed:,.0f} documents/s)')
+    print(f'  memory  {memory / 2 ** 20:8.1f} MiB ({memory / size:.0f} bytes/document)')
+
+    for query in ['w40000 w30000', 'w500 w2000 w9000', 'w10 w20', 'w0 w1 w2']:
+        repetitions = 20
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            results = index.search(query, 10)
+        elapsed = (time.perf_counter() - start) / repetitions
+        print(f'  {elapsed * 1000:8.2f} ms  {query!r}')
+
+
+if __name__ == '__main__':
+    for size in [int(arg) for arg in sys.argv[1:]] or [100000]:
+        main(size)
@@ -0,0 +1,42 @@
+"""Measure prefix-completion latency and incremental index updates over a synthetic catalog.
+
+Run from the project directory:
+
+    $ python -m benchmarks.typeahead [size]
+"""
+import sys
+import time
+
+from benchmarks.catalog import synthetic_movies
+from movies.adapters.memory_repository import MemoryRepository
+
+PREFIXES = ['m', 'movie 0004', 'actor 0001', 'director 00000042', 'sci', 'dra', 'zz']
+
+
+def main(size=100000, repetitions=10000):
+    repo = MemoryRepository()
+    start = time.perf_counter()
+    for movie in synthetic_movies(size):
+        repo.add_movie(movie)
+    elapsed = time.perf_counter() - start
+    print(f'{size} movies loaded and indexed in {elapsed:.2f} s')
+
+    print('Top 10 completions')
+    for prefix in PREFIXES:
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            completions = repo.get_name_completions(prefix, 10)
+        elapsed = (time.perf_counter() - start) / repetitions
+        print(f'  {elapsed * 1e6:8.2f} us  {len(completions):2d} results  {prefix!r}')
+
+    print('Top 10 genre completions')
+    for prefix in PREFIXES:
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            completions = repo.get_name_completions(prefix, 10, {'genre'})
+        elapsed = (time.perf_counter() - start) / repetitions
+        print(f'  {elapsed * 1e6:8.2f} us  {len(completions):2d} results  {prefix!r}')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
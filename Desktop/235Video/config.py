@@ -15,3 +15,28 @@ class Config:
 
     SECRET_KEY = environ.get('SECRET_KEY')
 
+    # Repository: 'memory' loads the catalog into each process, 'sqlite' keeps the catalog, users and reviews in the
+    # SQLITE_DATABASE file, which is loaded from the data file the first time.
+    REPOSITORY = environ.get('REPOSITORY', 'memory')
+    SQLITE_DATABASE = environ.get('SQLITE_DATABASE', path.join('movies', 'adapters', 'data', 'movies.sqlite3'))
+
+    # Review moderation: 'sync' rejects a review with profanity when it is submitted, 'queued' accepts it and publishes
+    # it once a background worker pool has screened it.
+    REVIEW_MODERATION = environ.get('REVIEW_MODERATION', 'sync')
+    MODERATION_WORKERS = int(environ.get('MODERATION_WORKERS', '1'))
+
+    # Password hashing: PBKDF2-SHA256 iterations for new hashes (older hashes are upgraded at login), the number of
+    # worker processes that compute hashes (0 computes them on the request thread), and how many hashes may be queued or
+    # running at once, with how long a request waits for room before it is turned away.
+    PASSWORD_HASH_ITERATIONS = int(environ.get('PASSWORD_HASH_ITERATIONS', '150000'))
+    PASSWORD_HASH_WORKERS = int(environ.get('PASSWORD_HASH_WORKERS', '2'))
+    PASSWORD_HASH_MAX_PENDING = int(environ.get('PASSWORD_HASH_MAX_PENDING', '16'))
+    PASSWORD_HASH_WAIT = float(environ.get('PASSWORD_HASH_WAIT', '5'))
+
+    # Login throttling: each client address may make LOGIN_BURST attempts at once, refilled at LOGIN_RATE a second, and
+    # after LOGIN_MAX_FAILURES failed logins for one user_name it can't try that user_name for LOGIN_FAILURE_WINDOW
+    # seconds.
+    LOGIN_RATE = float(environ.get('LOGIN_RATE', '1'))
+    LOGIN_BURST = int(environ.get('LOGIN_BURST', '10'))
+    LOGIN_MAX_FAILURES = int(environ.get('LOGIN_MAX_FAILURES', '5'))
+    LOGIN_FAILURE_WINDOW = float(environ.get('LOGIN_FAILURE_WINDOW', '300'))
@@ -2,10 +2,14 @@
 
 import os
 
+import click
 from flask import Flask
 
 import movies.adapters.repository as repo
-from movies.adapters.memory_repository import MemoryRepository, populate
+import movies.adapters.sqlite_repository as sqlite_repository
+import movies.authentication.hashing as hashing
+import movies.authentication.throttling as throttling
+from movies.adapters.memory_repository import MemoryRepository, populate, snapshot_filename
 
 
 def create_app(test_config=None):
@@ -23,9 +27,23 @@ def create_app(test_config=None):
         app.config.from_mapping(test_config)
         data_path = app.config['TEST_DATA_PATH']
 
-    # Create the MemoryRepository implementation for a memory-based repository.
-    repo.repo_instance = MemoryRepository()
-    populate(data_path, repo.repo_instance)
+    if app.config['REPOSITORY'] == 'sqlite':
+        # Create the SqliteRepository implementation, which loads the data file only into a new database.
+        repo.repo_instance = sqlite_repository.SqliteRepository(app.config['SQLITE_DATABASE'])
+        stats = sqlite_repository.populate(data_path, repo.repo_instance)
+    else:
+        # Create the MemoryRepository implementation for a memory-based repository.
+        repo.repo_instance = MemoryRepository()
+        stats = populate(data_path, repo.repo_instance)
+    app.logger.info(f'Loaded {stats.rows} movies in {stats.seconds:.2f} s ({stats.rows_per_second:,.0f} rows/s)')
+
+    # Hash passwords in a bounded worker pool, replacing the previous app's pool if there was one.
+    hashing.configure(app.config['PASSWORD_HASH_ITERATIONS'], app.config['PASSWORD_HASH_WORKERS'],
+                      app.config['PASSWORD_HASH_MAX_PENDING'], app.config['PASSWORD_HASH_WAIT'])
+
+    # Throttle login attempts before they reach the hasher.
+    throttling.configure(app.config['LOGIN_RATE'], app.config['LOGIN_BURST'], app.config['LOGIN_MAX_FAILURES'],
+                         app.config['LOGIN_FAILURE_WINDOW'])
 
     # Build the application - these steps require an application context.
     with app.app_context():
@@ -45,4 +63,18 @@ def create_app(test_config=None):
         from .utilities import utilities
         app.register_blueprint(utilities.utilities_blueprint)
 
+        from .api import api
+        app.register_blueprint(api.api_blueprint)
+
+    @app.cli.command('write-snapshot')
+    def write_snapshot():
+        """Write a snapshot of the movie catalog, which later starts load instead of the data file."""
+        if not isinstance(repo.repo_instance, MemoryRepository):
+            raise click.ClickException('Snapshots are only used by the memory repository')
+        repo.repo_instance.write_snapshot(snapshot_filename(data_path))
+
+    # Build the navigation URL maps up front so that the first page request doesn't pay for them.
+    with app.test_request_context():
+        utilities.build_url_maps()
+
     return app
@@ -0,0 +1,95 @@
+import math
+from array import array
+
+# The numeric movie attributes held in columns, with the array typecode of each column and the value that stands for a
+# missing attribute. Floating point columns use NaN, which every comparison treats as false. A value too large for its
+# column is stored as missing, rather than failing to load the movie.
+ATTRIBUTES = {
+    'runtime_minutes': ('I', 0),
+    'rating': ('d', math.nan),
+    'votes': ('I', 0),
+    'revenue_millions': ('d', math.nan),
+    'metascore': ('b', -1),
+}
+
+
+class MovieAttributes:
+    """ Numeric movie attributes stored column by column, each column an array indexed by movie id.
+
+    Filters and sorts over a set of movie ids read the columns directly, so they never touch Movie objects, and a
+    column costs only a few bytes per movie.
+    """
+
+    def __init__(self):
+        self._columns = {name: array(typecode) for name, (typecode, missing) in ATTRIBUTES.items()}
+
+    def export(self):
+        # Returns the columns as a dict of attribute names to arrays, for snapshots.
+        return dict(self._columns)
+
+    @classmethod
+    def restore(cls, columns):
+        # Rebuilds the attributes from the columns returned by export.
+        attributes = cls()
+        attributes._columns.update(columns)
+        return attributes
+
+    def __contains__(self, attribute):
+        return attribute in self._columns
+
+    def column(self, attribute: str) -> array:
+        return self._columns[attribute]
+
+    def set(self, movie_id: int, attribute: str, value):
+        typecode, missing = ATTRIBUTES[attribute]
+        column = self._columns[attribute]
+        if movie_id >= len(column):
+            column.extend([missing] * (movie_id + 1 - len(column)))
+        try:
+            column[movie_id] = missing if value is None else value
+        except OverflowError:
+            column[movie_id] = missing
+
+    def get(self, movie_id: int, attribute: str):
+        typecode, missing = ATTRIBUTES[attribute]
+        column = self._columns[attribute]
+        if movie_id >= len(column) or is_missing(column[movie_id], missing):
+            return None
+        return column[movie_id]
+
+    def add_movie(self, movie):
+        for attribute in ATTRIBUTES:
+            self.set(movie.id, attribute, getattr(movie, attribute))
+
+    def sort(self, movie_ids, attribute: str, descending: bool = True):
+        # Returns movie_ids ordered by attribute, highest first unless descending is False. Movies without a value
+        # come last, and ties keep their order in movie_ids, i.e. usually ranking order.
+        typecode, missing = ATTRIBUTES[attribute]
+        column = self._columns[attribute]
+        with_values = list()
+        without_values = list()
+        for movie_id in movie_ids:
+            if movie_id < len(column) and not is_missing(column[movie_id], missing):
+                with_values.append(movie_id)
+            else:
+                without_values.append(movie_id)
+
+        with_values.sort(key=column.__getitem__, reverse=descending)
+        return with_values + without_values
+
+    def filter(self, movie_ids, attribute: str, minimum=None, maximum=None):
+        # Yields the ids in movie_ids whose attribute is within [minimum, maximum]. Movies without a value never match.
+        typecode, missing = ATTRIBUTES[attribute]
+        column = self._columns[attribute]
+        low = -math.inf if minimum is None else minimum
+        high = math.inf if maximum is None else maximum
+        for movie_id in movie_ids:
+            if movie_id < len(column):
+                value = column[movie_id]
+                if low <= value <= high and not is_missing(value, missing):
+                    yield movie_id
+
+
+def is_missing(value, missing):
+    # NaN never equals itself, so it needs its own test.
+    return value != value or value == missing
@@ -0,0 +1,157 @@
+from array import array
+from heapq import nlargest
+from itertools import groupby
+
+from movies.adapters.prefix_index import normalize_key
+
+
+class CostarGraph:
+    """ Which actors have appeared in films together, and in how many, as a graph in compressed sparse row form.
+
+    Actors are numbered in the order they're first cast, and each actor's co-stars are a row of one array of actor
+    numbers, with a parallel array of weights, the number of films the two share. An offsets array gives where each
+    row starts. That costs six bytes per co-star pair in each direction, however many actors there are, where a set of
+    colleagues per Actor would cost a hash table entry per pair and an object per actor. Each row is ordered by weight,
+    most shared films first, then by actor number, so an actor's top collaborators are the start of its row.
+
+    A graph is built once from the catalog's casts and never changes.
+    """
+
+    def __init__(self, casts):
+        # Builds the graph from casts, an iterable with a list of actor names for each movie.
+        self._names = list()
+        self._numbers = dict()
+
+        # Every ordered pair of co-stars in every film, each packed into one integer, sorted so that pairs are grouped
+        # by actor and then by co-star, and equal pairs, one per shared film, are adjacent.
+        pairs = array('Q')
+        for cast in casts:
+            actors = sorted({self._number(name) for name in cast})
+            pairs.extend((actor << 32) | costar for actor in actors for costar in actors if actor != costar)
+        pairs = sorted(pairs)
+
+        self._offsets = array('I', [0]) * (len(self._names) + 1)
+        rows = [list() for _ in self._names]
+        for pair, repeats in groupby(pairs):
+            rows[pair >> 32].append((-sum(1 for _ in repeats), pair & 0xffffffff))
+
+        self._costars = array('I')
+        self._weights = array('H')
+        for actor, row in enumerate(rows):
+            row.sort()
+            self._costars.extend(costar for _, costar in row)
+            self._weights.extend(min(-weight, 0xffff) for weight, _ in row)
+            self._offsets[actor + 1] = len(self._costars)
+
+    def _number(self, name: str) -> int:
+        key = normalize_key(name)
+        number = self._numbers.get(key)
+        if number is None:
+            number = self._numbers[key] = len(self._names)
+            self._names.append(name)
+        return number
+
+    @property
+    def number_of_actors(self) -> int:
+        return len(self._names)
+
+    @property
+    def number_of_pairs(self) -> int:
+        # The number of pairs of actors who share a film.
+        return len(self._costars) // 2
+
+    def __contains__(self, name):
+        return normalize_key(name) in self._numbers
+
+    def name(self, name: str) -> str:
+        # Returns the actor's name as cast, or None if no film casts the actor.
+        number = self._numbers.get(normalize_key(name))
+        return None if number is None else self._names[number]
+
+    def degree(self, name: str) -> int:
+        # Returns the number of the actor's co-stars.
+        number = self._numbers.get(normalize_key(name))
+        if number is None:
+            return 0
+        return self._offsets[number + 1] - self._offsets[number]
+
+    def costars(self, name: str, limit: int = None):
+        # Returns (name, shared films) pairs for up to limit of the actor's co-stars, those with most shared films
+        # first. The row is already in that order, so this costs O(limit).
+        number = self._numbers.get(normalize_key(name))
+        if number is None:
+            return list()
+        start, end = self._offsets[number], self._offsets[number + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        return [(self._names[self._costars[i]], self._weights[i]) for i in range(start, end)]
+
+    def worked_with(self, name: str, other_name: str) -> int:
+        # Returns the number of films the two actors share, 0 if none.
+        number = self._numbers.get(normalize_key(name))
+        other = self._numbers.get(normalize_key(other_name))
+        if number is None or other is None:
+            return 0
+        for i in range(self._offsets[number], self._offsets[number + 1]):
+            if self._costars[i] == other:
+                return self._weights[i]
+        return 0
+
+    def top_pairs(self, limit: int = 10):
+        # Returns (name, name, shared films) for the limit pairs of actors who share most films.
+        return [(self._names[actor], self._names[self._costars[i]], self._weights[i])
+                for i, actor in nlargest(limit, self._edges(), key=lambda edge: (self._weights[edge[0]], -edge[0]))]
+
+    def _edges(self):
+        # Yields (position in the co-star arrays, actor) for each pair once, from the actor with the lower number.
+        for actor in range(len(self._names)):
+            for i in range(self._offsets[actor], self._offsets[actor + 1]):
+                if self._costars[i] > actor:
+                    yield i, actor
+
+    def path(self, name: str, other_name: str, max_degrees: int = None):
+        # Returns the shortest chain of co-stars from one actor to the other as a list of names, starting with the
+        # first and ending with the second, or None if there's no such chain within max_degrees links. The search
+        # runs breadth first from both ends, always widening the smaller frontier, so it visits far fewer actors than a
+        # search from one end.
+        start = self._numbers.get(normalize_key(name))
+        goal = self._numbers.get(normalize_key(other_name))
+        if start is None or goal is None:
+            return None
+        if start == goal:
+            return [self._names[start]]
+
+        # The actor each visited actor was reached from, on the search from each end.
+        parents = ({start: None}, {goal: None})
+        frontiers = ([start], [goal])
+        degrees = 0
+        while frontiers[0] and frontiers[1] and (max_degrees is None or degrees < max_degrees):
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            visited, others = parents[side], parents[1 - side]
+            next_frontier = list()
+            for actor in frontiers[side]:
+                for i in range(self._offsets[actor], self._offsets[actor + 1]):
+                    costar = self._costars[i]
+                    if costar in visited:
+                        continue
+                    visited[costar] = actor
+                    if costar in others:
+                        return self._join(parents, costar)
+                    next_frontier.append(costar)
+            frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+            degrees += 1
+        return None
+
+    def _join(self, parents, meeting):
+        # Returns the names along the chain through meeting, from the start of the search to its goal.
+        chain = list()
+        actor = meeting
+        while actor is not None:
+            chain.append(actor)
+            actor = parents[0][actor]
+        chain.reverse()
+        actor = parents[1][meeting]
+        while actor is not None:
+            chain.append(actor)
+            actor = parents[1][actor]
+        return [self._names[actor] for actor in chain]
@@ -0,0 +1,131 @@
+import csv
+import os
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from movies.domain.model import EntityRegistry, Movie
+
+# Rows handed to a worker process at a time. Catalogs with no more rows than this are parsed in-process, so small
+# files such as Data1000Movies.csv never pay for starting a process pool.
+BLOCK_SIZE = 20000
+
+IngestionStats = namedtuple('IngestionStats', ['rows', 'seconds', 'rows_per_second'])
+
+
+def read_csv_blocks(filename: str, block_size: int = BLOCK_SIZE):
+    # Yields the data lines of a CSV file in blocks of about block_size rows. A block only ends where the number of
+    # quotes read so far is even, so a quoted field with an embedded line break is never split between blocks.
+    with open(filename, encoding='utf-8-sig', newline='') as infile:
+        # Skip the header line.
+        next(infile, None)
+
+        block = list()
+        rows = 0
+        quoted = False
+        for line in infile:
+            block.append(line)
+            if line.count('"') % 2 == 1:
+                quoted = not quoted
+            if not quoted:
+                rows += 1
+                if rows == block_size:
+                    yield block
+                    block = list()
+                    rows = 0
+
+        if len(block) > 0:
+            yield block
+
+
+def parse_movie_rows(lines):
+    # Parses a block of Data1000Movies.csv lines into (id, title, year, description, genres, director, actors,
+    # numbers) tuples of plain values, which are cheap to send back from a worker process. numbers holds the runtime,
+    # rating, votes, revenue and metascore, each None when the file has no value. Only the fields the loader uses are
+    # stripped.
+    rows = list()
+    for row in csv.reader(lines):
+        rows.append((
+            int(row[0]),
+            row[1].strip(),
+            int(row[6]),
+            row[3].strip(),
+            [genre.strip() for genre in row[2].split(",")],
+            row[4].strip(),
+            [actor.strip() for actor in row[5].split(",")],
+            (_number(row[7], int), _number(row[8], float), _number(row[9], int), _number(row[10], float),
+             _number(row[11], int)),
+        ))
+    return rows
+
+
+def _number(text, convert):
+    # Missing values are empty or 'N/A' in the data file.
+    try:
+        return convert(text)
+    except ValueError:
+        return None
+
+
+def parse_movie_blocks(filename: str, workers: int = None, block_size: int = BLOCK_SIZE):
+    # Yields lists of parsed rows in file order. Blocks are parsed by a pool of worker processes, with at most two
+    # blocks per worker in flight so that memory use doesn't grow with the size of the file.
+    blocks = read_csv_blocks(filename, block_size)
+    first_block = next(blocks, None)
+    if first_block is None:
+        return
+
+    second_block = next(blocks, None)
+    if second_block is None or workers == 1:
+        yield parse_movie_rows(first_block)
+        if second_block is not None:
+            yield parse_movie_rows(second_block)
+        for block in blocks:
+            yield parse_movie_rows(block)
+        return
+
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque(executor.submit(parse_movie_rows, block) for block in (first_block, second_block))
+        for block in blocks:
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+            pending.append(executor.submit(parse_movie_rows, block))
+        while len(pending) > 0:
+            yield pending.popleft().result()
+
+
+def rows_to_movies(rows, registry: EntityRegistry):
+    movies = list()
+    for movie_id, title, year, description, genres, director, actors, numbers in rows:
+        movie = Movie(title, year)
+        movie.add_id(movie_id)
+        movie.description = description
+
+        runtime_minutes, movie.rating, movie.votes, movie.revenue_millions, movie.metascore = numbers
+        if runtime_minutes is not None and runtime_minutes > 0:
+            movie.runtime_minutes = runtime_minutes
+
+        for genre in genres:
+            movie.add_genre(registry.genre(genre))
+
+        movie.add_director(registry.director(director))
+
+        for actor in actors:
+            movie.add_actor(registry.actor(actor))
+
+        movies.append(movie)
+    return movies
+
+
+def ingest_movies(filename: str, repo, workers: int = None, block_size: int = BLOCK_SIZE) -> IngestionStats:
+    # Loads the movies in filename into repo a block at a time and returns the number of rows loaded and the rate.
+    start = time.perf_counter()
+    registry = EntityRegistry()
+    rows = 0
+    for parsed_rows in parse_movie_blocks(filename, workers, block_size):
+        repo.add_movies(rows_to_movies(parsed_rows, registry))
+        rows += len(parsed_rows)
+
+    seconds = time.perf_counter() - start
+    return IngestionStats(rows, seconds, rows / seconds if seconds > 0 else 0.0)
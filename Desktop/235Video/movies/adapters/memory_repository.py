@@ -1,10 +1,21 @@
-import csv
 import os
+import time
+from array import array
 from bisect import bisect_left, insort_left
 from typing import List
 
-from movies.adapters.repository import AbstractRepository
-from movies.domain.model import Actor, Director, Genre, Movie, Review, User
+from movies.adapters.attributes import ATTRIBUTES, MovieAttributes
+from movies.adapters.ingestion import IngestionStats, ingest_movies
+from movies.adapters.postings import new_posting_list, add_to_posting_list
+from movies.adapters.prefix_index import PrefixIndex
+from movies.adapters.rank_index import RankIndex
+from movies.adapters.repository import AbstractRepository, RepositoryException, normalize_name
+from movies.adapters.review_index import ReviewIndex
+from movies.adapters.snapshot import NO_STRING, SnapshotException, StringReader, StringTable, is_newer, \
+    ragged_sections, ragged_slices, read_snapshot, write_snapshot
+from movies.adapters.text_index import TextIndex
+from movies.adapters.year_index import YearIndex
+from movies.domain.model import Actor, Director, EntityRegistry, Genre, Movie, Review, User
 
 
 class MemoryRepository(AbstractRepository):
@@ -13,34 +24,111 @@ class MemoryRepository(AbstractRepository):
         self._movies = list()
         self._movies_index = dict()
         self._actors = list()
+        self._actors_index = dict()
         self._directors = list()
+        self._directors_index = dict()
         self._genres = list()
-        self._reviews = list()
+        self._genres_index = dict()
+        self._actor_postings = dict()
+        self._director_postings = dict()
+        self._genre_postings = dict()
+        self._release_year_postings = dict()
+        self._prefix_index = PrefixIndex()
+        self._text_index = TextIndex()
+        self._attributes = MovieAttributes()
+        self._rank_indexes = dict()
+        self._year_index = None
+        self._reviews = ReviewIndex()
         self._users = list()
+        self._users_index = dict()
+        self._entity_version = 0
+        self._catalog_version = 0
+        self._next_movie_id = 1
 
     def add_user(self, user: User):
         self._users.append(user)
+        self._users_index[normalize_name(user.user_name)] = user
 
-    def get_user(self, user_name) -> str:
-        return next((user for user in self._users if user.user_name == user_name), None)
+    def get_user(self, user_name) -> User:
+        return self._users_index.get(normalize_name(user_name))
+
+    def update_user(self, user: User):
+        # The repository holds the User objects it hands out, so changes to them are already stored.
+        pass
 
     def add_movie(self, movie: Movie):
-        if movie.id is None:
-            movie.add_id(len(self._movies) + 1)
+        self._number_movies([movie])
         insort_left(self._movies, movie)
+        self._index_movie(movie)
+
+    def add_movies(self, movies):
+        # The batch is merged into the sorted movie list with a single sort, rather than an insertion per movie, which
+        # is what makes loading a large catalog linear.
+        movies = list(movies)
+        self._number_movies(movies)
+        for movie in movies:
+            self._index_movie(movie)
+        self._movies.extend(movies)
+        self._movies.sort()
+
+    def _number_movies(self, movies):
+        # Refuses the movies if any of their ids is already taken, before anything is added, and then gives each movie
+        # without an id a new one, above every id so far and every id in the batch.
+        ids = set()
+        for movie in movies:
+            if movie.id is not None:
+                if movie.id in self._movies_index or movie.id in ids:
+                    raise RepositoryException(f'A movie with id {movie.id} is already stored')
+                ids.add(movie.id)
+
+        next_id = max(self._next_movie_id, max(ids, default=0) + 1)
+        for movie in movies:
+            if movie.id is None:
+                movie.add_id(next_id)
+                next_id += 1
+
+    def _index_movie(self, movie: Movie):
         self._movies_index[int(movie.id)] = movie
+        self._next_movie_id = max(self._next_movie_id, movie.id + 1)
+        self._catalog_version += 1
+        self._prefix_index.add('title', movie.title, movie.id)
+        self._text_index.add_document(movie.id, movie.title, movie.description)
+        self._attributes.add_movie(movie)
+
+        if movie.release_year is not None:
+            if movie.release_year not in self._release_year_postings:
+                self._release_year_postings[movie.release_year] = new_posting_list()
+            add_to_posting_list(self._release_year_postings[movie.release_year], movie.id)
 
         for genre in movie.genres:
-            if genre not in self._genres:
+            key = normalize_name(genre.genre_name)
+            if key not in self._genres_index:
                 self._genres.append(genre)
+                self._genres_index[key] = genre
+                self._genre_postings[key] = new_posting_list()
+                self._prefix_index.add('genre', genre.genre_name)
+                self._entity_version += 1
+            add_to_posting_list(self._genre_postings[key], movie.id)
 
         if movie.director is not None:
-            if movie.director not in self._directors:
+            key = normalize_name(movie.director.director_full_name)
+            if key not in self._directors_index:
                 self._directors.append(movie.director)
+                self._directors_index[key] = movie.director
+                self._director_postings[key] = new_posting_list()
+                self._prefix_index.add('director', movie.director.director_full_name)
+                self._entity_version += 1
+            add_to_posting_list(self._director_postings[key], movie.id)
 
         for actor in movie.actors:
-            if actor not in self._actors:
+            key = normalize_name(actor.actor_full_name)
+            if key not in self._actors_index:
                 self._actors.append(actor)
+                self._actors_index[key] = actor
+                self._actor_postings[key] = new_posting_list()
+                self._prefix_index.add('actor', actor.actor_full_name)
+                self._entity_version += 1
+            add_to_posting_list(self._actor_postings[key], movie.id)
 
     def get_movie(self, id: int) -> Movie:
         movie = None
@@ -52,29 +140,36 @@ class MemoryRepository(AbstractRepository):
         return movie
 
     def get_movies_by_release_year(self, target_year: int) -> List[Movie]:
-        matching_movies = list()
-        for movie in self._movies:
-            if movie.year == target_year:
-                matching_movies.append(movie)
+        # The year's posting list gives its movies without scanning the catalog, and the title rank index puts them in
+        # title order by comparing positions rather than Movies.
+        by_title = self.get_rank_index('title')
+        return self.get_movies_by_id(sorted(self.get_movie_ids_for_release_year(target_year), key=by_title.position))
+
+    def get_movies_by_year_range(self, start: int = None, end: int = None, limit: int = None, cursor: int = 0):
+        return self.get_movies_by_id(self._get_year_index().movie_ids(start, end, limit, cursor))
+
+    def count_movies_by_year_range(self, start: int = None, end: int = None) -> int:
+        return self._get_year_index().count(start, end)
 
-        return matching_movies
+    def _get_year_index(self) -> YearIndex:
+        # Built from the release year posting lists on first use after the catalog changes, as rank indexes are.
+        if self._year_index is None or self._year_index[0] != self._catalog_version:
+            postings = self._release_year_postings
+            self._year_index = (self._catalog_version, YearIndex(
+                (year, movie_id) for year in sorted(postings) for movie_id in postings[year]))
+        return self._year_index[1]
+
+    def get_movie_ids_for_release_year(self, release_year: int):
+        return self._release_year_postings.get(release_year, new_posting_list())
 
     def get_number_of_movies(self):
         return len(self._movies)
 
     def get_first_movie(self):
-        movie = None
-
-        if len(self._movies) > 0:
-            movie = self._movies_index[1]
-        return movie
+        return self._movies_index.get(self.get_rank_index().first())
 
     def get_last_movie(self):
-        movie = None
-
-        if len(self._movies) > 0:
-            movie = self._movies_index[len(self._movies)]
-        return movie
+        return self._movies_index.get(self.get_rank_index().last())
 
     def get_movies_by_id(self, id_list):
         # Strip out any ids in id_list that don't represent movie ids in the repository.
@@ -85,46 +180,45 @@ class MemoryRepository(AbstractRepository):
         return movies
 
     def get_movie_ids_for_actor(self, actor_name: str):
-        actor = next((actor for actor in self._actors if actor.actor_full_name == actor_name), None)
-
-        if actor is not None:
-            movie_ids = [movie.id for movie in actor.tagged_movies]
-        else:
-            movie_ids = list()
-
-        return movie_ids
+        return self._actor_postings.get(normalize_name(actor_name), new_posting_list())
 
     def get_movie_ids_for_director(self, director_name: str):
-        director = next((director for director in self._directors if director.director_full_name == director_name), None)
-
-        if director is not None:
-            movie_ids = [movie.id for movie in director.tagged_movies]
-        else:
-            movie_ids = list()
-
-        return movie_ids
+        return self._director_postings.get(normalize_name(director_name), new_posting_list())
 
     def get_movie_ids_for_genre(self, genre_name: str):
-        genre = next((genre for genre in self._genres if genre.genre_name == genre_name), None)
+        return self._genre_postings.get(normalize_name(genre_name), new_posting_list())
 
-        if genre is not None:
-            movie_ids = [movie.id for movie in genre.tagged_movies]
-        else:
-            movie_ids = list()
+    def sort_movie_ids(self, movie_ids, attribute: str, descending: bool = True):
+        return self._attributes.sort(movie_ids, attribute, descending)
 
-        return movie_ids
+    def filter_movie_ids(self, movie_ids, attribute: str, minimum=None, maximum=None):
+        return self._attributes.filter(movie_ids, attribute, minimum, maximum)
 
     def get_id_of_previous_movie(self, movie: Movie):
-        previous_id = None
-        if movie.id != 1:
-            previous_id = movie.id - 1
-        return previous_id
+        return self.get_rank_index().previous(movie.id)
 
     def get_id_of_next_movie(self, movie: Movie):
-        next_id = None
-        if movie.id != len(self._movies):
-            next_id = movie.id + 1
-        return next_id
+        return self.get_rank_index().next(movie.id)
+
+    def get_rank_index(self, ordering: str = 'rank') -> RankIndex:
+        # An index is built on first use after the catalog changes, and then serves every request until it changes
+        # again.
+        cached = self._rank_indexes.get(ordering)
+        if cached is None or cached[0] != self._catalog_version:
+            cached = (self._catalog_version, RankIndex(self._rank_order(ordering)))
+            self._rank_indexes[ordering] = cached
+        return cached[1]
+
+    def _rank_order(self, ordering: str):
+        # Returns the ids of every movie in ordering. Sorts are stable, so ties keep rank order.
+        movie_ids = sorted(self._movies_index)
+        orderings = {
+            'rank': lambda: movie_ids,
+            'rating': lambda: self._attributes.sort(movie_ids, 'rating'),
+            'year': lambda: sorted(movie_ids, key=lambda movie_id: -(self._movies_index[movie_id].release_year or 0)),
+            'title': lambda: [movie.id for movie in self._movies],
+        }
+        return orderings[ordering]()
 
     def get_actors(self) -> List[Actor]:
         return self._actors
@@ -135,12 +229,151 @@ class MemoryRepository(AbstractRepository):
     def get_directors(self) -> List[Director]:
         return self._directors
 
+    def get_name_completions(self, prefix: str, limit: int = 10, kinds=None):
+        return self._prefix_index.complete(prefix, limit, kinds)
+
+    def search_movie_ids_by_text(self, query: str, limit: int = 10):
+        return self._text_index.search(query, limit)
+
+    def get_catalog_version(self) -> int:
+        return self._catalog_version
+
+    def get_entity_version(self) -> int:
+        return self._entity_version
+
+    def get_review_version(self) -> int:
+        # Reviews are only ever added, so their number serves as the version.
+        return len(self._reviews)
+
     def add_review(self, review: Review):
         super().add_review(review)
-        self._reviews.append(review)
+        self._reviews.add(review, normalize_name(review.user.user_name))
+
+    def add_reviews(self, reviews):
+        reviews = list(reviews)
+        super().add_reviews(reviews)
+        self._reviews.add_all([(review, normalize_name(review.user.user_name)) for review in reviews])
 
     def get_reviews(self):
-        return self._reviews
+        return list(self._reviews)
+
+    def get_review(self, review_id: int) -> Review:
+        return self._reviews.get(review_id)
+
+    def get_reviews_for_movie(self, movie_id: int, limit: int = None, after: int = None, before: int = None):
+        return self._reviews.for_movie(movie_id, limit, after, before)
+
+    def get_reviews_for_user(self, user_name: str, limit: int = None, after: int = None, before: int = None):
+        return self._reviews.for_user(normalize_name(user_name), limit, after, before)
+
+    def count_reviews_for_movie(self, movie_id: int) -> int:
+        return self._reviews.count_for_movie(movie_id)
+
+    def count_reviews_for_user(self, user_name: str) -> int:
+        return self._reviews.count_for_user(normalize_name(user_name))
+
+    def write_snapshot(self, filename: str):
+        # Writes the movies and their indexes to filename, in the format of movies.adapters.snapshot. Users and reviews
+        # aren't part of the data file, so they aren't included.
+        strings = StringTable()
+        movies = sorted(self._movies_index.values(), key=lambda movie: movie.id)
+
+        sections = {
+            'counts': array('Q', [self._entity_version, self._text_index.number_of_documents]),
+            'movie_ids': array('I', [movie.id for movie in movies]),
+            'movie_order': array('I', [movie.id for movie in self._movies]),
+            'movie_titles': strings.ids(movie.title or '' for movie in movies),
+            'movie_release_years': array('H', [movie.release_year or 0 for movie in movies]),
+            'movie_descriptions': strings.ids(movie.description for movie in movies),
+            'movie_directors': strings.ids(
+                None if movie.director is None else movie.director.director_full_name or '' for movie in movies),
+            'actor_names': strings.ids(actor.actor_full_name or '' for actor in self._actors),
+            'director_names': strings.ids(director.director_full_name or '' for director in self._directors),
+            'genre_names': strings.ids(genre.genre_name or '' for genre in self._genres),
+            'release_years': array('H', self._release_year_postings.keys()),
+        }
+        sections.update(ragged_sections('movie_genres', (
+            strings.ids(genre.genre_name or '' for genre in movie.genres) for movie in movies)))
+        sections.update(ragged_sections('movie_actors', (
+            strings.ids(actor.actor_full_name or '' for actor in movie.actors) for movie in movies)))
+        sections.update(ragged_sections('actor_postings', (
+            self._actor_postings[normalize_name(actor.actor_full_name)] for actor in self._actors)))
+        sections.update(ragged_sections('director_postings', (
+            self._director_postings[normalize_name(director.director_full_name)] for director in self._directors)))
+        sections.update(ragged_sections('genre_postings', (
+            self._genre_postings[normalize_name(genre.genre_name)] for genre in self._genres)))
+        sections.update(ragged_sections('release_year_postings', self._release_year_postings.values()))
+
+        for attribute, column in self._attributes.export().items():
+            sections['attribute_' + attribute] = column
+
+        terms, posting_ids, posting_frequencies, document_lengths, _ = self._text_index.export()
+        sections['text_terms'] = strings.ids(terms)
+        sections['text_document_lengths'] = document_lengths
+        sections.update(ragged_sections('text_postings', posting_ids))
+        sections.update(ragged_sections('text_frequencies', posting_frequencies, 'H'))
+
+        sections.update(strings.sections())
+        write_snapshot(filename, sections)
+
+    def load_snapshot(self, filename: str):
+        # Loads the movies and indexes written by write_snapshot into this repository, which must be empty. Posting
+        # lists and the full-text index are copied from the snapshot rather than rebuilt.
+        sections = read_snapshot(filename)
+        strings = StringReader(sections)
+        registry = EntityRegistry()
+        self._attributes = MovieAttributes.restore(
+            {attribute: sections['attribute_' + attribute] for attribute in ATTRIBUTES})
+
+        movie_genres = ragged_slices(sections, 'movie_genres')
+        movie_actors = ragged_slices(sections, 'movie_actors')
+        for movie_id, title, release_year, description, director in zip(
+                sections['movie_ids'], sections['movie_titles'], sections['movie_release_years'],
+                sections['movie_descriptions'], sections['movie_directors']):
+            movie = Movie(strings[title], release_year)
+            movie.add_id(movie_id)
+            movie.description = strings[description]
+            runtime_minutes = self._attributes.get(movie_id, 'runtime_minutes')
+            if runtime_minutes is not None:
+                movie.runtime_minutes = runtime_minutes
+            movie.rating = self._attributes.get(movie_id, 'rating')
+            movie.votes = self._attributes.get(movie_id, 'votes')
+            movie.revenue_millions = self._attributes.get(movie_id, 'revenue_millions')
+            movie.metascore = self._attributes.get(movie_id, 'metascore')
+            for genre in next(movie_genres):
+                movie.add_genre(registry.genre(strings[genre]))
+            if director != NO_STRING:
+                movie.add_director(registry.director(strings[director]))
+            for actor in next(movie_actors):
+                movie.add_actor(registry.actor(strings[actor]))
+            self._movies_index[movie_id] = movie
+            self._prefix_index.add('title', movie.title, movie_id)
+        self._movies = [self._movies_index[movie_id] for movie_id in sections['movie_order']]
+        self._next_movie_id = max(self._movies_index, default=0) + 1
+        self._catalog_version = len(self._movies)
+
+        for entities, index, postings, make_entity, kind, names, ragged_name in [
+                (self._actors, self._actors_index, self._actor_postings, registry.actor, 'actor',
+                 'actor_names', 'actor_postings'),
+                (self._directors, self._directors_index, self._director_postings, registry.director, 'director',
+                 'director_names', 'director_postings'),
+                (self._genres, self._genres_index, self._genre_postings, registry.genre, 'genre',
+                 'genre_names', 'genre_postings')]:
+            for name, posting_list in zip(strings.strings(sections[names]), ragged_slices(sections, ragged_name)):
+                entity = make_entity(name)
+                key = normalize_name(name) if name != '' else None
+                entities.append(entity)
+                index[key] = entity
+                postings[key] = posting_list
+                self._prefix_index.add(kind, name)
+
+        self._release_year_postings = dict(zip(sections['release_years'],
+                                               ragged_slices(sections, 'release_year_postings')))
+
+        self._entity_version, number_of_documents = sections['counts']
+        self._text_index = TextIndex.restore(
+            strings.strings(sections['text_terms']), ragged_slices(sections, 'text_postings'),
+            ragged_slices(sections, 'text_frequencies'), sections['text_document_lengths'], number_of_documents)
 
     def movie_index(self, movie: Movie):
         index = bisect_left(self._movies, movie)
@@ -149,37 +382,27 @@ class MemoryRepository(AbstractRepository):
         raise ValueError
 
 
-def read_csv_file(filename: str):
-    with open(filename, encoding='utf-8-sig') as infile:
-        reader = csv.reader(infile)
+def load_movies_and_tags(data_path: str, repo: MemoryRepository, workers: int = None) -> IngestionStats:
+    return ingest_movies(os.path.join(data_path, 'Data1000Movies.csv'), repo, workers)
 
-        # Read first line of the the CSV file.
-        headers = next(reader)
 
-        # Read remaining rows from the CSV file.
-        for row in reader:
-            # Strip any leading/trailing white space from data read.
-            row = [item.strip() for item in row]
-            yield row
+def load_snapshot(data_path: str, repo: MemoryRepository) -> IngestionStats:
+    start = time.perf_counter()
+    repo.load_snapshot(snapshot_filename(data_path))
+    seconds = time.perf_counter() - start
+    rows = repo.get_number_of_movies()
+    return IngestionStats(rows, seconds, rows / seconds if seconds > 0 else 0.0)
 
 
-def load_movies_and_tags(data_path: str, repo: MemoryRepository):
-    for row in read_csv_file(os.path.join(data_path, 'Data1000Movies.csv')):
-        movie = Movie(row[1], int(row[6]))
-        movie.description = row[3]
+def snapshot_filename(data_path: str):
+    return os.path.join(data_path, 'Data1000Movies.snapshot')
 
-        genre_list = row[2].split(",")
-        for genre in genre_list:
-            movie.add_genre(Genre(genre.strip()))
 
-        movie.add_director(Director(row[4]))
-
-        actors_list = row[5].split(",")
-        for actor in actors_list:
-            movie.add_actor(Actor(actor.strip()))
-
-        repo.add_movie(movie)
-
-
-def populate(data_path: str, repo: MemoryRepository):
-    load_movies_and_tags(data_path, repo)
+def populate(data_path: str, repo: MemoryRepository) -> IngestionStats:
+    # Loads from the snapshot written by write_snapshot if it's newer than the data file, or else from the data file.
+    if is_newer(snapshot_filename(data_path), os.path.join(data_path, 'Data1000Movies.csv')):
+        try:
+            return load_snapshot(data_path, repo)
+        except SnapshotException:
+            pass
+    return load_movies_and_tags(data_path, repo)
@@ -0,0 +1,55 @@
+from array import array
+from bisect import bisect_left
+from heapq import merge
+
+# Posting lists are sorted arrays of unsigned 32-bit movie ids. Because movie ids follow the ranking in the data file,
+# a posting list is also in rank order, and slicing it gives a page of movies without touching any Movie objects.
+POSTING_TYPECODE = 'I'
+
+
+def new_posting_list(ids=()):
+    return array(POSTING_TYPECODE, ids)
+
+
+def add_to_posting_list(posting_list: array, movie_id: int):
+    # Movies are normally added in id order, so appending is the common case.
+    if len(posting_list) == 0 or posting_list[-1] < movie_id:
+        posting_list.append(movie_id)
+        return
+
+    index = bisect_left(posting_list, movie_id)
+    if index == len(posting_list) or posting_list[index] != movie_id:
+        posting_list.insert(index, movie_id)
+
+
+def intersect_posting_lists(posting_lists, driver=None):
+    # Yields the ids common to all posting lists in ascending order. The smallest list drives the intersection and the
+    # others are probed by binary search, resuming from the previous match, so the cost follows the smallest list. A
+    # caller can supply its own ascending driver iterable, e.g. a lazy merge that is smaller than any posting list.
+    others = sorted(posting_lists, key=len)
+    if driver is None:
+        if len(others) == 0:
+            return
+        driver = others.pop(0)
+    positions = [0] * len(others)
+
+    for movie_id in driver:
+        for i, other in enumerate(others):
+            position = bisect_left(other, movie_id, positions[i])
+            if position == len(other):
+                # Nothing in this list is large enough, so no further matches are possible.
+                return
+            positions[i] = position
+            if other[position] != movie_id:
+                break
+        else:
+            yield movie_id
+
+
+def merge_posting_lists(posting_lists):
+    # Yields the ids found in any of the posting lists in ascending order, without duplicates.
+    previous_id = None
+    for movie_id in merge(*posting_lists):
+        if movie_id != previous_id:
+            yield movie_id
+            previous_id = movie_id
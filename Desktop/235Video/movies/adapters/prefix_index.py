@@ -0,0 +1,115 @@
+from bisect import bisect_left
+from heapq import merge
+
+# Sorts after every character that can appear in a key, so [prefix, prefix + _KEY_END) covers all keys with the prefix.
+_KEY_END = '\U0010ffff'
+
+
+class PrefixIndex:
+    """ Sorted index of names for prefix (typeahead) lookups.
+
+    Each name is indexed under its whole normalised form and under every later word, so 'pra' finds 'Chris Pratt'.
+    Names are partitioned by kind (e.g. 'actor' or 'title'), and each kind holds (key, name, ref) tuples in a sorted
+    list that is searched with bisect. New names are appended to an overflow list, which is only sorted when a lookup
+    needs it and is folded into the main list once it grows to an eighth of the main list's size. Adding a name is
+    therefore O(1) amortised, and a lookup bisects two sorted lists per kind.
+    """
+
+    def __init__(self):
+        self._partitions = dict()
+
+    def __len__(self):
+        return sum(len(partition) for partition in self._partitions.values())
+
+    def add(self, kind: str, name: str, ref=None):
+        if type(name) is not str or name.strip() == "":
+            return
+        self._partition(kind).add(name, ref)
+
+    def complete(self, prefix: str, limit: int = 10, kinds=None):
+        # Returns up to limit (kind, name, ref) matches for prefix, in alphabetical order of the matched key. A name
+        # that matches on several of its words is returned once.
+        prefix = normalize_key(prefix)
+        if prefix == "" or limit <= 0:
+            return list()
+
+        ranges = [_with_kind(kind, partition.matching(prefix))
+                  for kind, partition in self._partitions.items() if kinds is None or kind in kinds]
+
+        matches = list()
+        seen = set()
+        for key, kind, name, ref in merge(*ranges):
+            if (kind, name, ref) not in seen:
+                seen.add((kind, name, ref))
+                matches.append((kind, name, ref))
+                if len(matches) == limit:
+                    break
+
+        return matches
+
+    def _partition(self, kind):
+        partition = self._partitions.get(kind)
+        if partition is None:
+            partition = self._partitions[kind] = _Partition()
+        return partition
+
+
+class _Partition:
+
+    def __init__(self):
+        self._entries = list()
+        self._overflow = list()
+        self._overflow_sorted = True
+
+    def __len__(self):
+        return len(self._entries) + len(self._overflow)
+
+    def add(self, name, ref):
+        self.append(name, ref)
+        if len(self._overflow) > max(1024, len(self._entries) // 8):
+            self.fold_overflow()
+
+    def append(self, name, ref):
+        for key in keys_for_name(name):
+            self._overflow.append((key, name, ref))
+        self._overflow_sorted = False
+
+    def fold_overflow(self):
+        # Timsort merges the already sorted main list with the overflow in close to linear time.
+        self._entries.extend(self._overflow)
+        self._entries.sort()
+        self._overflow = list()
+        self._overflow_sorted = True
+
+    def matching(self, prefix):
+        if not self._overflow_sorted:
+            self._overflow.sort()
+            self._overflow_sorted = True
+        return merge(_matching_range(self._entries, prefix), _matching_range(self._overflow, prefix))
+
+
+def _with_kind(kind, entries):
+    for key, name, ref in entries:
+        yield key, kind, name, ref
+
+
+def _matching_range(entries, prefix):
+    start = bisect_left(entries, (prefix,))
+    end = bisect_left(entries, (prefix + _KEY_END,), start)
+    return (entries[index] for index in range(start, end))
+
+
+def normalize_key(text):
+    if type(text) is not str:
+        return ""
+    return ' '.join(text.lower().split())
+
+
+def keys_for_name(name):
+    key = normalize_key(name)
+    keys = [key]
+    position = key.find(' ')
+    while position != -1:
+        keys.append(key[position + 1:])
+        position = key.find(' ', position + 1)
+    return keys
@@ -0,0 +1,70 @@
+from array import array
+
+# The orderings the whole catalog can be ranked in: by the data file's rank, by rating (highest first, movies without
+# one last), by release year (newest first) and by title. Ties keep rank order.
+ORDERINGS = ('rank', 'rating', 'year', 'title')
+
+
+class RankIndex:
+    """ The ids of every movie in one ordering, with each movie's position in that ordering.
+
+    The ids are an array in order and the positions an array indexed by movie id, so both cost four bytes per movie.
+    Finding a movie's neighbours, the first and last movies, or any page of the ordering is then O(1) (plus the page
+    size), however large the catalog. An index is built once for a catalog version and never changes.
+    """
+
+    def __init__(self, movie_ids):
+        self._ids = array('I', movie_ids)
+        # Positions are stored one higher than they are, so that 0 can stand for a movie that isn't in the index.
+        self._positions = array('I', [0]) * (max(self._ids, default=0) + 1)
+        for position, movie_id in enumerate(self._ids):
+            self._positions[movie_id] = position + 1
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __getitem__(self, index):
+        # Reads a position or a slice of the ordering, so that the index can be paged as a sequence of movie ids.
+        return self._ids[index]
+
+    def position(self, movie_id: int) -> int:
+        # Returns the movie's position in the ordering, from 0, or None if the movie isn't in the index.
+        if 0 <= movie_id < len(self._positions) and self._positions[movie_id] > 0:
+            return self._positions[movie_id] - 1
+        return None
+
+    def at(self, position: int) -> int:
+        if 0 <= position < len(self._ids):
+            return self._ids[position]
+        return None
+
+    def first(self) -> int:
+        return self.at(0)
+
+    def last(self) -> int:
+        return self.at(len(self._ids) - 1)
+
+    def previous(self, movie_id: int) -> int:
+        position = self.position(movie_id)
+        return None if position is None else self.at(position - 1)
+
+    def next(self, movie_id: int) -> int:
+        position = self.position(movie_id)
+        return None if position is None else self.at(position + 1)
+
+    def number_of_pages(self, per_page: int) -> int:
+        return -(-len(self._ids) // per_page)
+
+    def page(self, number: int, per_page: int):
+        # Returns the ids on page number, counting pages from 1, or an empty array if there's no such page.
+        if number < 1:
+            return array('I')
+        return self._ids[(number - 1) * per_page:number * per_page]
+
+    def page_of(self, movie_id: int, per_page: int) -> int:
+        # Returns the number of the page that the movie is on, or None if the movie isn't in the index.
+        position = self.position(movie_id)
+        return None if position is None else position // per_page + 1
@@ -1,6 +1,7 @@
 import abc
 from typing import List
 
+from movies.adapters.rank_index import RankIndex
 from movies.domain.model import Movie, Genre, Director, Actor, Review, User
 
 repo_instance = None
@@ -12,6 +13,14 @@ class RepositoryException(Exception):
         pass
 
 
+def normalize_name(name):
+    # Key by which every repository looks up user, actor, director and genre names, so that lookups ignore surrounding
+    # white space and letter case.
+    if type(name) is not str:
+        return None
+    return name.strip().lower()
+
+
 class AbstractRepository(abc.ABC):
 
     @abc.abstractmethod
@@ -22,10 +31,21 @@ class AbstractRepository(abc.ABC):
     def get_user(self, user_name) -> User:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def update_user(self, user: User):
+        """ Stores changes made to a User returned by get_user, e.g. a new password hash. """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def add_movie(self, movie: Movie):
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def add_movies(self, movies):
+        """ Adds a batch of movies, given as any iterable, e.g. a block of the data file. Movies without an id are given
+        the next ids in turn. The batch is merged into the repository's indexes once, rather than movie by movie. """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_movie(self, id: int) -> Movie:
         raise NotImplementedError
@@ -34,6 +54,23 @@ class AbstractRepository(abc.ABC):
     def get_movies_by_release_year(self, target_release_year: int) -> List[Movie]:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_movie_ids_for_release_year(self, release_year: int):
+        """ Returns the ids of movies released in the given year, in ranking order. The returned sequence must not be
+        modified. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_movies_by_year_range(self, start: int = None, end: int = None, limit: int = None, cursor: int = 0):
+        """ Returns up to limit of the movies released from start to end, both included, ordered by year and then rank,
+        skipping the first cursor of them. Either bound may be None. Costs O(log n + limit), wherever cursor is. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def count_movies_by_year_range(self, start: int = None, end: int = None) -> int:
+        """ Returns the number of movies released from start to end, both included. Either bound may be None. """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_number_of_movies(self):
         raise NotImplementedError
@@ -48,18 +85,40 @@ class AbstractRepository(abc.ABC):
 
     @abc.abstractmethod
     def get_movies_by_id(self, id_list):
+        """ Returns the movies with the ids in id_list, which may be any iterable, in the same order. Ids that aren't in
+        the repository are skipped. """
         raise NotImplementedError
 
     @abc.abstractmethod
     def get_movie_ids_for_actor(self, actor_name: str):
+        """ Returns the ids of movies with the given actor, in ranking order. The returned sequence must not be
+        modified. """
         raise NotImplementedError
 
     @abc.abstractmethod
     def get_movie_ids_for_director(self, director_name: str):
+        """ Returns the ids of movies with the given director, in ranking order. The returned sequence must not be
+        modified. """
         raise NotImplementedError
 
     @abc.abstractmethod
     def get_movie_ids_for_genre(self, genre_name: str):
+        """ Returns the ids of movies with the given genre, in ranking order. The returned sequence must not be
+        modified. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def sort_movie_ids(self, movie_ids, attribute: str, descending: bool = True):
+        """ Returns a list of movie_ids ordered by a numeric attribute ('runtime_minutes', 'rating', 'votes',
+        'revenue_millions' or 'metascore'), highest first unless descending is False. Movies without a value for the
+        attribute come last, and ties keep their order in movie_ids. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def filter_movie_ids(self, movie_ids, attribute: str, minimum=None, maximum=None):
+        """ Returns an iterator over the ids in movie_ids, in the same order, of movies whose numeric attribute is at
+        least minimum and at most maximum. Either bound may be None. Movies without a value for the attribute are left
+        out. """
         raise NotImplementedError
 
     @abc.abstractmethod
@@ -70,6 +129,12 @@ class AbstractRepository(abc.ABC):
     def get_id_of_next_movie(self, movie: Movie):
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_rank_index(self, ordering: str = 'rank') -> RankIndex:
+        """ Returns a RankIndex of every movie in ordering, one of movies.adapters.rank_index.ORDERINGS. The index is
+        built once per catalog version, so it can be used on every request. """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_actors(self) -> List[Actor]:
         raise NotImplementedError
@@ -82,13 +147,79 @@ class AbstractRepository(abc.ABC):
     def get_directors(self) -> List[Director]:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_name_completions(self, prefix: str, limit: int = 10, kinds=None):
+        """ Returns up to limit (kind, name, movie_id) tuples for actors, directors, genres and movie titles with a word
+        starting with prefix. kind is one of 'actor', 'director', 'genre' or 'title', and movie_id is only set for
+        titles. kinds optionally restricts the kinds searched. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def search_movie_ids_by_text(self, query: str, limit: int = 10):
+        """ Returns up to limit (movie_id, score) pairs for the movies whose titles and descriptions best match the words
+        in query, best match first. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_catalog_version(self) -> int:
+        """ Returns a number that changes whenever a movie is added to the repository. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_entity_version(self) -> int:
+        """ Returns a number that changes whenever a new actor, director or genre is added to the repository. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_review_version(self) -> int:
+        """ Returns a number that changes whenever a review is added to the repository. """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def add_review(self, review: Review):
-        if review.user is None or review not in review.user.reviews:
+        if review.user is None or not is_attached(review, review.user.reviews):
             raise RepositoryException('Comment not correctly attached to a User')
-        if review.movie is None or review not in review.movie.reviews:
+        if review.movie is None or not is_attached(review, review.movie.reviews):
             raise RepositoryException('Comment not correctly attached to an Movie')
 
+    @abc.abstractmethod
+    def add_reviews(self, reviews):
+        """ Adds a batch of reviews, given as any iterable, each attached to its user and movie as for add_review.
+        Reviews without an id are given the next ids in turn. Nothing is added if any review isn't attached. """
+        for review in reviews:
+            AbstractRepository.add_review(self, review)
+
     @abc.abstractmethod
     def get_reviews(self):
         raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_review(self, review_id: int) -> Review:
+        """ Returns the Review with id review_id, or None if there is no such review. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_reviews_for_movie(self, movie_id: int, limit: int = None, after: int = None, before: int = None):
+        """ Returns up to limit of the movie's reviews, oldest first. If after is the id of a review, they are the first
+        reviews posted after it, or if before is, the last reviews posted before it; otherwise they are the movie's
+        first reviews. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_reviews_for_user(self, user_name: str, limit: int = None, after: int = None, before: int = None):
+        """ Returns up to limit of the user's reviews, paged in the same way as get_reviews_for_movie. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def count_reviews_for_movie(self, movie_id: int) -> int:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def count_reviews_for_user(self, user_name: str) -> int:
+        raise NotImplementedError
+
+
+def is_attached(review: Review, reviews: List[Review]) -> bool:
+    # A review is attached as it's made, so it's normally the last in the list. Compare identities from the end rather
+    # than testing membership, which compares every review in the list.
+    return any(attached is review for attached in reversed(reviews))
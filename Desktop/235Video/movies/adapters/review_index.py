@@ -0,0 +1,121 @@
+from array import array
+
+from movies.domain.model import Review
+
+
+class ReviewIndex:
+    """ Reviews stored by id, with per-movie and per-user indexes ordered by (timestamp, id).
+
+    Each index is an array of review ids, so it costs four bytes per review, and its length is the count of reviews for
+    that movie or user. Pages are read by keyset: the reviews after (or before) a given review are found by binary search
+    on its (timestamp, id) key, so a page costs O(log n + page size) however many reviews there are, and pages stay
+    stable while new reviews arrive. Reviews normally arrive in timestamp order, which makes adding one an append.
+
+    Reviews are looked up by id in a dict, as reviews that already have ids, e.g. ones read back from storage, needn't
+    be numbered in the order they're added. A review without an id is given one more than the highest so far.
+    """
+
+    def __init__(self):
+        self._reviews = list()
+        self._by_id = dict()
+        self._next_id = 1
+        self._by_movie = dict()
+        self._by_user = dict()
+
+    def __len__(self):
+        return len(self._reviews)
+
+    def __iter__(self):
+        return iter(self._reviews)
+
+    def add(self, review: Review, user_key: str):
+        # Gives the review the next id, and indexes it under its movie and under user_key, the normalised user name.
+        self._store(review)
+        self._insert(self._by_movie.setdefault(review.movie.id, array('I')), review.id)
+        self._insert(self._by_user.setdefault(user_key, array('I')), review.id)
+
+    def add_all(self, reviews_and_user_keys):
+        # Adds a batch of (review, user_key) pairs, merging the batch into each movie and user index it touches once.
+        # An index is extended when the batch's reviews for it all come after its last review, as they usually do,
+        # and otherwise re-sorted.
+        by_movie = dict()
+        by_user = dict()
+        for review, user_key in reviews_and_user_keys:
+            self._store(review)
+            by_movie.setdefault(review.movie.id, list()).append(review.id)
+            by_user.setdefault(user_key, list()).append(review.id)
+
+        for indexes, new_ids in [(self._by_movie, by_movie), (self._by_user, by_user)]:
+            for key, review_ids in new_ids.items():
+                index = indexes.setdefault(key, array('I'))
+                review_ids.sort(key=self._key)
+                in_order = len(index) == 0 or self._key(index[-1]) < self._key(review_ids[0])
+                index.extend(review_ids)
+                if not in_order:
+                    indexes[key] = array('I', sorted(index, key=self._key))
+
+    def get(self, review_id: int) -> Review:
+        return self._by_id.get(review_id)
+
+    def count_for_movie(self, movie_id: int) -> int:
+        return len(self._by_movie.get(movie_id, ()))
+
+    def count_for_user(self, user_key: str) -> int:
+        return len(self._by_user.get(user_key, ()))
+
+    def for_movie(self, movie_id: int, limit: int = None, after: int = None, before: int = None):
+        return self._page(self._by_movie.get(movie_id, ()), limit, after, before)
+
+    def for_user(self, user_key: str, limit: int = None, after: int = None, before: int = None):
+        return self._page(self._by_user.get(user_key, ()), limit, after, before)
+
+    def _store(self, review: Review):
+        # Numbers the review if it has no id, and refuses it if another review has its id.
+        if review.id is None:
+            review.add_id(self._next_id)
+        elif review.id in self._by_id:
+            raise ValueError(f'A review with id {review.id} is already stored')
+        self._reviews.append(review)
+        self._by_id[review.id] = review
+        self._next_id = max(self._next_id, review.id + 1)
+
+    def _key(self, review_id: int):
+        return self._by_id[review_id].timestamp, review_id
+
+    def _bisect(self, review_ids, key, right: bool) -> int:
+        # Returns the position of key in review_ids, which are ordered by _key: the first position whose key is
+        # greater than key if right is True, otherwise the first whose key is greater than or equal to it.
+        low, high = 0, len(review_ids)
+        while low < high:
+            middle = (low + high) // 2
+            middle_key = self._key(review_ids[middle])
+            if middle_key < key or (right and middle_key == key):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _insert(self, review_ids: array, review_id: int):
+        key = self._key(review_id)
+        if len(review_ids) == 0 or self._key(review_ids[-1]) < key:
+            review_ids.append(review_id)
+        else:
+            review_ids.insert(self._bisect(review_ids, key, True), review_id)
+
+    def _page(self, review_ids, limit, after, before):
+        # Returns up to limit reviews, oldest first: the first ones after the review with id after, or the last ones
+        # before the review with id before, or else the first ones. Unknown ids are ignored.
+        after = after if after is not None and self.get(after) is not None else None
+        before = before if before is not None and self.get(before) is not None else None
+        start, end = 0, len(review_ids)
+        if after is not None:
+            start = self._bisect(review_ids, self._key(after), True)
+        if before is not None:
+            end = max(self._bisect(review_ids, self._key(before), False), start)
+
+        if limit is not None:
+            if before is not None and after is None:
+                start = max(start, end - limit)
+            else:
+                end = min(end, start + limit)
+        return [self._by_id[review_id] for review_id in review_ids[start:end]]
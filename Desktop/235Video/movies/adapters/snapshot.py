@@ -0,0 +1,144 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+# A snapshot file is the magic number, the length of a JSON table of contents, the table of contents, and then the raw
+# bytes of each section. The table of contents maps each section name to its array typecode, offset and length, and
+# sections start on 8 byte boundaries. Sections are arrays of fixed-size numbers in native byte order, so loading one
+# is a single copy out of the memory-mapped file.
+MAGIC = b'235SNAP\x03'
+_HEADER = struct.Struct('<8sQ')
+_ALIGNMENT = 8
+
+# Stands in for a missing string (e.g. a movie without a description) in columns of string ids.
+NO_STRING = 0xffffffff
+
+
+class SnapshotException(Exception):
+    pass
+
+
+class StringTable:
+    """ Interns strings to ids, so that a name shared by many movies is stored once. The table is written as the UTF-8
+    encoding of all the strings joined together and an array of offsets, where string i spans characters offsets[i]
+    to offsets[i + 1] of the decoded text. """
+
+    def __init__(self):
+        self._ids = dict()
+        self._offsets = array('Q', [0])
+        self._length = 0
+
+    def id(self, string):
+        if string is None:
+            return NO_STRING
+        string_id = self._ids.get(string)
+        if string_id is None:
+            string_id = self._ids[string] = len(self._ids)
+            self._length += len(string)
+            self._offsets.append(self._length)
+        return string_id
+
+    def ids(self, strings):
+        return array('I', [self.id(string) for string in strings])
+
+    def sections(self):
+        return {'string_offsets': self._offsets, 'string_text': array('B', ''.join(self._ids).encode('utf-8'))}
+
+
+class StringReader:
+    """ Reads strings from the string table of a loaded snapshot. The text is decoded in one go, and each string is
+    then a slice of it. """
+
+    def __init__(self, sections):
+        self._offsets = sections['string_offsets']
+        self._text = str(sections['string_text'], 'utf-8')
+
+    def __getitem__(self, string_id):
+        if string_id == NO_STRING:
+            return None
+        return self._text[self._offsets[string_id]:self._offsets[string_id + 1]]
+
+    def strings(self, string_ids):
+        return [self[string_id] for string_id in string_ids]
+
+
+def ragged_sections(name, sequences, typecode='I'):
+    # Stores a list of variable-length sequences as the concatenation of the sequences and an array of offsets, where
+    # sequence i spans offsets[i] to offsets[i + 1].
+    offsets = array('Q', [0])
+    values = array(typecode)
+    for sequence in sequences:
+        values.extend(sequence)
+        offsets.append(len(values))
+    return {name + '_offsets': offsets, name: values}
+
+
+def ragged_slices(sections, name):
+    # Yields the sequences stored by ragged_sections, as arrays.
+    offsets = sections[name + '_offsets']
+    values = sections[name]
+    for i in range(len(offsets) - 1):
+        yield values[offsets[i]:offsets[i + 1]]
+
+
+def write_snapshot(filename: str, sections):
+    # Writes the sections, a dict of names to arrays, to filename. The file is written to a temporary name first and
+    # then renamed, so that a process starting up never maps a partly written snapshot.
+    contents = dict()
+    offset = 0
+    for name, section in sections.items():
+        contents[name] = [section.typecode, offset, len(section) * section.itemsize]
+        offset += _aligned(len(section) * section.itemsize)
+
+    toc = json.dumps({'byteorder': sys.byteorder, 'sections': contents}).encode('utf-8')
+    data_start = _aligned(_HEADER.size + len(toc))
+
+    temporary_filename = filename + '.tmp'
+    with open(temporary_filename, 'wb') as outfile:
+        outfile.write(_HEADER.pack(MAGIC, len(toc)))
+        outfile.write(toc)
+        outfile.write(bytes(data_start - _HEADER.size - len(toc)))
+        for section in sections.values():
+            section.tofile(outfile)
+            outfile.write(bytes(_aligned(len(section) * section.itemsize) - len(section) * section.itemsize))
+    os.replace(temporary_filename, filename)
+
+
+def read_snapshot(filename: str):
+    # Memory-maps filename and returns its sections as a dict of names to arrays.
+    if os.path.getsize(filename) < _HEADER.size:
+        raise SnapshotException(f'{filename} is not a snapshot')
+
+    with open(filename, 'rb') as infile, mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        magic, toc_length = _HEADER.unpack_from(mapped)
+        if magic != MAGIC:
+            raise SnapshotException(f'{filename} is not a snapshot')
+
+        toc = json.loads(str(mapped[_HEADER.size:_HEADER.size + toc_length], 'utf-8'))
+        if toc['byteorder'] != sys.byteorder:
+            raise SnapshotException(f'{filename} was written on a machine with a different byte order')
+
+        data_start = _aligned(_HEADER.size + toc_length)
+        sections = dict()
+        with memoryview(mapped) as view:
+            for name, (typecode, offset, length) in toc['sections'].items():
+                section = array(typecode)
+                section.frombytes(view[data_start + offset:data_start + offset + length])
+                sections[name] = section
+
+    return sections
+
+
+def is_newer(filename: str, than_filename: str):
+    # Returns whether filename exists and was modified after than_filename.
+    try:
+        return os.path.getmtime(filename) > os.path.getmtime(than_filename)
+    except OSError:
+        return False
+
+
+def _aligned(size):
+    return (size + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
@@ -0,0 +1,648 @@
+import json
+import math
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from heapq import nlargest
+from typing import List
+
+from movies.adapters.attributes import ATTRIBUTES, is_missing
+from movies.adapters.ingestion import IngestionStats, ingest_movies
+from movies.adapters.postings import new_posting_list
+from movies.adapters.prefix_index import keys_for_name, normalize_key
+from movies.adapters.rank_index import RankIndex
+from movies.adapters.repository import AbstractRepository, RepositoryException, normalize_name
+from movies.adapters.text_index import B, K1, term_frequencies, tokenize
+from movies.adapters.year_index import YearIndex
+from movies.domain.model import Actor, Director, EntityRegistry, Genre, Movie, Review, User
+
+# Each connection keeps this many compiled statements, which covers every statement below, so after the first use a
+# statement is bound and run without being parsed again.
+CACHED_STATEMENTS = 256
+
+# Connections kept open between uses. More threads than this can use the repository at once; the extra connections
+# are closed when they're handed back.
+POOL_SIZE = 8
+
+# Sorts after every character that can appear in a name key, as in PrefixIndex.
+_KEY_END = '\U0010ffff'
+
+_EPOCH = datetime(1970, 1, 1)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS movies (
+    id INTEGER PRIMARY KEY,
+    title TEXT,
+    release_year INTEGER,
+    description TEXT,
+    director_id INTEGER,
+    runtime_minutes INTEGER,
+    rating REAL,
+    votes INTEGER,
+    revenue_millions REAL,
+    metascore INTEGER,
+    text_length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS movies_by_title ON movies (title, release_year);
+CREATE INDEX IF NOT EXISTS movies_by_release_year ON movies (release_year, id);
+CREATE INDEX IF NOT EXISTS movies_by_director ON movies (director_id, id);
+
+CREATE TABLE IF NOT EXISTS actors (id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, name TEXT);
+CREATE TABLE IF NOT EXISTS directors (id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, name TEXT);
+CREATE TABLE IF NOT EXISTS genres (id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, name TEXT);
+
+CREATE TABLE IF NOT EXISTS movie_actors (
+    actor_id INTEGER NOT NULL,
+    movie_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (actor_id, movie_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS movie_actors_by_movie ON movie_actors (movie_id, position);
+
+CREATE TABLE IF NOT EXISTS movie_genres (
+    genre_id INTEGER NOT NULL,
+    movie_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (genre_id, movie_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS movie_genres_by_movie ON movie_genres (movie_id, position);
+
+CREATE TABLE IF NOT EXISTS name_keys (key TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL, ref INTEGER);
+CREATE INDEX IF NOT EXISTS name_keys_by_key ON name_keys (key, kind, name, ref);
+
+CREATE TABLE IF NOT EXISTS text_postings (
+    term TEXT NOT NULL,
+    movie_id INTEGER NOT NULL,
+    frequency INTEGER NOT NULL,
+    PRIMARY KEY (term, movie_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS users (user_key TEXT PRIMARY KEY, user_name TEXT, password TEXT) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    movie_id INTEGER NOT NULL,
+    user_key TEXT,
+    review_text TEXT,
+    timestamp INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_by_movie ON reviews (movie_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS reviews_by_user ON reviews (user_key, timestamp, id);
+
+INSERT OR IGNORE INTO meta (key, value) VALUES
+    ('movies', 0), ('catalog_version', 0), ('entity_version', 0), ('text_length', 0);
+"""
+
+GET_META = 'SELECT value FROM meta WHERE key = ?'
+ADD_TO_META = 'UPDATE meta SET value = value + ? WHERE key = ?'
+
+NEXT_MOVIE_ID = 'SELECT coalesce(max(id), 0) + 1 FROM movies'
+INSERT_MOVIE = """
+INSERT INTO movies (id, title, release_year, description, director_id, runtime_minutes, rating, votes, revenue_millions,
+                    metascore, text_length)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+INSERT_MOVIE_ACTOR = 'INSERT OR IGNORE INTO movie_actors (actor_id, movie_id, position) VALUES (?, ?, ?)'
+INSERT_MOVIE_GENRE = 'INSERT OR IGNORE INTO movie_genres (genre_id, movie_id, position) VALUES (?, ?, ?)'
+INSERT_NAME_KEY = 'INSERT INTO name_keys (key, kind, name, ref) VALUES (?, ?, ?, ?)'
+INSERT_TEXT_POSTING = 'INSERT INTO text_postings (term, movie_id, frequency) VALUES (?, ?, ?)'
+
+# Movies are read by a JSON array of ids, so that one prepared statement serves any number of them, and come back in
+# the order of the array.
+SELECT_MOVIES = """
+SELECT m.id, m.title, m.release_year, m.description, m.director_id, d.name, m.runtime_minutes, m.rating, m.votes,
+       m.revenue_millions, m.metascore
+FROM json_each(?) AS j
+JOIN movies AS m ON m.id = j.value
+LEFT JOIN directors AS d ON d.id = m.director_id
+ORDER BY j.key
+"""
+SELECT_MOVIE_ACTORS = """
+SELECT ma.movie_id, a.name FROM movie_actors AS ma JOIN actors AS a ON a.id = ma.actor_id
+WHERE ma.movie_id IN (SELECT value FROM json_each(?))
+ORDER BY ma.movie_id, ma.position
+"""
+SELECT_MOVIE_GENRES = """
+SELECT mg.movie_id, g.name FROM movie_genres AS mg JOIN genres AS g ON g.id = mg.genre_id
+WHERE mg.movie_id IN (SELECT value FROM json_each(?))
+ORDER BY mg.movie_id, mg.position
+"""
+SELECT_IDS_FOR_RELEASE_YEAR = 'SELECT id FROM movies WHERE release_year = ? ORDER BY id'
+SELECT_YEARS_AND_IDS = 'SELECT release_year, id FROM movies WHERE release_year IS NOT NULL ORDER BY release_year, id'
+SELECT_IDS_FOR_RELEASE_YEAR_BY_TITLE = 'SELECT id FROM movies WHERE release_year = ? ORDER BY title, release_year'
+SELECT_IDS_FOR_ACTOR = """
+SELECT ma.movie_id FROM actors AS a JOIN movie_actors AS ma ON ma.actor_id = a.id WHERE a.key = ? ORDER BY ma.movie_id
+"""
+SELECT_IDS_FOR_DIRECTOR = """
+SELECT m.id FROM directors AS d JOIN movies AS m ON m.director_id = d.id WHERE d.key = ? ORDER BY m.id
+"""
+SELECT_IDS_FOR_GENRE = """
+SELECT mg.movie_id FROM genres AS g JOIN movie_genres AS mg ON mg.genre_id = g.id WHERE g.key = ? ORDER BY mg.movie_id
+"""
+
+# The orderings of RankIndex, each putting ties in rank order as the memory repository's do.
+SELECT_RANK_ORDER = {
+    'rank': 'SELECT id FROM movies ORDER BY id',
+    'rating': 'SELECT id FROM movies ORDER BY rating IS NULL, rating DESC, id',
+    'year': 'SELECT id FROM movies ORDER BY release_year IS NULL, release_year DESC, id',
+    'title': 'SELECT id FROM movies ORDER BY title, release_year, id',
+}
+
+# Sorts keep ties in the order of the given ids, and put movies without a value last.
+SORT_MOVIE_IDS = {
+    (attribute, descending): f"""
+SELECT j.value FROM json_each(?) AS j LEFT JOIN movies AS m ON m.id = j.value
+ORDER BY m.{attribute} IS NULL, m.{attribute} {'DESC' if descending else 'ASC'}, j.key
+""" for attribute in ATTRIBUTES for descending in (True, False)}
+FILTER_MOVIE_IDS = {attribute: f"""
+SELECT j.value FROM json_each(?1) AS j JOIN movies AS m ON m.id = j.value
+WHERE m.{attribute} IS NOT NULL AND (?2 IS NULL OR m.{attribute} >= ?2) AND (?3 IS NULL OR m.{attribute} <= ?3)
+ORDER BY j.key
+""" for attribute in ATTRIBUTES}
+
+ENTITY_TABLES = {'actor': 'actors', 'director': 'directors', 'genre': 'genres'}
+INSERT_ENTITY = {kind: f'INSERT OR IGNORE INTO {table} (key, name) VALUES (?, ?)'
+                 for kind, table in ENTITY_TABLES.items()}
+SELECT_ENTITY_ID = {kind: f'SELECT id FROM {table} WHERE key = ?' for kind, table in ENTITY_TABLES.items()}
+SELECT_ENTITY_NAMES = {kind: f'SELECT name FROM {table} ORDER BY id' for kind, table in ENTITY_TABLES.items()}
+
+SELECT_NAME_KEYS = """
+SELECT kind, name, ref FROM name_keys WHERE key >= ? AND key < ? ORDER BY key, kind, name, ref
+"""
+SELECT_NAME_KEYS_OF_KINDS = """
+SELECT kind, name, ref FROM name_keys WHERE key >= ? AND key < ? AND kind IN (SELECT value FROM json_each(?))
+ORDER BY key, kind, name, ref
+"""
+SELECT_TEXT_POSTINGS = """
+SELECT p.movie_id, p.frequency, m.text_length FROM text_postings AS p JOIN movies AS m ON m.id = p.movie_id
+WHERE p.term = ?
+"""
+
+INSERT_USER = 'INSERT OR REPLACE INTO users (user_key, user_name, password) VALUES (?, ?, ?)'
+UPDATE_USER = 'UPDATE users SET password = ? WHERE user_key = ?'
+SELECT_USER = 'SELECT user_name, password FROM users WHERE user_key = ?'
+SELECT_USERS = 'SELECT user_key, user_name, password FROM users WHERE user_key IN (SELECT value FROM json_each(?))'
+
+INSERT_REVIEW = 'INSERT INTO reviews (id, movie_id, user_key, review_text, timestamp) VALUES (?, ?, ?, ?, ?)'
+REVIEW_COLUMNS = 'id, movie_id, user_key, review_text, timestamp'
+SELECT_REVIEWS = f'SELECT {REVIEW_COLUMNS} FROM reviews ORDER BY id'
+SELECT_REVIEW = f'SELECT {REVIEW_COLUMNS} FROM reviews WHERE id = ?'
+SELECT_REVIEW_KEY = 'SELECT timestamp, id FROM reviews WHERE id = ?'
+SELECT_REVIEW_VERSION = 'SELECT coalesce(max(id), 0) FROM reviews'
+COUNT_REVIEWS = {column: f'SELECT count(*) FROM reviews WHERE {column} = ?' for column in ('movie_id', 'user_key')}
+
+
+class SqliteRepository(AbstractRepository):
+    """ Repository kept in a SQLite database file, so that it survives restarts and can be shared by several processes.
+
+    Actors, directors and genres are tables of their own, joined to movies by tables keyed by (entity, movie), so the
+    movie ids for a name come from an index in ranking order, as the memory repository's posting lists do. Reviews are
+    indexed by (movie, timestamp, id) and (user, timestamp, id) and paged by keyset. Name completions and full-text
+    search read key and term tables laid out like PrefixIndex and TextIndex, and return the same results.
+
+    The database runs in WAL mode, so readers don't wait for a writer. Connections are pooled: each operation borrows
+    one for its own thread, and hands it back afterwards with its prepared statements still compiled. The pool is
+    shared by every thread, rather than holding a connection per thread, because Flask's development server runs each
+    request on a new thread. A connection per thread would then be opened, and its statements compiled, for every
+    request. A borrowed connection is only used by one thread at a time, which is what makes check_same_thread=False
+    safe. Movies, users and reviews are read into new domain objects on every call, so state that isn't stored, such
+    as watchlists, doesn't persist.
+    """
+
+    def __init__(self, filename: str, pool_size: int = POOL_SIZE):
+        self._filename = filename
+        self._pool = queue.LifoQueue()
+        self._pool_size = pool_size
+        self._entities = dict()
+        self._entities_lock = threading.Lock()
+        self._rank_indexes = dict()
+        self._indexes_lock = threading.Lock()
+        self._year_index = None
+        with self._connection() as connection:
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.executescript(SCHEMA)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    @contextmanager
+    def _connection(self):
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            # Transactions are begun explicitly, so the connection is in autocommit mode otherwise.
+            connection = sqlite3.connect(self._filename, timeout=10, isolation_level=None, check_same_thread=False,
+                                         cached_statements=CACHED_STATEMENTS)
+            connection.execute('PRAGMA synchronous = NORMAL')
+        try:
+            yield connection
+        finally:
+            if self._pool.qsize() < self._pool_size:
+                self._pool.put(connection)
+            else:
+                connection.close()
+
+    @contextmanager
+    def _transaction(self):
+        # Takes the write lock up front, so that ids read in the transaction can't be taken by another process.
+        with self._connection() as connection:
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield connection
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+
+    def _query(self, sql: str, parameters=()):
+        with self._connection() as connection:
+            return connection.execute(sql, parameters).fetchall()
+
+    def _value(self, sql: str, parameters=()):
+        with self._connection() as connection:
+            return connection.execute(sql, parameters).fetchone()[0]
+
+    def add_user(self, user: User):
+        with self._transaction() as connection:
+            connection.execute(INSERT_USER, (normalize_name(user.user_name), user.user_name, user.password))
+
+    def update_user(self, user: User):
+        with self._transaction() as connection:
+            connection.execute(UPDATE_USER, (user.password, normalize_name(user.user_name)))
+
+    def get_user(self, user_name) -> User:
+        rows = self._query(SELECT_USER, (normalize_name(user_name),))
+        if len(rows) == 0:
+            return None
+        return User(*rows[0])
+
+    def add_movie(self, movie: Movie):
+        self.add_movies([movie])
+
+    def add_movies(self, movies):
+        # Adds the batch in one transaction, so the database file is synced once for the whole batch.
+        movies = list(movies)
+        with self._transaction() as connection:
+            next_id = connection.execute(NEXT_MOVIE_ID).fetchone()[0]
+            new_entities = 0
+            text_length = 0
+            for movie in movies:
+                if movie.id is None:
+                    movie.add_id(next_id)
+                next_id = max(next_id, movie.id + 1)
+
+                director_id = None
+                if movie.director is not None:
+                    director_id, added = self._entity_id(connection, 'director', movie.director.director_full_name)
+                    new_entities += added
+
+                frequencies = term_frequencies(movie.title, movie.description)
+                length = sum(frequencies.values())
+                text_length += length
+                try:
+                    connection.execute(INSERT_MOVIE, (
+                        movie.id, movie.title, movie.release_year, movie.description, director_id,
+                        *(_stored_attribute(movie, attribute) for attribute in ATTRIBUTES), length))
+                except sqlite3.IntegrityError:
+                    raise RepositoryException(f'Movie {movie.id} is already in the repository')
+
+                for position, genre in enumerate(movie.genres):
+                    genre_id, added = self._entity_id(connection, 'genre', genre.genre_name)
+                    connection.execute(INSERT_MOVIE_GENRE, (genre_id, movie.id, position))
+                    new_entities += added
+                for position, actor in enumerate(movie.actors):
+                    actor_id, added = self._entity_id(connection, 'actor', actor.actor_full_name)
+                    connection.execute(INSERT_MOVIE_ACTOR, (actor_id, movie.id, position))
+                    new_entities += added
+
+                _add_name_keys(connection, 'title', movie.title, movie.id)
+                connection.executemany(INSERT_TEXT_POSTING, (
+                    (term, movie.id, min(frequency, 0xffff)) for term, frequency in frequencies.items()))
+
+            connection.execute(ADD_TO_META, (len(movies), 'movies'))
+            connection.execute(ADD_TO_META, (len(movies), 'catalog_version'))
+            connection.execute(ADD_TO_META, (new_entities, 'entity_version'))
+            connection.execute(ADD_TO_META, (text_length, 'text_length'))
+
+    def _entity_id(self, connection, kind: str, name: str):
+        # Returns the id of the actor, director or genre called name, and 1 if it had to be added or else 0.
+        key = normalize_name(name) or ''
+        cursor = connection.execute(INSERT_ENTITY[kind], (key, name))
+        if cursor.rowcount == 1:
+            _add_name_keys(connection, kind, name, None)
+            return cursor.lastrowid, 1
+        return connection.execute(SELECT_ENTITY_ID[kind], (key,)).fetchone()[0], 0
+
+    def get_movie(self, id: int) -> Movie:
+        movies = self.get_movies_by_id([id])
+        return movies[0] if len(movies) > 0 else None
+
+    def get_movies_by_release_year(self, target_year: int) -> List[Movie]:
+        return self.get_movies_by_id(
+            [movie_id for movie_id, in self._query(SELECT_IDS_FOR_RELEASE_YEAR_BY_TITLE, (target_year,))])
+
+    def get_movie_ids_for_release_year(self, release_year: int):
+        return self._posting_list(SELECT_IDS_FOR_RELEASE_YEAR, release_year)
+
+    def get_movies_by_year_range(self, start: int = None, end: int = None, limit: int = None, cursor: int = 0):
+        return self.get_movies_by_id(self._get_year_index().movie_ids(start, end, limit, cursor))
+
+    def count_movies_by_year_range(self, start: int = None, end: int = None) -> int:
+        return self._get_year_index().count(start, end)
+
+    def _get_year_index(self) -> YearIndex:
+        # Read once per catalog version, as rank indexes are. A LIMIT ... OFFSET query would step over every movie
+        # before the cursor, where the index goes straight to it.
+        version = self.get_catalog_version()
+        with self._indexes_lock:
+            cached = self._year_index
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        index = YearIndex(self._query(SELECT_YEARS_AND_IDS))
+        with self._indexes_lock:
+            self._year_index = (version, index)
+        return index
+
+    def get_number_of_movies(self):
+        return self._value(GET_META, ('movies',))
+
+    def get_first_movie(self):
+        return self.get_movie(self.get_rank_index().first())
+
+    def get_last_movie(self):
+        return self.get_movie(self.get_rank_index().last())
+
+    def get_movies_by_id(self, id_list):
+        ids = json.dumps([id for id in id_list if type(id) is int])
+        registry = EntityRegistry()
+        with self._connection() as connection:
+            rows = connection.execute(SELECT_MOVIES, (ids,)).fetchall()
+            actors = _group_names(connection.execute(SELECT_MOVIE_ACTORS, (ids,)))
+            genres = _group_names(connection.execute(SELECT_MOVIE_GENRES, (ids,)))
+
+        movies = list()
+        for movie_id, title, release_year, description, director_id, director, *attributes in rows:
+            movie = Movie(title or '', release_year or 0)
+            movie.add_id(movie_id)
+            movie.description = description
+            runtime_minutes, movie.rating, movie.votes, movie.revenue_millions, movie.metascore = attributes
+            if runtime_minutes is not None:
+                movie.runtime_minutes = runtime_minutes
+            for genre in genres.get(movie_id, ()):
+                movie.add_genre(registry.genre(genre))
+            if director_id is not None:
+                movie.add_director(registry.director(director))
+            for actor in actors.get(movie_id, ()):
+                movie.add_actor(registry.actor(actor))
+            movies.append(movie)
+        return movies
+
+    def get_movie_ids_for_actor(self, actor_name: str):
+        return self._posting_list(SELECT_IDS_FOR_ACTOR, normalize_name(actor_name))
+
+    def get_movie_ids_for_director(self, director_name: str):
+        return self._posting_list(SELECT_IDS_FOR_DIRECTOR, normalize_name(director_name))
+
+    def get_movie_ids_for_genre(self, genre_name: str):
+        return self._posting_list(SELECT_IDS_FOR_GENRE, normalize_name(genre_name))
+
+    def _posting_list(self, sql: str, key):
+        return new_posting_list(movie_id for movie_id, in self._query(sql, (key,)))
+
+    def sort_movie_ids(self, movie_ids, attribute: str, descending: bool = True):
+        sql = SORT_MOVIE_IDS[attribute, bool(descending)]
+        return [movie_id for movie_id, in self._query(sql, (json.dumps(list(movie_ids)),))]
+
+    def filter_movie_ids(self, movie_ids, attribute: str, minimum=None, maximum=None):
+        rows = self._query(FILTER_MOVIE_IDS[attribute], (json.dumps(list(movie_ids)), minimum, maximum))
+        return (movie_id for movie_id, in rows)
+
+    def get_id_of_previous_movie(self, movie: Movie):
+        return self.get_rank_index().previous(movie.id)
+
+    def get_id_of_next_movie(self, movie: Movie):
+        return self.get_rank_index().next(movie.id)
+
+    def get_rank_index(self, ordering: str = 'rank') -> RankIndex:
+        # Each ordering is read once per catalog version, like the entity lists, so navigating costs a version check.
+        version = self.get_catalog_version()
+        with self._indexes_lock:
+            cached = self._rank_indexes.get(ordering)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        index = RankIndex(movie_id for movie_id, in self._query(SELECT_RANK_ORDER[ordering]))
+        with self._indexes_lock:
+            self._rank_indexes[ordering] = (version, index)
+        return index
+
+    def get_actors(self) -> List[Actor]:
+        return self._get_entities('actor', Actor)
+
+    def get_genres(self) -> List[Genre]:
+        return self._get_entities('genre', Genre)
+
+    def get_directors(self) -> List[Director]:
+        return self._get_entities('director', Director)
+
+    def _get_entities(self, kind: str, entity_class):
+        # The lists are read once per entity version, since every browse page needs them.
+        version = self.get_entity_version()
+        with self._entities_lock:
+            cached = self._entities.get(kind)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        entities = [entity_class(name) for name, in self._query(SELECT_ENTITY_NAMES[kind])]
+        with self._entities_lock:
+            self._entities[kind] = (version, entities)
+        return entities
+
+    def get_name_completions(self, prefix: str, limit: int = 10, kinds=None):
+        # Returns matches in the order PrefixIndex.complete does: by key, then kind, name and ref, each name once.
+        prefix = normalize_key(prefix)
+        if prefix == "" or limit <= 0:
+            return list()
+
+        matches = list()
+        seen = set()
+        with self._connection() as connection:
+            if kinds is None:
+                cursor = connection.execute(SELECT_NAME_KEYS, (prefix, prefix + _KEY_END))
+            else:
+                cursor = connection.execute(
+                    SELECT_NAME_KEYS_OF_KINDS, (prefix, prefix + _KEY_END, json.dumps(list(kinds))))
+            try:
+                for match in cursor:
+                    if match not in seen:
+                        seen.add(match)
+                        matches.append(match)
+                        if len(matches) == limit:
+                            break
+            finally:
+                cursor.close()
+        return matches
+
+    def search_movie_ids_by_text(self, query: str, limit: int = 10):
+        # Scores movies with Okapi BM25 over the stored term frequencies, exactly as TextIndex.search does.
+        with self._connection() as connection:
+            number_of_documents = connection.execute(GET_META, ('movies',)).fetchone()[0]
+            total_length = connection.execute(GET_META, ('text_length',)).fetchone()[0]
+            if number_of_documents == 0 or limit <= 0:
+                return list()
+            postings = [connection.execute(SELECT_TEXT_POSTINGS, (term,)).fetchall() for term in set(tokenize(query))]
+
+        average_length = total_length / number_of_documents
+        scores = dict()
+        for rows in postings:
+            if len(rows) == 0:
+                continue
+            idf = math.log(1 + (number_of_documents - len(rows) + 0.5) / (len(rows) + 0.5))
+            for movie_id, frequency, document_length in rows:
+                length_norm = K1 * (1 - B + B * document_length / average_length)
+                scores[movie_id] = scores.get(movie_id, 0.0) + idf * frequency * (K1 + 1) / (frequency + length_norm)
+
+        return nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+    def get_catalog_version(self) -> int:
+        return self._value(GET_META, ('catalog_version',))
+
+    def get_entity_version(self) -> int:
+        return self._value(GET_META, ('entity_version',))
+
+    def get_review_version(self) -> int:
+        # Reviews are only ever added, so the latest id serves as the version.
+        return self._value(SELECT_REVIEW_VERSION)
+
+    def add_review(self, review: Review):
+        super().add_review(review)
+        with self._transaction() as connection:
+            cursor = connection.execute(INSERT_REVIEW, (
+                review.id, review.movie.id, normalize_name(review.user.user_name), review.review_text,
+                _microseconds(review.timestamp)))
+        if review.id is None:
+            review.add_id(cursor.lastrowid)
+
+    def add_reviews(self, reviews):
+        # Adds the batch with one statement in one transaction, numbering the reviews inside it so that no other
+        # process can take their ids.
+        reviews = list(reviews)
+        super().add_reviews(reviews)
+        with self._transaction() as connection:
+            next_id = connection.execute(SELECT_REVIEW_VERSION).fetchone()[0] + 1
+            for review in reviews:
+                if review.id is None:
+                    review.add_id(next_id)
+                next_id = max(next_id, review.id + 1)
+            connection.executemany(INSERT_REVIEW, (
+                (review.id, review.movie.id, normalize_name(review.user.user_name), review.review_text,
+                 _microseconds(review.timestamp)) for review in reviews))
+
+    def get_reviews(self):
+        return self._reviews(self._query(SELECT_REVIEWS))
+
+    def get_review(self, review_id: int) -> Review:
+        reviews = self._reviews(self._query(SELECT_REVIEW, (review_id,)))
+        return reviews[0] if len(reviews) > 0 else None
+
+    def get_reviews_for_movie(self, movie_id: int, limit: int = None, after: int = None, before: int = None):
+        return self._review_page('movie_id', movie_id, limit, after, before)
+
+    def get_reviews_for_user(self, user_name: str, limit: int = None, after: int = None, before: int = None):
+        return self._review_page('user_key', normalize_name(user_name), limit, after, before)
+
+    def count_reviews_for_movie(self, movie_id: int) -> int:
+        return self._value(COUNT_REVIEWS['movie_id'], (movie_id,))
+
+    def count_reviews_for_user(self, user_name: str) -> int:
+        return self._value(COUNT_REVIEWS['user_key'], (normalize_name(user_name),))
+
+    def _review_page(self, column: str, value, limit, after, before):
+        # Pages as ReviewIndex does, with the (timestamp, id) keys compared in the index. Unknown ids are ignored.
+        with self._connection() as connection:
+            after_key = connection.execute(SELECT_REVIEW_KEY, (after,)).fetchone() if after is not None else None
+            before_key = connection.execute(SELECT_REVIEW_KEY, (before,)).fetchone() if before is not None else None
+
+            conditions = [f'{column} = ?']
+            parameters = [value]
+            if after_key is not None:
+                conditions.append('(timestamp, id) > (?, ?)')
+                parameters.extend(after_key)
+            if before_key is not None:
+                conditions.append('(timestamp, id) < (?, ?)')
+                parameters.extend(before_key)
+
+            # The last reviews before a review are read backwards from it, and turned around.
+            backwards = before_key is not None and after_key is None and limit is not None
+            order = 'timestamp DESC, id DESC' if backwards else 'timestamp, id'
+            parameters.append(-1 if limit is None else limit)
+            rows = connection.execute(
+                f'SELECT {REVIEW_COLUMNS} FROM reviews WHERE {" AND ".join(conditions)} ORDER BY {order} LIMIT ?',
+                parameters).fetchall()
+
+        if backwards:
+            rows.reverse()
+        return self._reviews(rows)
+
+    def _reviews(self, rows):
+        # Makes Reviews of rows, reading each of their movies and users once.
+        movies = {movie.id: movie for movie in self.get_movies_by_id(list({row[1] for row in rows}))}
+        user_keys = json.dumps(list({row[2] for row in rows}))
+        users = {user_key: User(user_name, password)
+                 for user_key, user_name, password in self._query(SELECT_USERS, (user_keys,))}
+
+        reviews = list()
+        for review_id, movie_id, user_key, review_text, timestamp in rows:
+            user = users.get(user_key)
+            if user is None:
+                user = users[user_key] = User(user_key, '')
+            review = Review(user, movies.get(movie_id), review_text, _EPOCH + timedelta(microseconds=timestamp))
+            review.add_id(review_id)
+            reviews.append(review)
+        return reviews
+
+
+def _stored_attribute(movie: Movie, attribute: str):
+    # Missing attributes are stored as NULL, including the values that MovieAttributes treats as missing.
+    value = getattr(movie, attribute)
+    if value is None or is_missing(value, ATTRIBUTES[attribute][1]):
+        return None
+    return value
+
+
+def _add_name_keys(connection, kind: str, name: str, ref):
+    if type(name) is not str or name.strip() == "":
+        return
+    connection.executemany(INSERT_NAME_KEY, ((key, kind, name, ref) for key in keys_for_name(name)))
+
+
+def _group_names(rows):
+    names = dict()
+    for movie_id, name in rows:
+        names.setdefault(movie_id, list()).append(name)
+    return names
+
+
+def _microseconds(timestamp: datetime) -> int:
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+
+def populate(data_path: str, repo: SqliteRepository) -> IngestionStats:
+    # Loads the data file into the database the first time it's opened. After that the movies are already there.
+    movies = repo.get_number_of_movies()
+    if movies > 0:
+        return IngestionStats(movies, 0.0, 0.0)
+    return ingest_movies(os.path.join(data_path, 'Data1000Movies.csv'), repo)
@@ -0,0 +1,126 @@
+import math
+import re
+from array import array
+from heapq import nlargest
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Words in a title say more about a movie than words in its description, so title terms count this many times over.
+TITLE_WEIGHT = 3
+
+# Standard Okapi BM25 parameters.
+K1 = 1.2
+B = 0.75
+
+
+class TextIndex:
+    """ Inverted index over movie titles and descriptions, ranked with Okapi BM25.
+
+    Terms are interned to integer ids, and each term's postings are two parallel arrays: the ids of the movies that
+    contain it ('I') and the weighted term frequency in each ('H'). Document lengths are held in an array indexed by
+    movie id, which assumes ids are dense, as the data file's ranks are: the array costs four bytes for every id up to
+    the largest. The only per-term Python objects are the term string and its two arrays, so the index stays compact
+    with a very large number of descriptions.
+
+    A movie is indexed once. Indexing it again would count its terms twice, so it's refused.
+    """
+
+    def __init__(self):
+        self._term_ids = dict()
+        self._posting_ids = list()
+        self._posting_frequencies = list()
+        self._document_lengths = array('I')
+        self._number_of_documents = 0
+        self._total_length = 0
+
+    @property
+    def number_of_documents(self) -> int:
+        return self._number_of_documents
+
+    @property
+    def number_of_terms(self) -> int:
+        return len(self._term_ids)
+
+    def export(self):
+        # Returns the index's state as plain values, for snapshots: its terms in term id order, the postings arrays of
+        # each term, the document lengths (each one higher, as they're stored) and the number of documents.
+        return list(self._term_ids), self._posting_ids, self._posting_frequencies, self._document_lengths, \
+            self._number_of_documents
+
+    @classmethod
+    def restore(cls, terms, posting_ids, posting_frequencies, document_lengths, number_of_documents):
+        # Rebuilds an index from the values returned by export.
+        index = cls()
+        index._term_ids = {term: term_id for term_id, term in enumerate(terms)}
+        index._posting_ids = list(posting_ids)
+        index._posting_frequencies = list(posting_frequencies)
+        index._document_lengths = document_lengths
+        index._number_of_documents = number_of_documents
+        index._total_length = sum(document_lengths) - number_of_documents
+        return index
+
+    def __contains__(self, movie_id: int):
+        return 0 <= movie_id < len(self._document_lengths) and self._document_lengths[movie_id] > 0
+
+    def add_document(self, movie_id: int, title: str, description: str):
+        if movie_id in self:
+            raise ValueError(f'Movie {movie_id} is already indexed')
+
+        frequencies = term_frequencies(title, description)
+        length = sum(frequencies.values())
+        for term, frequency in frequencies.items():
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = self._term_ids[term] = len(self._posting_ids)
+                self._posting_ids.append(array('I'))
+                self._posting_frequencies.append(array('H'))
+            self._posting_ids[term_id].append(movie_id)
+            self._posting_frequencies[term_id].append(min(frequency, 0xffff))
+
+        if movie_id >= len(self._document_lengths):
+            self._document_lengths.extend([0] * (movie_id + 1 - len(self._document_lengths)))
+        # Lengths are stored one higher than they are, so that 0 can stand for a movie that isn't indexed.
+        self._document_lengths[movie_id] = length + 1
+        self._number_of_documents += 1
+        self._total_length += length
+
+    def search(self, query: str, limit: int = 10):
+        # Returns up to limit (movie_id, score) pairs for the movies that best match query, best first.
+        if self._number_of_documents == 0 or limit <= 0:
+            return list()
+
+        average_length = self._total_length / self._number_of_documents
+        document_lengths = self._document_lengths
+        scores = dict()
+
+        for term in set(tokenize(query)):
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                continue
+
+            movie_ids = self._posting_ids[term_id]
+            frequencies = self._posting_frequencies[term_id]
+            idf = math.log(1 + (self._number_of_documents - len(movie_ids) + 0.5) / (len(movie_ids) + 0.5))
+
+            for movie_id, frequency in zip(movie_ids, frequencies):
+                length_norm = K1 * (1 - B + B * (document_lengths[movie_id] - 1) / average_length)
+                scores[movie_id] = scores.get(movie_id, 0.0) + idf * frequency * (K1 + 1) / (frequency + length_norm)
+
+        # Ties are broken by ranking, i.e. lower movie ids first.
+        return nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+def term_frequencies(title: str, description: str) -> dict:
+    # Returns the weighted frequency of each term in a movie's title and description.
+    frequencies = dict()
+    for term in tokenize(title):
+        frequencies[term] = frequencies.get(term, 0) + TITLE_WEIGHT
+    for term in tokenize(description):
+        frequencies[term] = frequencies.get(term, 0) + 1
+    return frequencies
+
+
+def tokenize(text):
+    if type(text) is not str:
+        return list()
+    return _TOKEN.findall(text.lower())
@@ -0,0 +1,54 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class YearIndex:
+    """ The ids of every movie with a release year, ordered by year and then rank, bucketed by year.
+
+    The ids are one array, with a sorted array of the years that have movies and, for each, the offset at which its
+    movies start. A range of years is found by binary search on the years, which gives the offsets of the first and
+    last movies in the range, so counting the movies in a range costs O(log n) and reading k of them from any position
+    O(log n + k), however many movies and years there are. An index is built once for a catalog version and never
+    changes.
+    """
+
+    def __init__(self, years_and_movie_ids):
+        # Builds the index from (release_year, movie_id) pairs ordered by year and then rank.
+        self._years = array('i')
+        self._offsets = array('I')
+        self._ids = array('I')
+        for year, movie_id in years_and_movie_ids:
+            if len(self._years) == 0 or self._years[-1] != year:
+                self._years.append(year)
+                self._offsets.append(len(self._ids))
+            self._ids.append(movie_id)
+        # The offset after the last year's movies, so that every year's movies end where the next year's start.
+        self._offsets.append(len(self._ids))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def years(self):
+        # Returns the years that have movies, earliest first.
+        return list(self._years)
+
+    def count(self, start: int = None, end: int = None) -> int:
+        begin, stop = self._range(start, end)
+        return stop - begin
+
+    def movie_ids(self, start: int = None, end: int = None, limit: int = None, cursor: int = 0):
+        # Returns up to limit ids of movies released from start to end, both included, skipping the first cursor of
+        # them. Either bound may be None.
+        begin, stop = self._range(start, end)
+        begin = min(begin + max(cursor, 0), stop)
+        if limit is not None:
+            stop = min(stop, begin + limit)
+        return self._ids[begin:stop]
+
+    def _range(self, start, end):
+        # Returns the offsets of the first movie released in or after start and of the first released after end.
+        first = 0 if start is None else bisect_left(self._years, start)
+        last = len(self._years) if end is None else bisect_right(self._years, end)
+        if last <= first:
+            return 0, 0
+        return self._offsets[first], self._offsets[last]
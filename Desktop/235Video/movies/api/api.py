@@ -0,0 +1,124 @@
+from flask import Blueprint, Response, jsonify, request, url_for
+
+import movies.adapters.repository as repo
+import movies.api.services as services
+import movies.showcase.services as showcase_services
+from movies.showcase.pagination import CURSOR, Page, PageUrls
+
+# Configure Blueprint.
+api_blueprint = Blueprint(
+    'api_bp', __name__, url_prefix='/api')
+
+# Number of movies, reviews or names in a page of results unless the limit query parameter asks for fewer or more, and
+# the most it can ask for.
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+@api_blueprint.errorhandler(services.UnknownFieldException)
+def unknown_field(e):
+    return jsonify(error=f'Unknown field "{e}"', fields=list(services.MOVIE_FIELDS)), 400
+
+
+@api_blueprint.errorhandler(showcase_services.NonExistentMovieException)
+def non_existent_movie(e):
+    return jsonify(error='No such movie'), 404
+
+
+@api_blueprint.route('/movies', methods=['GET'])
+def movies():
+    # Read query parameters.
+    actor_name = request.args.get('actor')
+    director_name = request.args.get('director')
+    genre_name = request.args.get('genre')
+    sort = request.args.get('sort')
+    field_names = request.args.get('fields')
+    limit = get_limit()
+    fields = services.get_fields(field_names)
+
+    if sort not in showcase_services.SORT_ATTRIBUTES:
+        # No (or an unknown) sort query parameter, so list movies in ranking order.
+        sort = None
+
+    # Movie ids in ranking order are ascending, so they're paged by keyset, and sorted ones by offset, as on the
+    # showcase listings.
+    movie_ids = services.get_movie_ids(actor_name, director_name, genre_name, repo.repo_instance)
+    movie_ids = showcase_services.sort_movie_ids(movie_ids, sort, repo.repo_instance)
+    page = get_page(movie_ids, limit, keyset=sort is None)
+
+    urls = PageUrls('api_bp.movies', actor=actor_name, director=director_name, genre=genre_name, cursor=CURSOR,
+                    sort=sort, limit=request.args.get('limit'), fields=field_names)
+    return jsonify(
+        total=page.total,
+        movies=services.get_movies_by_id(page.items, fields, repo.repo_instance),
+        links=get_links(page, urls)
+    )
+
+
+@api_blueprint.route('/movies/<int:movie_id>', methods=['GET'])
+def movie(movie_id):
+    fields = services.get_fields(request.args.get('fields'))
+
+    return jsonify(services.get_movie(movie_id, fields, repo.repo_instance))
+
+
+@api_blueprint.route('/movies/<int:movie_id>/reviews', methods=['GET'])
+def reviews(movie_id):
+    # Read query parameters. Reviews are paged by keyset: the reviews after, or before, the review with a given id.
+    after = request.args.get('after', type=int)
+    before = request.args.get('before', type=int)
+    limit = get_limit()
+
+    reviews_json, has_before, has_after, total = services.get_reviews_for_movie(
+        movie_id, after, before, limit, repo.repo_instance)
+
+    links = {'previous': None, 'next': None}
+    if has_before:
+        links['previous'] = url_for('api_bp.reviews', movie_id=movie_id, before=reviews_json[0]['id'],
+                                    limit=request.args.get('limit'))
+    if has_after:
+        links['next'] = url_for('api_bp.reviews', movie_id=movie_id, after=reviews_json[-1]['id'],
+                                limit=request.args.get('limit'))
+    return jsonify(total=total, reviews=reviews_json, links=links)
+
+
+@api_blueprint.route('/<any(actors, directors, genres):kind>', methods=['GET'])
+def entities(kind):
+    # Names aren't in any order the API could search, so they're paged by offset.
+    limit = get_limit()
+    page = get_page(services.get_entity_names(kind, repo.repo_instance), limit, keyset=False)
+
+    urls = PageUrls('api_bp.entities', kind=kind, cursor=CURSOR, limit=request.args.get('limit'))
+    return jsonify(total=page.total, links=get_links(page, urls), **{kind: page.items})
+
+
+@api_blueprint.route('/export/movies.ndjson', methods=['GET'])
+def export_movies():
+    # Streams the whole catalog, one JSON movie per line. The fields are checked before the response starts, so that
+    # an unknown field is still answered with an error.
+    fields = services.get_fields(request.args.get('fields'))
+
+    return Response(services.export_movies(fields, repo.repo_instance), mimetype='application/x-ndjson')
+
+
+def get_limit() -> int:
+    return min(max(request.args.get('limit', DEFAULT_LIMIT, type=int), 1), MAX_LIMIT)
+
+
+def get_page(items, limit: int, keyset: bool) -> Page:
+    # Reads the page's cursor from the query parameters, as the showcase listings do.
+    after = before = None
+    if keyset:
+        after = request.args.get('after', type=int)
+        before = request.args.get('before', type=int)
+    return Page(items, limit, request.args.get('cursor', type=int), after, before, keyset)
+
+
+def get_links(page: Page, urls: PageUrls):
+    navigation = page.navigation(urls)
+    return {
+        'first': navigation['first_movie_url'],
+        'previous': navigation['prev_movie_url'],
+        'next': navigation['next_movie_url'],
+        'last': navigation['last_movie_url'],
+    }
@@ -0,0 +1,113 @@
+import json
+
+import movies.showcase.services as showcase_services
+import movies.utilities.services as utilities_services
+from movies.adapters.repository import AbstractRepository
+
+# The fields of a movie in the API, each with the function that reads it from the movie's showcase dict. Actors,
+# directors and genres are given by name, and reviews by their number.
+MOVIE_FIELDS = {
+    'id': lambda movie: movie['id'],
+    'title': lambda movie: movie['title'],
+    'release_year': lambda movie: movie['release_year'],
+    'description': lambda movie: movie['description'],
+    'runtime_minutes': lambda movie: movie['runtime_minutes'],
+    'rating': lambda movie: movie['rating'],
+    'votes': lambda movie: movie['votes'],
+    'revenue_millions': lambda movie: movie['revenue_millions'],
+    'metascore': lambda movie: movie['metascore'],
+    'actors': lambda movie: [actor.actor_full_name for actor in movie['actors']],
+    'director': lambda movie: None if movie['director'] is None else movie['director'].director_full_name,
+    'genres': lambda movie: [genre.genre_name for genre in movie['genres']],
+    'number_of_reviews': lambda movie: len(movie['reviews']),
+    'hyperlink': lambda movie: movie['hyperlink'],
+}
+
+# The names of the entities the API lists, and the service that reads the names of each kind.
+ENTITY_NAMES = {
+    'actors': utilities_services.get_actor_names,
+    'directors': utilities_services.get_director_names,
+    'genres': utilities_services.get_genre_names,
+}
+
+# Movies read from the repository at a time by the catalog export. The export holds one batch at a time, so its memory
+# doesn't grow with the catalog.
+EXPORT_BATCH_SIZE = 500
+
+
+class UnknownFieldException(Exception):
+    pass
+
+
+def get_fields(field_names: str = None):
+    # Returns (name, reader) pairs for the movie fields named in the comma separated field_names, or for every field if
+    # field_names is None or empty.
+    if not field_names:
+        return list(MOVIE_FIELDS.items())
+
+    fields = list()
+    for name in field_names.split(','):
+        name = name.strip()
+        if name not in MOVIE_FIELDS:
+            raise UnknownFieldException(name)
+        fields.append((name, MOVIE_FIELDS[name]))
+    return fields
+
+
+def project(movie_dict, fields):
+    # Returns the JSON form of a showcase movie dict, with just the given fields.
+    return {name: read(movie_dict) for name, read in fields}
+
+
+def get_movie(movie_id: int, fields, repo: AbstractRepository):
+    return project(showcase_services.get_movie(movie_id, repo), fields)
+
+
+def get_movies_by_id(id_list, fields, repo: AbstractRepository):
+    return [project(movie_dict, fields) for movie_dict in showcase_services.get_movies_by_id(id_list, repo)]
+
+
+def get_movie_ids(actor_name, director_name, genre_name, repo: AbstractRepository):
+    # Returns the ids of the movies with the actor, director or genre, if one is given, or else of every movie, in
+    # ranking order. Either way the ids are ascending, and are read from an index rather than copied.
+    if actor_name is not None:
+        return showcase_services.get_movie_ids_for_actor(actor_name, repo)
+    if director_name is not None:
+        return showcase_services.get_movie_ids_for_director(director_name, repo)
+    if genre_name is not None:
+        return showcase_services.get_movie_ids_for_genre(genre_name, repo)
+    return repo.get_rank_index()
+
+
+def get_reviews_for_movie(movie_id: int, after: int, before: int, limit: int, repo: AbstractRepository):
+    # Returns a page of the movie's reviews in JSON form, whether there are reviews before and after it, and the number
+    # of reviews the movie has.
+    movie_dict = showcase_services.get_movie(movie_id, repo)
+    reviews = movie_dict['reviews']
+    page = reviews.page(after, before, limit)
+
+    has_before = len(page) > 0 and reviews.has_before(page[0]['id'])
+    has_after = len(page) > 0 and reviews.has_after(page[-1]['id'])
+    return [review_to_json(review) for review in page], has_before, has_after, len(reviews)
+
+
+def review_to_json(review_dict):
+    review_json = dict(review_dict)
+    review_json['timestamp'] = review_dict['timestamp'].isoformat()
+    return review_json
+
+
+def get_entity_names(kind: str, repo: AbstractRepository):
+    return ENTITY_NAMES[kind](repo)
+
+
+def export_movies(fields, repo: AbstractRepository, batch_size: int = EXPORT_BATCH_SIZE):
+    # Yields the whole catalog in ranking order as newline-delimited JSON, a batch of movies per chunk. Movie dicts are
+    # made without memoizing them, so only the current batch is held.
+    rank_index = repo.get_rank_index()
+    for number in range(1, rank_index.number_of_pages(batch_size) + 1):
+        lines = list()
+        for movie in repo.get_movies_by_id(rank_index.page(number, batch_size)):
+            movie_dict = showcase_services.make_movie_dict(movie, repo.count_reviews_for_movie(movie.id), repo)
+            lines.append(json.dumps(project(movie_dict, fields), separators=(',', ':')) + '\n')
+        yield ''.join(lines)
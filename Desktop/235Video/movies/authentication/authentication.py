@@ -1,16 +1,17 @@
-from flask import Blueprint, render_template, redirect, url_for, session, request
+from flask import Blueprint, jsonify, render_template, redirect, url_for, session, request
 
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField
 from wtforms.validators import DataRequired, Length, ValidationError
 
-from password_validator import PasswordValidator
-
 from functools import wraps
 
 import movies.utilities.utilities as utilities
 import movies.authentication.services as services
 import movies.adapters.repository as repo
+import movies.authentication.hashing as hashing
+import movies.authentication.throttling as throttling
+from movies.authentication.validation import PASSWORD_POLICY
 
 # Configure Blueprint.
 authentication_blueprint = Blueprint(
@@ -21,17 +22,31 @@ authentication_blueprint = Blueprint(
 def register():
     form = RegistrationForm()
     user_name_not_unique = None
+    password_error = None
+    status = 200
+    retry_after = 0
 
     if form.validate_on_submit():
         # Successful POST, i.e. the user_name and password have passed validation checking.
-        # Use the service layer to attempt to add the new user.
-        try:
-            services.add_user(form.user_name.data, form.password.data, repo.repo_instance)
-
-            # All is well, redirect the user to the login page.
-            return redirect(url_for('authentication_bp.login'))
-        except services.NameNotUniqueException:
-            user_name_not_unique = 'Your user_name is already taken - please supply another'
+        # Turn the client away if it is sending too many requests, before the password is hashed.
+        retry_after = throttling.throttle_instance.check(request.remote_addr)
+        if retry_after > 0:
+            password_error = too_many_attempts(retry_after)
+            status = 429
+        else:
+            # Use the service layer to attempt to add the new user.
+            try:
+                services.add_user(form.user_name.data, form.password.data, repo.repo_instance)
+
+                # All is well, redirect the user to the login page.
+                return redirect(url_for('authentication_bp.login'))
+            except services.NameNotUniqueException:
+                user_name_not_unique = 'Your user_name is already taken - please supply another'
+
+            except services.HashingBusyException:
+                # The password hashing pool is full, ask the user to try again shortly.
+                password_error = BUSY_MESSAGE
+                status, retry_after = 503, BUSY_RETRY_AFTER
 
     # For a GET or a failed POST request, return the Registration Web page.
     return render_template(
@@ -39,8 +54,9 @@ def register():
         title='Register',
         form=form,
         user_name_error_message=user_name_not_unique,
+        password_error_message=password_error,
         handler_url=url_for('authentication_bp.register'),
-    )
+    ), status, retry_headers(retry_after)
 
 
 @authentication_blueprint.route('/login', methods=['GET', 'POST'])
@@ -48,29 +64,48 @@ def login():
     form = LoginForm()
     user_name_not_recognised = None
     password_does_not_match_user_name = None
+    status = 200
+    retry_after = 0
 
     if form.validate_on_submit():
         # Successful POST, i.e. the user_name and password have passed validation checking.
-        # Use the service layer to lookup the user.
-        try:
-            user = services.get_user(form.user_name.data, repo.repo_instance)
-
-            # Authenticate user.
-            services.authenticate_user(user['user_name'], form.password.data, repo.repo_instance)
-
-            # Initialise session and redirect the user to the home page.
-            session.clear()
-            session['user_name'] = user['user_name']
-            return redirect(url_for('home_bp.home'))
-
-        except services.UnknownUserException:
-            # user_name not known to the system, set a suitable error message.
-            user_name_not_recognised = 'user_name not recognised - please supply another'
-
-        except services.AuthenticationException:
-            # Authentication failed, set a suitable error message.
-            password_does_not_match_user_name = 'Password does not match supplied user_name - please check and try ' \
-                                                'again '
+        # Turn the client away if it is sending too many attempts, or has failed too often with this user_name, before
+        # the password is hashed.
+        throttle = throttling.throttle_instance
+        address = request.remote_addr
+        retry_after = throttle.check(address, form.user_name.data)
+        if retry_after > 0:
+            password_does_not_match_user_name = too_many_attempts(retry_after)
+            status = 429
+        else:
+            # Use the service layer to lookup the user.
+            try:
+                user = services.get_user(form.user_name.data, repo.repo_instance)
+
+                # Authenticate user.
+                services.authenticate_user(user['user_name'], form.password.data, repo.repo_instance)
+
+                # Initialise session and redirect the user to the home page.
+                throttle.record_success(address, form.user_name.data)
+                session.clear()
+                session['user_name'] = user['user_name']
+                return redirect(url_for('home_bp.home'))
+
+            except services.UnknownUserException:
+                # user_name not known to the system, set a suitable error message.
+                throttle.record_failure(address, form.user_name.data)
+                user_name_not_recognised = 'user_name not recognised - please supply another'
+
+            except services.AuthenticationException:
+                # Authentication failed, set a suitable error message.
+                throttle.record_failure(address, form.user_name.data)
+                password_does_not_match_user_name = 'Password does not match supplied user_name - please check and ' \
+                                                    'try again '
+
+            except services.HashingBusyException:
+                # The password hashing pool is full, ask the user to try again shortly.
+                password_does_not_match_user_name = BUSY_MESSAGE
+                status, retry_after = 503, BUSY_RETRY_AFTER
 
     # For a GET or a failed POST, return the Login Web page.
     return render_template(
@@ -80,7 +115,13 @@ def login():
         password_error_message=password_does_not_match_user_name,
         form=form,
         selected_movies=utilities.get_selected_movies(),
-    )
+    ), status, retry_headers(retry_after)
+
+
+@authentication_blueprint.route('/login_stats', methods=['GET'])
+@utilities.diagnostics_only
+def login_stats():
+    return jsonify(hashing=hashing.hasher_instance.stats(), throttle=throttling.throttle_instance.stats())
 
 
 @authentication_blueprint.route('/logout')
@@ -89,6 +130,18 @@ def logout():
     return redirect(url_for('home_bp.home'))
 
 
+BUSY_MESSAGE = 'We are handling a lot of logins right now - please try again in a few seconds'
+BUSY_RETRY_AFTER = 5
+
+
+def too_many_attempts(retry_after):
+    return f'Too many attempts - please try again in {retry_after} seconds'
+
+
+def retry_headers(retry_after):
+    return {'Retry-After': str(retry_after)} if retry_after > 0 else {}
+
+
 def login_required(view):
     @wraps(view)
     def wrapped_view(**kwargs):
@@ -106,13 +159,7 @@ class PasswordValid:
         self.message = message
 
     def __call__(self, form, field):
-        schema = PasswordValidator()
-        schema \
-            .min(8) \
-            .has().uppercase() \
-            .has().lowercase() \
-            .has().digits()
-        if not schema.validate(field.data):
+        if not PASSWORD_POLICY.validate(field.data):
             raise ValidationError(self.message)
 
 
@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_ITERATIONS = 150000
+
+
+class HashingBusyException(Exception):
+    pass
+
+
+class PasswordHasher:
+    """ Hashes and checks passwords with PBKDF2 in a bounded pool of worker processes.
+
+    A hash costs tens of milliseconds of CPU, so a burst of logins run on the request threads would hold up every other
+    request. Here at most max_pending hashes are queued or running at once; a request that finds the pool full waits up
+    to wait seconds for room, and then gets HashingBusyException rather than queueing without limit. With no workers,
+    hashes are computed on the calling thread, within the same limit.
+    """
+
+    def __init__(self, iterations: int = DEFAULT_ITERATIONS, workers: int = 0, max_pending: int = None,
+                 wait: float = 5.0):
+        self.method = f'pbkdf2:sha256:{iterations}'
+        self._workers = workers
+        self._wait = wait
+        self._executor = None
+        self.max_pending = max_pending or 4 * max(workers, 1)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def check(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        # A werkzeug hash starts with the method it was made with, e.g. 'pbkdf2:sha256:150000$salt$hash'.
+        return password_hash.split('$', 1)[0] != self.method
+
+    def stats(self) -> dict:
+        return {
+            'workers': self._workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'peak_pending': self.peak_pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(timeout=self._wait):
+            with self._lock:
+                self.rejected += 1
+            raise HashingBusyException
+
+        try:
+            with self._lock:
+                self.pending += 1
+                self.peak_pending = max(self.peak_pending, self.pending)
+                if self._workers > 0 and self._executor is None:
+                    # The pool is started when it's first needed, so that an app that never hashes doesn't fork.
+                    self._executor = ProcessPoolExecutor(self._workers)
+                executor = self._executor
+
+            if executor is None:
+                return function(*args)
+            return executor.submit(function, *args).result()
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+            self._slots.release()
+
+
+# The hasher used by the authentication services. It hashes on the calling thread until create_app replaces it with one
+# configured from the app's settings.
+hasher_instance = PasswordHasher()
+
+
+def configure(iterations: int, workers: int, max_pending: int = None, wait: float = 5.0):
+    global hasher_instance
+    hasher_instance.close()
+    hasher_instance = PasswordHasher(iterations, workers, max_pending, wait)
+    return hasher_instance
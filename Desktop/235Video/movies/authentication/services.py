@@ -1,6 +1,6 @@
-from werkzeug.security import generate_password_hash, check_password_hash
-
+import movies.authentication.hashing as hashing
 from movies.adapters.repository import AbstractRepository
+from movies.authentication.hashing import HashingBusyException
 from movies.domain.model import User
 
 
@@ -22,8 +22,9 @@ def add_user(user_name: str, password: str, repo: AbstractRepository):
     if user is not None:
         raise NameNotUniqueException
 
-    # Encrypt password so that the database doesn't store passwords 'in the clear'.
-    password_hash = generate_password_hash(password)
+    # Encrypt password so that the database doesn't store passwords 'in the clear'. The hash is computed in the
+    # hasher's worker pool, which raises HashingBusyException when it's full.
+    password_hash = hashing.hasher_instance.hash(password)
 
     # Create and store the new User, with password encrypted.
     user = User(user_name, password_hash)
@@ -41,12 +42,19 @@ def get_user(user_name: str, repo: AbstractRepository):
 def authenticate_user(user_name: str, password: str, repo: AbstractRepository):
     authenticated = False
 
+    hasher = hashing.hasher_instance
     user = repo.get_user(user_name)
     if user is not None:
-        authenticated = check_password_hash(user.password, password)
+        authenticated = hasher.check(user.password, password)
     if not authenticated:
         raise AuthenticationException
 
+    # A hash made at a different cost than the configured one is replaced while the password is at hand, so raising
+    # the cost takes effect for each user at their next login.
+    if hasher.needs_rehash(user.password):
+        user.password = hasher.hash(password)
+        repo.update_user(user)
+
 
 # ===================================================
 # Functions to convert model entities to dictionaries
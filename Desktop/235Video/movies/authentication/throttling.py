@@ -0,0 +1,107 @@
+import math
+import threading
+import time
+
+
+class LoginThrottle:
+    """ Turns away clients that send too many login attempts, before their passwords reach the hasher.
+
+    Each client address has a token bucket that holds up to burst tokens and refills at rate tokens a second. Every
+    attempt takes a token, and an attempt that finds the bucket empty is refused, so a client can't try more than about
+    rate passwords a second, whichever user names it tries. Failed logins are also counted by (user name, address):
+    after max_failures in failure_window seconds, that address can't try that user name again until the window is
+    over. Both are dicts, swept every sweep_interval seconds of buckets that have refilled and failure counts that have
+    expired, so they only hold the clients that are active.
+    """
+
+    def __init__(self, rate: float = 1.0, burst: int = 10, max_failures: int = 5, failure_window: float = 300.0,
+                 sweep_interval: float = 60.0, clock=time.monotonic):
+        self._rate = rate
+        self._burst = burst
+        self._max_failures = max_failures
+        self._failure_window = failure_window
+        self._sweep_interval = sweep_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets = dict()
+        self._failures = dict()
+        self._next_sweep = clock() + sweep_interval
+        self.allowed = 0
+        self.refused = 0
+
+    def check(self, address: str, user_name: str = None) -> int:
+        # Returns 0 and takes a token when the attempt may go ahead, or else the number of seconds until it may be
+        # tried again.
+        now = self._clock()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+            retry_after = 0.0
+            if user_name is not None:
+                failures = self._failures.get((_normalise(user_name), address))
+                if failures is not None and failures[0] >= self._max_failures:
+                    retry_after = failures[1] + self._failure_window - now
+
+            tokens = self._tokens(address, now)
+            if retry_after <= 0 and tokens < 1:
+                retry_after = (1 - tokens) / self._rate
+
+            if retry_after > 0:
+                self.refused += 1
+                return math.ceil(retry_after)
+            self._buckets[address] = [tokens - 1, now]
+            self.allowed += 1
+            return 0
+
+    def record_failure(self, address: str, user_name: str):
+        now = self._clock()
+        key = (_normalise(user_name), address)
+        with self._lock:
+            failures = self._failures.get(key)
+            if failures is None or now - failures[1] >= self._failure_window:
+                # Counts failures in a window that starts at the first one.
+                self._failures[key] = [1, now]
+            else:
+                failures[0] += 1
+
+    def record_success(self, address: str, user_name: str):
+        with self._lock:
+            self._failures.pop((_normalise(user_name), address), None)
+
+    def stats(self) -> dict:
+        return {
+            'allowed': self.allowed,
+            'refused': self.refused,
+            'buckets': len(self._buckets),
+            'failures': len(self._failures),
+        }
+
+    def _tokens(self, address, now):
+        bucket = self._buckets.get(address)
+        if bucket is None:
+            return self._burst
+        return min(self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+
+    def _sweep(self, now):
+        self._buckets = {address: bucket for address, bucket in self._buckets.items()
+                         if self._tokens(address, now) < self._burst}
+        self._failures = {key: failures for key, failures in self._failures.items()
+                          if now - failures[1] < self._failure_window}
+        self._next_sweep = now + self._sweep_interval
+
+
+def _normalise(user_name: str) -> str:
+    # User names are stored stripped and in lower case, so 'Dave' and 'dave ' are the same user.
+    return user_name.strip().lower()
+
+
+# The throttle used by the login and registration views, replaced by create_app with one configured from the app's
+# settings.
+throttle_instance = LoginThrottle()
+
+
+def configure(rate: float, burst: int, max_failures: int, failure_window: float):
+    global throttle_instance
+    throttle_instance = LoginThrottle(rate, burst, max_failures, failure_window)
+    return throttle_instance
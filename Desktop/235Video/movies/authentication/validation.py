@@ -0,0 +1,34 @@
+class PasswordPolicy:
+    """ The password rules for registration, checked in one pass over the password.
+
+    password_validator builds a schema of rules and runs each one over the whole password, compiling a regular expression
+    for some of them on every call. Here the rules are fixed when the policy is made, and one loop over the characters
+    settles them all, stopping as soon as every character rule is met. A character is upper (lower) case when lowering
+    (uppercasing) it changes it, and a digit when it is a Unicode decimal digit, as for password_validator.
+    """
+
+    def __init__(self, min_length: int = 8, uppercase: bool = True, lowercase: bool = True, digits: bool = True):
+        self.min_length = min_length
+        self.uppercase = uppercase
+        self.lowercase = lowercase
+        self.digits = digits
+
+    def validate(self, password: str) -> bool:
+        if type(password) is not str or len(password) < self.min_length:
+            return False
+
+        need_uppercase, need_lowercase, need_digit = self.uppercase, self.lowercase, self.digits
+        for char in password:
+            if not (need_uppercase or need_lowercase or need_digit):
+                break
+            if need_uppercase and char != char.lower():
+                need_uppercase = False
+            if need_lowercase and char != char.upper():
+                need_lowercase = False
+            if need_digit and char.isdecimal():
+                need_digit = False
+        return not (need_uppercase or need_lowercase or need_digit)
+
+
+# The policy applied to new passwords.
+PASSWORD_POLICY = PasswordPolicy(min_length=8, uppercase=True, lowercase=True, digits=True)
@@ -2,6 +2,7 @@ from datetime import datetime
 
 
 class Director:
+    __slots__ = ('__director_full_name',)
 
     def __init__(self, director_full_name: str):
         if director_full_name == "" or type(director_full_name) is not str:
@@ -29,6 +30,7 @@ class Director:
 
 
 class Genre:
+    __slots__ = ('__genre_name',)
 
     def __init__(self, genre_name: str):
         if genre_name == "" or type(genre_name) is not str:
@@ -56,6 +58,8 @@ class Genre:
 
 
 class Actor:
+    # The colleague set and list are only created for actors that use them.
+    __slots__ = ('__actor_full_name', '__actors_this_one_has_worked_with', '__colleagues_list')
 
     def __init__(self, actor_full_name: str):
         if actor_full_name == "" or type(actor_full_name) is not str:
@@ -63,8 +67,8 @@ class Actor:
         else:
             self.__actor_full_name = actor_full_name.strip()
 
-        self.__actors_this_one_has_worked_with = set()
-        self.__colleagues_list = []
+        self.__actors_this_one_has_worked_with = None
+        self.__colleagues_list = None
 
     @property
     def actor_full_name(self) -> str:
@@ -72,14 +76,19 @@ class Actor:
 
     @property
     def colleagues(self) -> list:
+        if self.__colleagues_list is None:
+            self.__colleagues_list = []
         return self.__colleagues_list
 
     def add_actor_colleague(self, colleague):
         if isinstance(colleague, self.__class__):
+            if self.__actors_this_one_has_worked_with is None:
+                self.__actors_this_one_has_worked_with = set()
             self.__actors_this_one_has_worked_with.add(colleague)
 
     def check_if_this_actor_worked_with(self, colleague):
-        return colleague in self.__actors_this_one_has_worked_with
+        return self.__actors_this_one_has_worked_with is not None and \
+            colleague in self.__actors_this_one_has_worked_with
 
     def __repr__(self):
         return f'<Actor {self.__actor_full_name}>'
@@ -97,6 +106,10 @@ class Actor:
 
 
 class Movie:
+    # The review list is only created for movies that are reviewed.
+    __slots__ = ('__title', '__release_year', '__description', '__director', '__actors', '__genres',
+                 '__runtime_minutes', '__rating', '__votes', '__revenue_millions', '__metascore', '__id',
+                 '__hyperlink', '__reviews')
 
     def __set_title_internal(self, title: str):
         if title.strip() == "" or type(title) is not str:
@@ -119,9 +132,13 @@ class Movie:
         self.__actors = []
         self.__genres = []
         self.__runtime_minutes = None
+        self.__rating = None
+        self.__votes = None
+        self.__revenue_millions = None
+        self.__metascore = None
         self.__id = None
         self.__hyperlink = None
-        self.__reviews = list()
+        self.__reviews = None
 
     # essential attributes
 
@@ -189,9 +206,9 @@ class Movie:
             pass
 
     def add_director(self, director: Director):
-        if not isinstance(director, Actor) or director in self.__director:
+        if not isinstance(director, Director):
             return
-        self.__actors.append(director)
+        self.__director = director
 
     @property
     def genres(self) -> list:
@@ -215,6 +232,8 @@ class Movie:
 
     @property
     def reviews(self) -> list:
+        if self.__reviews is None:
+            self.__reviews = list()
         return self.__reviews
 
     def add_id(self, ids: int):
@@ -237,6 +256,50 @@ class Movie:
         else:
             raise ValueError(f'Movie.runtime_minutes setter: Value out of range {val}')
 
+    @property
+    def rating(self) -> float:
+        return self.__rating
+
+    @rating.setter
+    def rating(self, rating: float):
+        if type(rating) in (int, float) and 0 <= rating <= 10:
+            self.__rating = float(rating)
+        else:
+            self.__rating = None
+
+    @property
+    def votes(self) -> int:
+        return self.__votes
+
+    @votes.setter
+    def votes(self, votes: int):
+        if type(votes) is int and votes >= 0:
+            self.__votes = votes
+        else:
+            self.__votes = None
+
+    @property
+    def revenue_millions(self) -> float:
+        return self.__revenue_millions
+
+    @revenue_millions.setter
+    def revenue_millions(self, revenue_millions: float):
+        if type(revenue_millions) in (int, float) and revenue_millions >= 0:
+            self.__revenue_millions = float(revenue_millions)
+        else:
+            self.__revenue_millions = None
+
+    @property
+    def metascore(self) -> int:
+        return self.__metascore
+
+    @metascore.setter
+    def metascore(self, metascore: int):
+        if type(metascore) is int and 0 <= metascore <= 100:
+            self.__metascore = metascore
+        else:
+            self.__metascore = None
+
     def __get_unique_string_rep(self):
         return f"{self.__title}, {self.__release_year}"
 
@@ -257,10 +320,12 @@ class Movie:
         return hash(self.__get_unique_string_rep())
 
     def add_review(self, review):
-        self.__reviews.append(review)
+        self.reviews.append(review)
 
 
 class User:
+    __slots__ = ('__user_name', '__password', '__watched_movies', '__watchlist', '__reviews',
+                 '__time_spent_watching_movies_minutes')
 
     def __init__(self, user_name: str, password: str):
         if user_name == "" or type(user_name) is not str:
@@ -284,6 +349,11 @@ class User:
     def password(self) -> str:
         return self.__password
 
+    @password.setter
+    def password(self, password: str):
+        if password != "" and type(password) is str:
+            self.__password = password
+
     @property
     def watched_movies(self) -> list:
         return self.__watched_movies
@@ -339,8 +409,9 @@ class User:
 
 
 class Review:
+    __slots__ = ('__movie', '__review_text', '__timestamp', '__user', '__id')
 
-    def __init__(self, user: User, movie: Movie, review_text: str):
+    def __init__(self, user: User, movie: Movie, review_text: str, timestamp: datetime = None):
         if isinstance(movie, Movie):
             self.__movie = movie
         else:
@@ -350,8 +421,17 @@ class Review:
         else:
             self.__review_text = None
 
-        self.__timestamp = datetime.now()
+        # A review read back from storage keeps the time it was posted.
+        self.__timestamp = datetime.now() if timestamp is None else timestamp
         self.__user = user
+        self.__id = None
+
+    @property
+    def id(self) -> int:
+        return self.__id
+
+    def add_id(self, ids: int):
+        self.__id = ids
 
     @property
     def movie(self) -> Movie:
@@ -379,6 +459,8 @@ class Review:
 
 
 class WatchList:
+    __slots__ = ('__watch_list', 'n')
+
     def __init__(self):
         self.__watch_list = []
 
@@ -420,6 +502,41 @@ class WatchList:
             raise StopIteration
 
 
+class EntityRegistry:
+    """ Flyweight factory for actors, directors and genres. It hands out one instance per distinct name, so movies
+    that share a person or genre share the object rather than each holding an equal copy. Names are matched the way
+    the entities compare, i.e. after stripping surrounding white space. """
+
+    __slots__ = ('__actors', '__directors', '__genres')
+
+    def __init__(self):
+        self.__actors = dict()
+        self.__directors = dict()
+        self.__genres = dict()
+
+    def actor(self, actor_full_name: str) -> Actor:
+        return _registered(self.__actors, Actor, actor_full_name)
+
+    def director(self, director_full_name: str) -> Director:
+        return _registered(self.__directors, Director, director_full_name)
+
+    def genre(self, genre_name: str) -> Genre:
+        return _registered(self.__genres, Genre, genre_name)
+
+
+def _registered(instances, entity_class, name):
+    # Names are usually already stripped, so the name itself is tried as the key first.
+    instance = instances.get(name)
+    if instance is None:
+        key = (name.strip() or None) if type(name) is str else None
+        instance = instances.get(key)
+        if instance is None:
+            instance = instances[key] = entity_class(name)
+        if name != key:
+            instances[name] = instance
+    return instance
+
+
 def make_review(review_text: str, user: User, movie: Movie):
     review = Review(user, movie, review_text)
     user.add_review(review)
@@ -1,9 +1,11 @@
 from flask import Blueprint
-from flask import request, render_template, redirect, url_for, flash
+from flask import request, render_template, redirect, url_for, flash, jsonify
 from wtforms import Form, StringField, SelectField
 
 import movies.adapters.repository as repo
 import movies.search.services as services
+import movies.showcase.services as showcase_services
+import movies.utilities.utilities as utilities
 
 search_blueprint = Blueprint(
     'search_bp', __name__)
@@ -23,13 +25,18 @@ def search():
 
 @search_blueprint.route('/results')
 def search_results(search, select):
+    if select == "Query":
+        return redirect(url_for('search_bp.query_results', q=search))
+    if select == "Text":
+        return redirect(url_for('search_bp.text_results', q=search))
+
     search = search.title()
     b_exists = services.search_exists(search, select, repo.repo_instance)
     if b_exists:
         if select == "Actor":
             return redirect(url_for('showcase_bp.movies_by_actor', actor=search))
         elif select == "Genre":
-            return redirect(url_for('showcase_bp.movies_by_actor', genre=search))
+            return redirect(url_for('showcase_bp.movies_by_genre', genre=search))
         elif select == "Director":
             return redirect(url_for('showcase_bp.movies_by_director', director=search))
     else:
@@ -37,9 +44,121 @@ def search_results(search, select):
         return redirect(url_for('search_bp.search'))
 
 
+@search_blueprint.route('/autocomplete', methods=['GET'])
+def autocomplete():
+    max_completions = 25
+
+    # Read query parameters.
+    prefix = request.args.get('q', '')
+    limit = min(request.args.get('limit', 10, type=int), max_completions)
+    kinds = request.args.getlist('kind') or None
+
+    completions = services.get_completions(prefix, repo.repo_instance, limit, kinds)
+
+    # Construct the url of the page for each completion.
+    for completion in completions:
+        if completion['kind'] == 'title':
+            completion['url'] = url_for('showcase_bp.movies_by_ranking', id=completion['movie_id'])
+        else:
+            completion['url'] = url_for(_browse_endpoints[completion['kind']], **{completion['kind']: completion['name']})
+
+    return jsonify(completions)
+
+
+_browse_endpoints = {
+    'actor': 'showcase_bp.movies_by_actor',
+    'director': 'showcase_bp.movies_by_director',
+    'genre': 'showcase_bp.movies_by_genre',
+}
+
+
+@search_blueprint.route('/query', methods=['GET'])
+def query_results():
+    results_per_page = 10
+
+    # Read query parameters.
+    query = request.args.get('q')
+    page = max(request.args.get('page', 0, type=int), 0)
+    sort = request.args.get('sort')
+
+    if sort not in services.NUMERIC_FIELDS:
+        # No (or an unknown) sort query parameter, so list results in ranking order.
+        sort = None
+
+    try:
+        movie_ids, has_next_page = services.search_movies(query, repo.repo_instance, page, results_per_page, sort)
+    except services.InvalidQueryException as e:
+        flash(f'Sorry, {e}. Try e.g. genre=Sci-Fi AND year=2013-2016 AND rating=7+')
+        return redirect(url_for('search_bp.search'))
+
+    sort_urls = {'Rank': url_for('search_bp.query_results', q=query)}
+    for field in ['rating', 'votes', 'revenue']:
+        sort_urls[field.title()] = url_for('search_bp.query_results', q=query, sort=field)
+
+    return render_results('search_bp.query_results', query, page, movie_ids, has_next_page, sort, sort_urls)
+
+
+@search_blueprint.route('/text', methods=['GET'])
+def text_results():
+    results_per_page = 10
+
+    # Read query parameters.
+    query = request.args.get('q', '')
+    page = max(request.args.get('page', 0, type=int), 0)
+
+    movie_ids, has_next_page = services.search_movies_by_text(query, repo.repo_instance, page, results_per_page)
+    if page == 0 and len(movie_ids) == 0:
+        flash('Sorry, result not found!')
+        return redirect(url_for('search_bp.search'))
+
+    return render_results('search_bp.text_results', query, page, movie_ids, has_next_page)
+
+
+def render_results(endpoint, query, page, movie_ids, has_next_page, sort=None, sort_urls=None):
+    movies = showcase_services.get_movies_by_id(movie_ids, repo.repo_instance)
+
+    first_movie_url = None
+    prev_movie_url = None
+    next_movie_url = None
+
+    if page > 0:
+        # There are preceding results, so generate URLs for the 'previous' and 'first' navigation buttons.
+        prev_movie_url = url_for(endpoint, q=query, page=page - 1, sort=sort)
+        first_movie_url = url_for(endpoint, q=query, sort=sort)
+
+    if has_next_page:
+        # There are further results, so generate the URL for the 'next' navigation button.
+        next_movie_url = url_for(endpoint, q=query, page=page + 1, sort=sort)
+
+    # Construct urls for viewing movie reviews and adding reviews.
+    for movie in movies:
+        movie['view_review_url'] = url_for('showcase_bp.movies_by_ranking', id=movie['id'],
+                                           view_reviews_for=movie['id'])
+        movie['add_review_url'] = url_for('showcase_bp.review_on_movie', movie=movie['id'])
+
+    return render_template(
+        'showcase/movies.html',
+        title='Search results',
+        movies_title='Results for ' + query,
+        movies=movies,
+        selected_movies=utilities.get_selected_movies(),
+        actor_urls=utilities.get_actors_and_urls(),
+        director_urls=utilities.get_directors_and_urls(),
+        genre_urls=utilities.get_genres_and_urls(),
+        sort_urls=sort_urls,
+        first_movie_url=first_movie_url,
+        last_movie_url=None,
+        prev_movie_url=prev_movie_url,
+        next_movie_url=next_movie_url,
+        show_reviews_for_movie=-1
+    )
+
+
 class MovieSearchForm(Form):
     choices = [('Actor', 'Actor'),
                ('Director', 'Director'),
-               ('Genre', 'Genre')]
-    select = SelectField('Search by actor, director, or genre:', choices=choices)
+               ('Genre', 'Genre'),
+               ('Query', 'Query, e.g. genre=Sci-Fi AND year=2013-2016 AND rating=7+'),
+               ('Text', 'Words in the title or description')]
+    select = SelectField('Search by actor, director, genre, query or text:', choices=choices)
     search = StringField('')
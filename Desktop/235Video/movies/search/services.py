@@ -1,7 +1,15 @@
+import re
+from itertools import islice
+
+from movies.adapters.postings import intersect_posting_lists, merge_posting_lists
 from movies.adapters.repository import AbstractRepository
 from movies.domain.model import make_review, Movie, Review, Actor, Director, Genre
 
 
+class InvalidQueryException(Exception):
+    pass
+
+
 def search_exists(search, select, repo: AbstractRepository):
     genres = repo.get_genres()
     actors = repo.get_actors()
@@ -21,3 +29,156 @@ def search_exists(search, select, repo: AbstractRepository):
             return True
         else:
             return False
+
+
+def get_completions(prefix: str, repo: AbstractRepository, limit: int = 10, kinds=None):
+    completions = repo.get_name_completions(prefix, limit, kinds)
+
+    return [{'kind': kind, 'name': name, 'movie_id': movie_id} for kind, name, movie_id in completions]
+
+
+def search_movies_by_text(query: str, repo: AbstractRepository, page: int = 0, page_size: int = 10):
+    # Returns the ids of the movies on the requested page of full-text results, best match first, and whether there's
+    # a further page of results.
+    first = page * page_size
+    results = repo.search_movie_ids_by_text(query, first + page_size + 1)
+    page_ids = [movie_id for movie_id, score in results[first:]]
+
+    return page_ids[:page_size], len(page_ids) > page_size
+
+
+# ============================================
+# Multi-criteria movie queries
+# ============================================
+#
+# A query is a disjunction of clauses, each a conjunction of criteria, e.g.
+#
+#     genre=Sci-Fi AND director=Ridley Scott AND year=2010-2016 OR actor=Chris Pratt
+#
+# Each clause is answered by intersecting the sorted posting lists of its criteria, smallest first, and the clauses
+# are merged. Both steps are lazy and produce ids in ranking order, so a page of results only costs as much work as
+# is needed to find the movies on that page.
+#
+# Criteria on numeric attributes, e.g. rating=7.5+ or votes=100000-500000, filter the matches of the other criteria
+# in a clause by reading the repository's attribute columns. Results can also be sorted by a numeric attribute, which
+# means finding every match before the first page can be returned.
+
+_CLAUSE_SEPARATOR = re.compile(r'\s+OR\s+', re.IGNORECASE)
+_CRITERION_SEPARATOR = re.compile(r'\s+AND\s+', re.IGNORECASE)
+_CRITERION = re.compile(r'^(actor|director|genre|year|rating|votes|revenue|metascore|runtime)\s*(?:=|:|\s)\s*(.+)$',
+                        re.IGNORECASE)
+_YEAR_RANGE = re.compile(r'^(\d{4})(?:\s*(?:-|–|\.\.|to)\s*(\d{4}))?$', re.IGNORECASE)
+_NUMBER_RANGE = re.compile(r'^(\d+(?:\.\d+)?)\s*(?:(\+)|(?:-|–|\.\.|to)\s*(\d+(?:\.\d+)?))?$', re.IGNORECASE)
+
+# Query fields for numeric attributes, and the repository attribute each one names.
+NUMERIC_FIELDS = {
+    'rating': 'rating',
+    'votes': 'votes',
+    'revenue': 'revenue_millions',
+    'metascore': 'metascore',
+    'runtime': 'runtime_minutes',
+}
+
+_posting_list_getters = {
+    'actor': lambda repo, name: repo.get_movie_ids_for_actor(name),
+    'director': lambda repo, name: repo.get_movie_ids_for_director(name),
+    'genre': lambda repo, name: repo.get_movie_ids_for_genre(name),
+}
+
+
+def parse_query(query: str):
+    # Returns a list of clauses, each a list of (field, value) criteria. Year values are (start, end) tuples, and
+    # numeric values are (minimum, maximum) tuples where maximum is None for e.g. rating=7+.
+    if query is None or query.strip() == "":
+        raise InvalidQueryException('The query is empty')
+
+    clauses = list()
+    for clause_text in _CLAUSE_SEPARATOR.split(query.strip()):
+        clause = list()
+        for criterion_text in _CRITERION_SEPARATOR.split(clause_text.strip()):
+            match = _CRITERION.match(criterion_text.strip())
+            if match is None:
+                raise InvalidQueryException(f'Could not understand "{criterion_text.strip()}"')
+
+            field, value = match.group(1).lower(), match.group(2).strip()
+            if field == 'year':
+                year_match = _YEAR_RANGE.match(value)
+                if year_match is None:
+                    raise InvalidQueryException(f'Could not understand the year "{value}"')
+                start_year = int(year_match.group(1))
+                end_year = int(year_match.group(2) or start_year)
+                value = (min(start_year, end_year), max(start_year, end_year))
+            elif field in NUMERIC_FIELDS:
+                number_match = _NUMBER_RANGE.match(value)
+                if number_match is None:
+                    raise InvalidQueryException(f'Could not understand the {field} "{value}"')
+                minimum = float(number_match.group(1))
+                if number_match.group(2) is not None:
+                    maximum = None
+                elif number_match.group(3) is not None:
+                    maximum = float(number_match.group(3))
+                    minimum, maximum = min(minimum, maximum), max(minimum, maximum)
+                else:
+                    maximum = minimum
+                value = (minimum, maximum)
+            clause.append((field, value))
+
+        if all(field in NUMERIC_FIELDS for field, value in clause):
+            raise InvalidQueryException(f'"{clause_text.strip()}" needs an actor, director, genre or year')
+        clauses.append(clause)
+
+    return clauses
+
+
+def search_movies(query: str, repo: AbstractRepository, page: int = 0, page_size: int = 10, sort: str = None):
+    # Returns the ids of the movies on the requested page of results, and whether there's a further page of results.
+    # Results are in ranking order, or highest first by sort, a key of NUMERIC_FIELDS.
+    clauses = parse_query(query)
+    matching_ids = merge_posting_lists([_movie_ids_for_clause(clause, repo) for clause in clauses])
+    if sort is not None:
+        matching_ids = repo.sort_movie_ids(list(matching_ids), NUMERIC_FIELDS[sort])
+
+    first = page * page_size
+    page_ids = list(islice(matching_ids, first, first + page_size + 1))
+
+    return page_ids[:page_size], len(page_ids) > page_size
+
+
+def _movie_ids_for_clause(clause, repo: AbstractRepository):
+    movie_ids = _movie_ids_for_indexed_criteria(clause, repo)
+
+    for field, (minimum, maximum) in [(field, value) for field, value in clause if field in NUMERIC_FIELDS]:
+        movie_ids = repo.filter_movie_ids(movie_ids, NUMERIC_FIELDS[field], minimum, maximum)
+
+    return movie_ids
+
+
+def _movie_ids_for_indexed_criteria(clause, repo: AbstractRepository):
+    posting_lists = list()
+    start_year, end_year = None, None
+
+    for field, value in clause:
+        if field == 'year':
+            # Several year criteria in the same clause narrow the range.
+            start_year = value[0] if start_year is None else max(start_year, value[0])
+            end_year = value[1] if end_year is None else min(end_year, value[1])
+        elif field in _posting_list_getters:
+            posting_lists.append(_posting_list_getters[field](repo, value))
+
+    if start_year is None:
+        return intersect_posting_lists(posting_lists)
+
+    year_posting_lists = [repo.get_movie_ids_for_release_year(year) for year in range(start_year, end_year + 1)]
+    year_count = sum(len(posting_list) for posting_list in year_posting_lists)
+
+    if len(posting_lists) == 0 or year_count < min(len(posting_list) for posting_list in posting_lists):
+        # The year range is the most selective criterion, so let its merged posting lists drive the intersection.
+        return intersect_posting_lists(posting_lists, driver=merge_posting_lists(year_posting_lists))
+
+    # Otherwise intersect the other criteria and check the release year of each match, skipping movies without one.
+    return (movie_id for movie_id in intersect_posting_lists(posting_lists)
+            if _released_between(repo.get_movie(movie_id), start_year, end_year))
+
+
+def _released_between(movie, start_year: int, end_year: int) -> bool:
+    return movie.release_year is not None and start_year <= movie.release_year <= end_year
@@ -0,0 +1,115 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from movies.utilities.profanity_filter import screen_texts
+
+BATCH_SIZE = 256
+BATCH_WAIT = 0.02
+
+logger = logging.getLogger(__name__)
+
+
+class ModerationQueue:
+    """ Reviews that have been accepted but not yet published, screened for profanity in the background.
+
+    Submitting a review only queues it. A dispatcher thread takes the queued reviews in batches of up to BATCH_SIZE,
+    waiting at most BATCH_WAIT seconds to fill a batch, and screens each batch with one scan of the compiled profanity
+    matcher, in a pool of worker processes when there are several workers. Clean reviews are passed to publish, in the
+    order they were submitted, and the others are dropped. A review that publish fails on is logged and dropped, so
+    that it doesn't stop the reviews after it being published.
+    """
+
+    def __init__(self, publish, workers: int = 1, batch_size: int = BATCH_SIZE, batch_wait: float = BATCH_WAIT):
+        self._publish = publish
+        self._workers = workers or os.cpu_count()
+        self._batch_size = batch_size
+        self._batch_wait = batch_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.submitted = 0
+        self.published = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def submit(self, movie_id: int, review_text: str, username: str):
+        with self._lock:
+            # The dispatcher is started with the first review, and restarted should it ever have died.
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='review-moderation', daemon=True)
+                self._thread.start()
+            self.submitted += 1
+        self._queue.put((movie_id, review_text, username))
+
+    def join(self):
+        # Waits until every submitted review has been published or dropped.
+        self._queue.join()
+
+    def _run(self):
+        executor = ProcessPoolExecutor(self._workers) if self._workers > 1 else None
+        pending = deque()
+        while True:
+            # Only block waiting for reviews when no batch is being screened.
+            batch = self._next_batch(block=len(pending) == 0)
+            if len(batch) > 0:
+                texts = [review_text for movie_id, review_text, username in batch]
+                if executor is None:
+                    future = Future()
+                    future.set_result(screen_texts(texts))
+                else:
+                    future = executor.submit(screen_texts, texts)
+                pending.append((batch, future))
+
+            # Publish batches in submission order, as they finish, keeping at most two per worker in flight.
+            while len(pending) > 0 and (pending[0][1].done() or len(batch) == 0 or len(pending) >= 2 * self._workers):
+                batch_done, future = pending.popleft()
+                try:
+                    flagged = future.result()
+                except Exception:
+                    # Screening the batch failed, e.g. because a worker process died, so none of it can be published.
+                    logger.exception('Failed to screen a batch of %d reviews', len(batch_done))
+                    flagged = None
+                self._finish(batch_done, flagged)
+
+    def _next_batch(self, block: bool):
+        batch = list()
+        try:
+            batch.append(self._queue.get() if block else self._queue.get_nowait())
+        except queue.Empty:
+            return batch
+
+        deadline = time.monotonic() + self._batch_wait
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _finish(self, batch, flagged):
+        # Publishes the clean reviews of a batch, given whether each contains profanity, or flagged None if the batch
+        # couldn't be screened.
+        if flagged is None:
+            self.failed += len(batch)
+            for _ in batch:
+                self._queue.task_done()
+            return
+
+        for (movie_id, review_text, username), contains_profanity in zip(batch, flagged):
+            try:
+                if contains_profanity:
+                    self.rejected += 1
+                else:
+                    self._publish(movie_id, review_text, username)
+                    self.published += 1
+            except Exception:
+                self.failed += 1
+                logger.exception('Failed to publish a review of movie %s by %s', movie_id, username)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,102 @@
+from bisect import bisect_left, bisect_right
+
+from flask import url_for
+
+# Stands for the cursor in a listing's URL template. It's left as it is by URL quoting, so it can be found and replaced.
+CURSOR = '__cursor__'
+
+
+class Page:
+    """ One page of a listing: a slice of a sequence of items, such as a posting list of movie ids.
+
+    The sequence only needs a length and slicing, so it may be lazy, reading just the slice it's asked for, and its
+    length is taken as stored rather than counted. Pages are found by one of two kinds of cursor. An offset cursor is the
+    position of the page's first item, which suits any order. A keyset cursor is the item that the page comes after (or
+    before), found by binary search, which needs the sequence to be in ascending order, as posting lists of movie ids in
+    ranking order are. A keyset page stays where it is while new items are added ahead of it, and either way finding a
+    page deep in a listing costs the same as finding the first.
+    """
+
+    def __init__(self, items, per_page: int, cursor: int = None, after=None, before=None, keyset: bool = None):
+        # The page links to other pages by keyset if keyset is True, or if it's None and the page was found by keyset.
+        self.total = len(items)
+        self.per_page = per_page
+        self.keyset = keyset if keyset is not None else after is not None or before is not None
+        if after is not None:
+            start = bisect_right(items, after)
+        elif before is not None:
+            start = max(bisect_left(items, before) - per_page, 0)
+        else:
+            start = min(max(cursor or 0, 0), self.total)
+        self.start = start
+        self.items = items[start:start + per_page]
+        self._sequence = items
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.items)
+
+    def navigation(self, urls: 'PageUrls'):
+        # Returns the URLs of the first, previous, next and last pages, each None where there's no such page, keyed as
+        # the showcase templates name them. Keyset pages link to keyset pages, and offset pages to offset pages.
+        navigation = dict(first_movie_url=None, last_movie_url=None, prev_movie_url=None, next_movie_url=None)
+
+        last_start = max(self.total - 1, 0) // self.per_page * self.per_page
+
+        if self.start >= self.total > 0:
+            # The cursor is past the end of the listing, so the 'previous' page is the last one.
+            navigation['prev_movie_url'] = self._url_at(urls, last_start)
+            navigation['first_movie_url'] = urls.first
+        elif self.start > 0:
+            # There are preceding items, so link to the 'previous' and 'first' pages.
+            if self.keyset:
+                navigation['prev_movie_url'] = urls.url('before', self._sequence[self.start])
+            else:
+                navigation['prev_movie_url'] = urls.url('cursor', max(self.start - self.per_page, 0))
+            navigation['first_movie_url'] = urls.first
+
+        if self.end < self.total:
+            # There are further items, so link to the 'next' and 'last' pages.
+            if self.keyset:
+                navigation['next_movie_url'] = urls.url('after', self._sequence[self.end - 1])
+            else:
+                navigation['next_movie_url'] = urls.url('cursor', self.end)
+            navigation['last_movie_url'] = self._url_at(urls, last_start)
+        return navigation
+
+    def url(self, urls: 'PageUrls') -> str:
+        # Returns the URL of this page, e.g. to link back to it with a movie's reviews opened.
+        return self._url_at(urls, self.start)
+
+    def _url_at(self, urls: 'PageUrls', start: int) -> str:
+        # Returns the URL of the page starting at position start, of the same kind as this page.
+        if start == 0:
+            return urls.first
+        if self.keyset:
+            return urls.url('after', self._sequence[start - 1])
+        return urls.url('cursor', start)
+
+
+class PageUrls:
+    """ The URLs of the pages of a listing, made from one URL template rather than by calling url_for per link.
+
+    The template is built by url_for with the cursor argument set to CURSOR, in the position the cursor takes among the
+    listing's arguments, and each page's URL is the template with its cursor substituted.
+    """
+
+    def __init__(self, endpoint: str, **args):
+        self._template = url_for(endpoint, **args)
+        self._marker = 'cursor=' + CURSOR
+        self.first = url_for(endpoint, **{name: value for name, value in args.items() if value != CURSOR})
+
+    def url(self, kind: str, cursor) -> str:
+        # Returns the URL of the page at cursor, where kind is 'cursor' for an offset, or 'after' or 'before' for a key.
+        return self._template.replace(self._marker, kind + '=' + str(cursor))
+
+
+def with_reviews_for(page_url: str, movie_id: int) -> str:
+    # Returns page_url with the reviews of the movie opened.
+    return page_url + ('&' if '?' in page_url else '?') + 'view_reviews_for=' + str(movie_id)
@@ -1,9 +1,39 @@
+import threading
+from collections import OrderedDict
 from typing import Iterable
 
+from movies.adapters.costar_graph import CostarGraph
+from movies.adapters.rank_index import ORDERINGS
 from movies.adapters.repository import AbstractRepository
 from movies.domain.model import make_review, Movie, Review
 
 
+# Orders that the movie listing pages can be sorted in, besides ranking, and the numeric attribute each sorts by.
+SORT_ATTRIBUTES = {
+    'rating': 'rating',
+    'votes': 'votes',
+    'revenue': 'revenue_millions',
+}
+
+# Orders that the ranking pages can list the whole catalog in, and the most movies a ranking page can show at a time.
+RANKING_ORDERS = ORDERINGS
+MAX_MOVIES_PER_RANKING_PAGE = 50
+
+# Number of reviews shown at a time under a movie.
+REVIEWS_PER_PAGE = 10
+
+# Movies read at a time while building the co-star graph, and the most links a chain between two actors is searched for.
+CASTS_BATCH_SIZE = 500
+MAX_DEGREES_OF_SEPARATION = 6
+
+# The most movies kept in dict form. Listings show a few movies a page, so this holds the movies of many recent pages.
+MOVIE_DTO_CACHE_SIZE = 1024
+
+# The co-star graph of the repository's catalog, built on first use and again when the repository or its catalog
+# changes.
+_costar_graph = {'repository': None, 'catalog_version': None, 'graph': None}
+
+
 class NonExistentMovieException(Exception):
     pass
 
@@ -12,6 +42,10 @@ class UnknownUserException(Exception):
     pass
 
 
+class UnknownActorException(Exception):
+    pass
+
+
 def add_review(movie_id: int, review_text: str, username: str, repo: AbstractRepository):
     # Check that the movie exists.
     movie = repo.get_movie(movie_id)
@@ -27,6 +61,7 @@ def add_review(movie_id: int, review_text: str, username: str, repo: AbstractRep
 
     # Update the repository.
     repo.add_review(review)
+    discard_movie_dto(movie_id)
 
 
 def get_movie(movie_id: int, repo: AbstractRepository):
@@ -35,18 +70,18 @@ def get_movie(movie_id: int, repo: AbstractRepository):
     if movie is None:
         raise NonExistentMovieException
 
-    return movie_to_dict(movie)
+    return movie_to_dict(movie, repo)
 
 
 def get_first_movie(repo: AbstractRepository):
     movie = repo.get_first_movie()
 
-    return movie_to_dict(movie)
+    return movie_to_dict(movie, repo)
 
 
 def get_last_movie(repo: AbstractRepository):
     movie = repo.get_last_movie()
-    return movie_to_dict(movie)
+    return movie_to_dict(movie, repo)
 
 
 def get_watchlist(username: str, repo: AbstractRepository):
@@ -57,23 +92,80 @@ def get_watchlist(username: str, repo: AbstractRepository):
     return user.watchlist
 
 
-def get_movies_by_ranking(id, repo: AbstractRepository):
-    # Returns movies for the target date (empty if no matches), the date of the previous movie (might be null),
-    # the date of the next movie (might be null)
-    list_of_ids = [id]
-    movies = repo.get_movies_by_id(list_of_ids)
+def get_ranking_page(order: str, page_number: int, per_page: int, repo: AbstractRepository):
+    # Returns the movies on page page_number (counting from 1) of the catalog in order, and the number of pages. The
+    # repository's rank index holds the catalog in order already, so a page is a slice of it.
+    rank_index = repo.get_rank_index(order)
+    movies = repo.get_movies_by_id(rank_index.page(page_number, per_page))
+
+    return movies_to_dict(movies, repo), rank_index.number_of_pages(per_page)
+
+
+def get_ranking_page_of_movie(movie_id: int, order: str, per_page: int, repo: AbstractRepository):
+    # Returns the number of the page of the catalog in order that the movie is on, or None if there's no such movie.
+    return repo.get_rank_index(order).page_of(movie_id, per_page)
+
+
+def get_movies_by_year_range(start_year: int, end_year: int, repo: AbstractRepository):
+    return YearRangeMovies(start_year, end_year, repo)
+
+
+class YearRangeMovies:
+    """ The movies released from start_year to end_year, ordered by year and then rank, as a lazy sequence.
+
+    Its length is counted once by the repository, and a slice of it reads just the movies in the slice, so a listing can
+    page through it without reading the rest.
+    """
+
+    def __init__(self, start_year: int, end_year: int, repo: AbstractRepository):
+        self._start_year = start_year
+        self._end_year = end_year
+        self._repo = repo
+        self._length = repo.count_movies_by_year_range(start_year, end_year)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index: slice):
+        start, stop, step = index.indices(self._length)
+        return self._repo.get_movies_by_year_range(self._start_year, self._end_year, max(stop - start, 0), start)
 
-    movies_dto = list()
-    prev_id = next_id = None
 
-    if len(movies) > 0:
-        prev_id = repo.get_id_of_previous_movie(movies[0])
-        next_id = repo.get_id_of_next_movie(movies[0])
+def get_costar_graph(repo: AbstractRepository) -> CostarGraph:
+    catalog_version = repo.get_catalog_version()
+    if _costar_graph['repository'] is not repo or _costar_graph['catalog_version'] != catalog_version:
+        _costar_graph['graph'] = CostarGraph(get_casts(repo))
+        _costar_graph['repository'] = repo
+        _costar_graph['catalog_version'] = catalog_version
+    return _costar_graph['graph']
 
-        # Convert Movies to dictionary form.
-        movies_dto = movies_to_dict(movies)
 
-    return movies_dto, prev_id, next_id
+def get_casts(repo: AbstractRepository):
+    # Yields the names of each movie's actors, in ranking order, reading a batch of movies at a time.
+    rank_index = repo.get_rank_index()
+    for number in range(1, rank_index.number_of_pages(CASTS_BATCH_SIZE) + 1):
+        for movie in repo.get_movies_by_id(rank_index.page(number, CASTS_BATCH_SIZE)):
+            yield [actor.actor_full_name for actor in movie.actors]
+
+
+def get_costars(actor_name: str, limit: int, repo: AbstractRepository):
+    # Returns the actor's name as cast, the number of co-stars, and up to limit of them with the films each shares.
+    graph = get_costar_graph(repo)
+    if actor_name not in graph:
+        raise UnknownActorException
+
+    costars = [{'actor': name, 'shared_movies': shared} for name, shared in graph.costars(actor_name, limit)]
+    return graph.name(actor_name), graph.degree(actor_name), costars
+
+
+def get_separation(actor_name: str, other_name: str, repo: AbstractRepository):
+    # Returns the shortest chain of co-stars from one actor to the other, or None if they aren't linked within
+    # MAX_DEGREES_OF_SEPARATION films.
+    graph = get_costar_graph(repo)
+    if actor_name not in graph or other_name not in graph:
+        raise UnknownActorException
+
+    return graph.path(actor_name, other_name, MAX_DEGREES_OF_SEPARATION)
 
 
 def get_movie_ids_for_actor(actor_name, repo: AbstractRepository):
@@ -94,11 +186,19 @@ def get_movie_ids_for_genre(genre_name, repo: AbstractRepository):
     return genre_ids
 
 
+def sort_movie_ids(movie_ids, sort, repo: AbstractRepository):
+    # Returns movie_ids in the order named by sort, best first, or unchanged (i.e. in ranking order) if sort is None.
+    if sort is None:
+        return movie_ids
+
+    return repo.sort_movie_ids(movie_ids, SORT_ATTRIBUTES[sort])
+
+
 def get_movies_by_id(id_list, repo: AbstractRepository):
     movies = repo.get_movies_by_id(id_list)
 
     # Convert Movies to dictionary form.
-    movies_as_dict = movies_to_dict(movies)
+    movies_as_dict = movies_to_dict(movies, repo)
 
     return movies_as_dict
 
@@ -109,34 +209,104 @@ def get_reviews_for_movie(movie_id, repo: AbstractRepository):
     if movie is None:
         raise NonExistentMovieException
 
-    return reviews_to_dict(movie.reviews)
+    return reviews_to_dict(repo.get_reviews_for_movie(movie_id))
 
 
 # ============================================
 # Functions to convert model entities to dicts
 # ============================================
 
-def movie_to_dict(movie: Movie):
-    movie_dict = {
+# Movies in dict form, memoized per movie id together with the repository, its catalog version and the movie's number
+# of reviews when the dict was made. Movies only change when they're added and reviews are only ever added, so a dict
+# is current while all three are the same. The Movie itself isn't compared, as the SQLite repository builds a new one
+# each time it's asked for a movie. The memo is least recently used first, and holds at most MOVIE_DTO_CACHE_SIZE dicts.
+_movie_dtos = OrderedDict()
+_movie_dtos_lock = threading.Lock()
+
+
+def movie_to_dict(movie: Movie, repo: AbstractRepository, catalog_version: int = None):
+    if catalog_version is None:
+        catalog_version = repo.get_catalog_version()
+    number_of_reviews = repo.count_reviews_for_movie(movie.id)
+    with _movie_dtos_lock:
+        entry = _movie_dtos.get(movie.id)
+        if entry is not None:
+            _movie_dtos.move_to_end(movie.id)
+    if entry is None or entry[0] is not repo or entry[1] != catalog_version or entry[2] != number_of_reviews:
+        entry = (repo, catalog_version, number_of_reviews, make_movie_dict(movie, number_of_reviews, repo))
+        with _movie_dtos_lock:
+            _movie_dtos[movie.id] = entry
+            _movie_dtos.move_to_end(movie.id)
+            while len(_movie_dtos) > MOVIE_DTO_CACHE_SIZE:
+                _movie_dtos.popitem(last=False)
+
+    # Views add URLs to the dicts they're given, so each gets its own copy.
+    return dict(entry[3])
+
+
+def make_movie_dict(movie: Movie, number_of_reviews: int, repo: AbstractRepository):
+    # Makes the dict that movie_to_dict memoizes, for callers that read every movie once and shouldn't keep them all.
+    return {
         'id': movie.id,
         'release_year': movie.release_year,
         'title': movie.title,
         'description': movie.description,
+        'runtime_minutes': movie.runtime_minutes,
+        'rating': movie.rating,
+        'votes': movie.votes,
+        'revenue_millions': movie.revenue_millions,
+        'metascore': movie.metascore,
         'actors': movie.actors,
         'director': movie.director,
         'genres': movie.genres,
-        'reviews': reviews_to_dict(movie.reviews),
-        'hyperlink': movie.hyperlink,
+        'reviews': ReviewList(movie.id, number_of_reviews, repo),
+        'hyperlink': movie.hyperlink(),
     }
-    return movie_dict
 
 
-def movies_to_dict(movies: Iterable[Movie]):
-    return [movie_to_dict(movie) for movie in movies]
+def discard_movie_dto(movie_id: int):
+    with _movie_dtos_lock:
+        _movie_dtos.pop(movie_id, None)
+
+
+def movies_to_dict(movies: Iterable[Movie], repo: AbstractRepository):
+    catalog_version = repo.get_catalog_version()
+    return [movie_to_dict(movie, repo, catalog_version) for movie in movies]
+
+
+class ReviewList:
+    """ A movie's reviews, read from the repository a page at a time and converted to dicts as they're read.
+
+    A page of a popular movie shows only how many reviews it has, or one page of them, so reading and converting every
+    review each time the movie is shown would be wasted work. Pages are found by keyset: the reviews after, or before,
+    the review with a given id. Nothing is kept between pages, so a memoized list doesn't grow with the pages read.
+    """
+
+    __slots__ = ('_movie_id', '_number_of_reviews', '_repo')
+
+    def __init__(self, movie_id: int, number_of_reviews: int, repo: AbstractRepository):
+        self._movie_id = movie_id
+        self._number_of_reviews = number_of_reviews
+        self._repo = repo
+
+    def __len__(self):
+        return self._number_of_reviews
+
+    def page(self, after: int = None, before: int = None, per_page: int = REVIEWS_PER_PAGE):
+        # Returns the reviews after the review with id after, or before the one with id before, or else the first ones.
+        reviews = self._repo.get_reviews_for_movie(self._movie_id, per_page, after, before)
+        return reviews_to_dict(reviews)
+
+    def has_after(self, review_id: int) -> bool:
+        return len(self._repo.get_reviews_for_movie(self._movie_id, 1, after=review_id)) > 0
+
+    def has_before(self, review_id: int) -> bool:
+        return len(self._repo.get_reviews_for_movie(self._movie_id, 1, before=review_id)) > 0
 
 
 def review_to_dict(review: Review):
     review_dict = {
+        'id': review.id,
         'user_name': review.user.user_name,
         'movie_id': review.movie.id,
         'review_text': review.review_text,
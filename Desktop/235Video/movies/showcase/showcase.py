@@ -1,156 +1,145 @@
-from better_profanity import profanity
+import hashlib
+from functools import wraps
+
 from flask import Blueprint
-from flask import request, render_template, redirect, url_for, session
+from flask import request, render_template, redirect, url_for, session, make_response, current_app, jsonify
 from flask_wtf import FlaskForm
 from wtforms import TextAreaField, HiddenField, SubmitField
 from wtforms.validators import DataRequired, Length, ValidationError
+from werkzeug.http import is_resource_modified
 
 import movies.adapters.repository as repo
 import movies.showcase.services as services
 import movies.utilities.utilities as utilities
 from movies.authentication.authentication import login_required
+from movies.showcase.moderation import ModerationQueue
+from movies.showcase.pagination import CURSOR, Page, PageUrls, with_reviews_for
+from movies.utilities.profanity_filter import get_matcher
 
 # Configure Blueprint.
 showcase_blueprint = Blueprint(
     'showcase_bp', __name__)
 
+# Number of movies on a page of the listings by actor, genre, director and year.
+MOVIES_PER_PAGE = 3
+
+
+def cached_page(view):
+    # Serves a showcase page from the page cache, or answers a conditional GET with 304 Not Modified, without calling
+    # the view when nothing the page is rendered from has changed. The navigation bar greets the logged in user, so
+    # the user is part of the page's identity.
+    @wraps(view)
+    def wrapped_view(**kwargs):
+        version, last_modified = utilities.get_page_version()
+        username = session.get('username')
+        etag = hashlib.sha1(repr((request.full_path, username, version)).encode('utf-8')).hexdigest()
+
+        if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+            response = make_response('', 304)
+        else:
+            page_cache = utilities.get_page_cache()
+            key = ('page', request.endpoint, request.full_path, username)
+            page = page_cache.lookup(key, version)
+            if page is None:
+                page = view(**kwargs)
+                if not isinstance(page, str):
+                    # A redirect, which isn't cached.
+                    return page
+                page_cache.put(key, version, page)
+            response = make_response(page)
+
+        # Caches may keep the page, but must check with us that it's still current before using it. The page depends
+        # on the session cookie, and a logged in user's page is theirs alone, so shared caches mustn't keep it.
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.cache_control.no_cache = True
+        response.vary.add('Cookie')
+        if username is not None:
+            response.cache_control.private = True
+        return response
+    return wrapped_view
+
 
 @showcase_blueprint.route('/movies_by_ranking', methods=['GET'])
+@cached_page
 def movies_by_ranking():
-    # Read query parameters.
-    target_id = request.args.get('id')
-    movie_to_show_reviews = request.args.get('view_reviews_for')
-
-    # Fetch the first and last movies in the series.
-    first_movie = services.get_first_movie(repo.repo_instance)
-    last_movie = services.get_last_movie(repo.repo_instance)
-
-    if target_id is None:
-        # No id query parameter, so return movies from day 1 of the series.
-        target_id = first_movie['id']
-    else:
-        # Convert target_id from string to date.
-        target_id = int(target_id)
-
-    if movie_to_show_reviews is None:
-        # No view-reviews query parameter, so set to a non-existent movie id.
-        movie_to_show_reviews = -1
-    else:
-        # Convert movie_to_show_reviews from string to int.
-        movie_to_show_reviews = int(movie_to_show_reviews)
-
-    # Fetch movie(s) for the target date. This call also returns the previous and next dates for movies immediately
-    # before and after the target date.
-    movies, previous_id, next_id = services.get_movies_by_ranking(target_id, repo.repo_instance)
-
-    first_movie_url = None
-    last_movie_url = None
-    next_movie_url = None
-    prev_movie_url = None
-
-    if len(movies) > 0:
-        # There's at least one movie for the target date.
-        if previous_id is not None:
-            # There are movies on a previous date, so generate URLs for the 'previous' and 'first' navigation buttons.
-            prev_movie_url = url_for('showcase_bp.movies_by_ranking', id=previous_id)
-            first_movie_url = url_for('showcase_bp.movies_by_ranking', id=first_movie['id'])
-
-        # There are movies on a subsequent date, so generate URLs for the 'next' and 'last' navigation buttons.
-        if next_id is not None:
-            next_movie_url = url_for('showcase_bp.movies_by_ranking', id=next_id)
-            last_movie_url = url_for('showcase_bp.movies_by_ranking', id=last_movie['id'])
-
-        # Construct urls for viewing movie reviews and adding reviews.
-        for movie in movies:
-            movie['view_review_url'] = url_for('showcase_bp.movies_by_ranking', id=target_id,
-                                               view_reviews_for=movie['id'])
-            movie['add_review_url'] = url_for('showcase_bp.review_on_movie', movie=movie['id'])
-
-        # Generate the webpage to display the movies.
-        return render_template(
-            'showcase/movies.html',
-            title='movies',
-            movies_title="Rank #" + str(target_id),
-            movies=movies,
-            selected_movies=utilities.get_selected_movies(len(movies) * 2),
-            actor_urls=utilities.get_actors_and_urls(),
-            director_urls=utilities.get_directors_and_urls(),
-            genre_urls=utilities.get_genres_and_urls(),
-            first_movie_url=first_movie_url,
-            last_movie_url=last_movie_url,
-            prev_movie_url=prev_movie_url,
-            next_movie_url=next_movie_url,
-            show_reviews_for_movie=movie_to_show_reviews
-        )
-
-    # No movies to show, so return the homepage.
-    return redirect(url_for('home_bp.home'))
-
-
-@showcase_blueprint.route('/movies_by_actor', methods=['GET'])
-def movies_by_actor():
-    movies_per_page = 3
-
-    # Read query parameters.
-    actor_name = request.args.get('actor')
-    cursor = request.args.get('cursor')
-    movie_to_show_reviews = request.args.get('view_reviews_for')
-
-    if movie_to_show_reviews is None:
-        # No view-reviews query parameter, so set to a non-existent movie id.
-        movie_to_show_reviews = -1
+    # Read query parameters. Any that aren't numbers are taken as missing.
+    target_id = request.args.get('id', type=int)
+    page = request.args.get('page', type=int)
+    order = request.args.get('order')
+    per_page = request.args.get('per_page', 1, type=int)
+    movie_to_show_reviews = request.args.get('view_reviews_for', -1, type=int)
+
+    if order not in services.RANKING_ORDERS:
+        # No (or an unknown) order query parameter, so list movies in ranking order.
+        order = None
+
+    # Pages show one movie by default, and at most the limit of movies on a page.
+    per_page = min(max(per_page, 1), services.MAX_MOVIES_PER_RANKING_PAGE)
+
+    if page is not None:
+        # Pages are counted from 1.
+        page = max(page, 1)
+    elif target_id is not None:
+        # No page query parameter, so show the page that the movie with the id is on.
+        page = services.get_ranking_page_of_movie(target_id, order or 'rank', per_page, repo.repo_instance)
     else:
-        # Convert movie_to_show_reviews from string to int.
-        movie_to_show_reviews = int(movie_to_show_reviews)
+        # No page or id query parameter, so start at the first page.
+        page = 1
 
-    if cursor is None:
-        # No cursor query parameter, so initialise cursor to start at the beginning.
-        cursor = 0
-    else:
-        # Convert cursor from string to int.
-        cursor = int(cursor)
+    # Fetch the movies on the page, which the repository's rank index gives without sorting the catalog.
+    movies, number_of_pages = [], 0
+    if page is not None:
+        movies, number_of_pages = services.get_ranking_page(order or 'rank', page, per_page, repo.repo_instance)
 
-    # Retrieve movie ids for movies that are tagged with actor_name.
-    movie_ids = services.get_movie_ids_for_actor(actor_name, repo.repo_instance)
+    if len(movies) == 0:
+        # No movies to show, so return the homepage.
+        return redirect(url_for('home_bp.home'))
 
-    # Retrieve the batch of movies to display on the Web page.
-    movies = services.get_movies_by_id(movie_ids[cursor:cursor + movies_per_page], repo.repo_instance)
+    # Pages show one movie by default, so their URLs only carry the page size when it's been changed.
+    per_page_arg = per_page if per_page != 1 else None
 
     first_movie_url = None
     last_movie_url = None
     next_movie_url = None
     prev_movie_url = None
 
-    if cursor > 0:
-        # There are preceding movies, so generate URLs for the 'previous' and 'first' navigation buttons.
-        prev_movie_url = url_for('showcase_bp.movies_by_actor', tag=actor_name, cursor=cursor - movies_per_page)
-        first_movie_url = url_for('showcase_bp.movies_by_actor', tag=actor_name)
-
-    if cursor + movies_per_page < len(movie_ids):
-        # There are further movies, so generate URLs for the 'next' and 'last' navigation buttons.
-        next_movie_url = url_for('showcase_bp.movies_by_actor', tag=actor_name, cursor=cursor + movies_per_page)
+    if page > 1:
+        # There are preceding pages, so generate URLs for the 'previous' and 'first' navigation buttons.
+        prev_movie_url = url_for('showcase_bp.movies_by_ranking', page=page - 1, order=order, per_page=per_page_arg)
+        first_movie_url = url_for('showcase_bp.movies_by_ranking', page=1, order=order, per_page=per_page_arg)
 
-        last_cursor = movies_per_page * int(len(movie_ids) / movies_per_page)
-        if len(movie_ids) % movies_per_page == 0:
-            last_cursor -= movies_per_page
-        last_movie_url = url_for('showcase_bp.movies_by_actor', tag=actor_name, cursor=last_cursor)
+    if page < number_of_pages:
+        # There are further pages, so generate URLs for the 'next' and 'last' navigation buttons.
+        next_movie_url = url_for('showcase_bp.movies_by_ranking', page=page + 1, order=order, per_page=per_page_arg)
+        last_movie_url = url_for('showcase_bp.movies_by_ranking', page=number_of_pages, order=order,
+                                 per_page=per_page_arg)
 
     # Construct urls for viewing movie reviews and adding reviews.
     for movie in movies:
-        movie['view_review_url'] = url_for('showcase_bp.movies_by_tag', tag=actor_name, cursor=cursor,
-                                           view_reviews_for=movie['id'])
+        movie['view_review_url'] = url_for('showcase_bp.movies_by_ranking', page=page, order=order,
+                                           per_page=per_page_arg, view_reviews_for=movie['id'])
         movie['add_review_url'] = url_for('showcase_bp.review_on_movie', movie=movie['id'])
 
+    # Pages are titled with the ranks of the movies on them, in the order they're listed in.
+    first_rank = (page - 1) * per_page + 1
+    movies_title = 'Rank #' + str(first_rank)
+    if len(movies) > 1:
+        movies_title = 'Ranks #' + str(first_rank) + '-' + str(first_rank + len(movies) - 1)
+    if order is not None:
+        movies_title += ' by ' + order
+
     # Generate the webpage to display the movies.
     return render_template(
         'showcase/movies.html',
         title='movies',
-        movies_title='movies tagged by ' + str(actor_name),
+        movies_title=movies_title,
         movies=movies,
         selected_movies=utilities.get_selected_movies(len(movies) * 2),
         actor_urls=utilities.get_actors_and_urls(),
         director_urls=utilities.get_directors_and_urls(),
         genre_urls=utilities.get_genres_and_urls(),
+        sort_urls=get_order_urls(movies[0]['id'], per_page_arg),
         first_movie_url=first_movie_url,
         last_movie_url=last_movie_url,
         prev_movie_url=prev_movie_url,
@@ -159,151 +148,198 @@ def movies_by_actor():
     )
 
 
-def movies_by_genre():
-    movies_per_page = 3
-
+@showcase_blueprint.route('/movies_by_actor', methods=['GET'])
+@cached_page
+def movies_by_actor():
     # Read query parameters.
-    genre_name = request.args.get('genre')
-    cursor = request.args.get('cursor')
-    movie_to_show_reviews = request.args.get('view_reviews_for')
+    actor_name = request.args.get('actor')
+    sort = get_sort()
 
-    if movie_to_show_reviews is None:
-        # No view-reviews query parameter, so set to a non-existent movie id.
-        movie_to_show_reviews = -1
-    else:
-        # Convert movie_to_show_reviews from string to int.
-        movie_to_show_reviews = int(movie_to_show_reviews)
+    # Retrieve movie ids for movies that are tagged with actor_name.
+    movie_ids = services.get_movie_ids_for_actor(actor_name, repo.repo_instance)
+
+    return render_listing(
+        movie_ids, sort, 'movies tagged by ' + str(actor_name),
+        PageUrls('showcase_bp.movies_by_actor', actor=actor_name, cursor=CURSOR, sort=sort),
+        get_sort_urls('showcase_bp.movies_by_actor', actor=actor_name))
 
-    if cursor is None:
-        # No cursor query parameter, so initialise cursor to start at the beginning.
-        cursor = 0
-    else:
-        # Convert cursor from string to int.
-        cursor = int(cursor)
+
+@showcase_blueprint.route('/movies_by_genre', methods=['GET'])
+@cached_page
+def movies_by_genre():
+    # Read query parameters.
+    genre_name = request.args.get('genre')
+    sort = get_sort()
 
     # Retrieve movie ids for movies that have genre_name.
     movie_ids = services.get_movie_ids_for_genre(genre_name, repo.repo_instance)
 
-    # Retrieve the batch of movies to display on the Web page.
-    movies = services.get_movies_by_id(movie_ids[cursor:cursor + movies_per_page], repo.repo_instance)
+    return render_listing(
+        movie_ids, sort, str(genre_name) + ' Movies',
+        PageUrls('showcase_bp.movies_by_genre', genre=genre_name, cursor=CURSOR, sort=sort),
+        get_sort_urls('showcase_bp.movies_by_genre', genre=genre_name))
 
-    first_movie_url = None
-    last_movie_url = None
-    next_movie_url = None
-    prev_movie_url = None
 
-    if cursor > 0:
-        # There are preceding movies, so generate URLs for the 'previous' and 'first' navigation buttons.
-        prev_movie_url = url_for('showcase_bp.movies_by_genre', genre=genre_name, cursor=cursor - movies_per_page)
-        first_movie_url = url_for('showcase_bp.movies_by_genre', genre=genre_name)
+@showcase_blueprint.route('/movies_by_director', methods=['GET'])
+@cached_page
+def movies_by_director():
+    # Read query parameters.
+    director_name = request.args.get('director')
+    sort = get_sort()
 
-    if cursor + movies_per_page < len(movie_ids):
-        # There are further movies, so generate URLs for the 'next' and 'last' navigation buttons.
-        next_movie_url = url_for('showcase_bp.movies_by_genre', genre=genre_name, cursor=cursor + movies_per_page)
+    # Retrieve movie ids for movies that have director_name.
+    movie_ids = services.get_movie_ids_for_director(director_name, repo.repo_instance)
 
-        last_cursor = movies_per_page * int(len(movie_ids) / movies_per_page)
-        if len(movie_ids) % movies_per_page == 0:
-            last_cursor -= movies_per_page
-        last_movie_url = url_for('showcase_bp.movies_by_genre', genre=genre_name, cursor=last_cursor)
+    return render_listing(
+        movie_ids, sort, 'Movies directed by ' + str(director_name),
+        PageUrls('showcase_bp.movies_by_director', director=director_name, cursor=CURSOR, sort=sort),
+        get_sort_urls('showcase_bp.movies_by_director', director=director_name))
 
-    # Construct urls for viewing movie reviews and adding reviews.
-    for movie in movies:
-        movie['view_review_url'] = url_for('showcase_bp.movies_by_genre', genre=genre_name, cursor=cursor,
-                                           view_reviews_for=movie['id'])
-        movie['add_review_url'] = url_for('showcase_bp.write_review_on_movie', movie=movie['id'])
 
-    # Generate the webpage to display the movies.
-    return render_template(
-        'showcase/movies.html',
-        title='Movies',
-        movies_title=genre_name + ' Movies',
-        movies=movies,
-        selected_movies=utilities.get_selected_movies(len(movies) * 2),
-        actor_urls=utilities.get_actors_and_urls(),
-        director_urls=utilities.get_directors_and_urls(),
-        genre_urls=utilities.get_genres_and_urls(),
-        first_movie_url=first_movie_url,
-        last_movie_url=last_movie_url,
-        prev_movie_url=prev_movie_url,
-        next_movie_url=next_movie_url,
-        show_reviews_for_movie=movie_to_show_reviews
-    )
+@showcase_blueprint.route('/movies_by_year', methods=['GET'])
+@cached_page
+def movies_by_year():
+    # Read query parameters.
+    year = request.args.get('year', type=int)
+    decade = request.args.get('decade', type=int)
+
+    if decade is not None:
+        # A decade query parameter, such as 2010, lists the movies released in the ten years from it.
+        start_year = decade // 10 * 10
+        end_year = start_year + 9
+        movies_title = 'Movies from the ' + str(start_year) + 's'
+        listing = {'decade': start_year}
+    elif year is not None:
+        start_year = end_year = year
+        movies_title = 'Movies from ' + str(start_year)
+        listing = {'year': start_year}
+    else:
+        # Neither query parameter, so there's nothing to list.
+        return redirect(url_for('home_bp.home'))
 
+    # The movies released in the years, which the repository's year index counts, and reads a page of, without
+    # scanning the catalog. They're in year order, not ranking order, so they're paged by offset.
+    movies = services.get_movies_by_year_range(start_year, end_year, repo.repo_instance)
+    page = get_page(movies, keyset=False)
 
-@showcase_blueprint.route('/movies_by_director', methods=['GET'])
-def movies_by_director():
-    movies_per_page = 3
+    return render_page(page, services.movies_to_dict(page.items, repo.repo_instance), movies_title,
+                       PageUrls('showcase_bp.movies_by_year', cursor=CURSOR, **listing))
+
+
+@showcase_blueprint.route('/costars', methods=['GET'])
+def costars():
+    max_costars = 100
 
     # Read query parameters.
-    director_name = request.args.get('director')
-    cursor = request.args.get('cursor')
-    movie_to_show_reviews = request.args.get('view_reviews_for')
+    actor_name = request.args.get('actor')
+    limit = min(request.args.get('limit', 10, type=int), max_costars)
 
-    if movie_to_show_reviews is None:
-        # No view-reviews query parameter, so set to a non-existent movie id.
-        movie_to_show_reviews = -1
-    else:
-        # Convert movie_to_show_reviews from string to int.
-        movie_to_show_reviews = int(movie_to_show_reviews)
+    try:
+        name, degree, costar_list = services.get_costars(actor_name, limit, repo.repo_instance)
+    except services.UnknownActorException:
+        return jsonify(error='No such actor'), 404
 
-    if cursor is None:
-        # No cursor query parameter, so initialise cursor to start at the beginning.
-        cursor = 0
-    else:
-        # Convert cursor from string to int.
-        cursor = int(cursor)
+    # Construct the url of the page of movies for the actor and for each co-star.
+    actor_urls = utilities.get_actors_and_urls()
+    for costar in costar_list:
+        costar['url'] = actor_urls.get(costar['actor'])
+    return jsonify(actor=name, url=actor_urls.get(name), number_of_costars=degree, costars=costar_list)
 
-    # Retrieve movie ids for movies that have director_name.
-    movie_ids = services.get_movie_ids_for_director(director_name, repo.repo_instance)
 
-    # Retrieve the batch of movies to display on the Web page.
-    movies = services.get_movies_by_id(movie_ids[cursor:cursor + movies_per_page], repo.repo_instance)
+@showcase_blueprint.route('/separation', methods=['GET'])
+def separation():
+    # Read query parameters.
+    actor_name = request.args.get('from')
+    other_name = request.args.get('to')
 
-    first_movie_url = None
-    last_movie_url = None
-    next_movie_url = None
-    prev_movie_url = None
+    try:
+        path = services.get_separation(actor_name, other_name, repo.repo_instance)
+    except services.UnknownActorException:
+        return jsonify(error='No such actor'), 404
+
+    if path is None:
+        return jsonify(degrees=None, path=[])
+
+    # Each link in the chain is a film the two actors either side of it share.
+    actor_urls = utilities.get_actors_and_urls()
+    return jsonify(degrees=len(path) - 1, path=[{'actor': name, 'url': actor_urls.get(name)} for name in path])
+
+
+def get_sort():
+    # Reads the sort query parameter, which is None for ranking order.
+    sort = request.args.get('sort')
+    if sort not in services.SORT_ATTRIBUTES:
+        # No (or an unknown) sort query parameter, so list movies in ranking order.
+        sort = None
+    return sort
 
-    if cursor > 0:
-        # There are preceding movies, so generate URLs for the 'previous' and 'first' navigation buttons.
-        prev_movie_url = url_for('showcase_bp.movies_by_director', director=director_name,
-                                 cursor=cursor - movies_per_page)
-        first_movie_url = url_for('showcase_bp.movies_by_director', director=director_name)
 
-    if cursor + movies_per_page < len(movie_ids):
-        # There are further movies, so generate URLs for the 'next' and 'last' navigation buttons.
-        next_movie_url = url_for('showcase_bp.movies_by_director', director=director_name,
-                                 cursor=cursor + movies_per_page)
+def get_page(items, keyset: bool) -> Page:
+    # Reads the page's cursor from the query parameters. Keyset cursors are only read for sequences in ascending order,
+    # which link to their other pages by keyset too. Offset cursors, which older URLs carry, are read for any sequence.
+    after = before = None
+    if keyset:
+        after = request.args.get('after', type=int)
+        before = request.args.get('before', type=int)
+    return Page(items, MOVIES_PER_PAGE, request.args.get('cursor', type=int), after, before, keyset)
+
+
+def render_listing(movie_ids, sort, movies_title, urls: PageUrls, sort_urls):
+    # Renders a page of a listing of movie ids in ranking order, or sorted by sort. Posting lists in ranking order are
+    # ascending, so they're paged by keyset; a sorted listing is paged by offset.
+    movie_ids = services.sort_movie_ids(movie_ids, sort, repo.repo_instance)
+    page = get_page(movie_ids, keyset=sort is None)
+
+    # Retrieve the batch of movies to display on the Web page.
+    movies = services.get_movies_by_id(page.items, repo.repo_instance)
+    return render_page(page, movies, movies_title, urls, sort_urls)
 
-        last_cursor = movies_per_page * int(len(movie_ids) / movies_per_page)
-        if len(movie_ids) % movies_per_page == 0:
-            last_cursor -= movies_per_page
-        last_movie_url = url_for('showcase_bp.movies_by_director', director=director_name, cursor=last_cursor)
+
+def render_page(page: Page, movies, movies_title, urls: PageUrls, sort_urls=None):
+    movie_to_show_reviews = request.args.get('view_reviews_for', type=int)
+    if movie_to_show_reviews is None:
+        # No view-reviews query parameter, so set to a non-existent movie id.
+        movie_to_show_reviews = -1
 
     # Construct urls for viewing movie reviews and adding reviews.
+    page_url = page.url(urls)
     for movie in movies:
-        movie['view_review_url'] = url_for('showcase_bp.movies_by_director', director=director_name, cursor=cursor,
-                                           view_reviews_for=movie['id'])
-        movie['add_review_url'] = url_for('showcase_bp.write_review_on_movie', movie=movie['id'])
-    # Generate the webpage to display the movies.
+        movie['view_review_url'] = with_reviews_for(page_url, movie['id'])
+        movie['add_review_url'] = url_for('showcase_bp.review_on_movie', movie=movie['id'])
 
+    # Generate the webpage to display the movies.
     return render_template(
         'showcase/movies.html',
         title='Movies',
-        movies_title='Movies directed by ' + director_name,
+        movies_title=movies_title,
         movies=movies,
         selected_movies=utilities.get_selected_movies(len(movies) * 2),
         actor_urls=utilities.get_actors_and_urls(),
         director_urls=utilities.get_directors_and_urls(),
         genre_urls=utilities.get_genres_and_urls(),
-        first_movie_url=first_movie_url,
-        last_movie_url=last_movie_url,
-        prev_movie_url=prev_movie_url,
-        next_movie_url=next_movie_url,
-        show_reviews_for_movie=movie_to_show_reviews
+        sort_urls=sort_urls,
+        show_reviews_for_movie=movie_to_show_reviews,
+        **page.navigation(urls)
     )
 
 
+def get_sort_urls(endpoint, **kwargs):
+    # URLs for the same listing in ranking order and in each of the other orders it can be sorted in.
+    sort_urls = {'Rank': url_for(endpoint, **kwargs)}
+    for sort in services.SORT_ATTRIBUTES:
+        sort_urls[sort.title()] = url_for(endpoint, sort=sort, **kwargs)
+    return sort_urls
+
+
+def get_order_urls(movie_id, per_page):
+    # URLs for the ranking in each order it can be listed in, each opening at the page with the movie on it.
+    order_urls = dict()
+    for order in services.RANKING_ORDERS:
+        order_urls[order.title()] = url_for('showcase_bp.movies_by_ranking', id=movie_id,
+                                            order=order if order != 'rank' else None, per_page=per_page)
+    return order_urls
+
+
 @showcase_blueprint.route('/review', methods=['GET', 'POST'])
 @login_required
 def review_on_movie():
@@ -320,8 +356,12 @@ def review_on_movie():
         # Extract the movie id, representing the reviewed movie, from the form.
         movie_id = int(form.movie_id.data)
 
-        # Use the service layer to store the new review.
-        services.add_review(movie_id, form.review.data, username, repo.repo_instance)
+        if current_app.config.get('REVIEW_MODERATION') == 'queued':
+            # Accept the review now, and publish it once it has been screened for profanity.
+            get_moderation_queue().submit(movie_id, form.review.data, username)
+        else:
+            # Use the service layer to store the new review.
+            publish_review(movie_id, form.review.data, username)
 
         # Retrieve the movie in dict form.
         movie = services.get_movie(movie_id, repo.repo_instance)
@@ -355,6 +395,32 @@ def review_on_movie():
     )
 
 
+def publish_review(movie_id, review_text, username):
+    services.add_review(movie_id, review_text, username, repo.repo_instance)
+    utilities.discard_movie_fragments(movie_id)
+    utilities.discard_pages()
+
+
+# Reviews waiting for moderation, when reviews are moderated after they're accepted.
+_moderation = {
+    'queue': None,
+}
+
+
+def get_moderation_queue():
+    if _moderation['queue'] is None:
+        _moderation['queue'] = ModerationQueue(publish_queued_review, current_app.config.get('MODERATION_WORKERS', 1))
+    return _moderation['queue']
+
+
+def publish_queued_review(movie_id, review_text, username):
+    # The movie or user may have gone by the time the review has been screened, in which case the review is dropped.
+    try:
+        publish_review(movie_id, review_text, username)
+    except (services.NonExistentMovieException, services.UnknownUserException):
+        pass
+
+
 class ProfanityFree:
     def __init__(self, message=None):
         if not message:
@@ -362,7 +428,10 @@ class ProfanityFree:
         self.message = message
 
     def __call__(self, form, field):
-        if profanity.contains_profanity(field.data):
+        # Queued reviews are screened in the background instead.
+        if current_app.config.get('REVIEW_MODERATION') == 'queued':
+            return
+        if get_matcher().contains_profanity(field.data):
             raise ValidationError(self.message)
 
 
@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+
+
+class FragmentCache:
+    """ An LRU cache of rendered HTML fragments, capped at a total size in bytes.
+
+    Keys are tuples that start with the kind of fragment and the id of the entity it shows, e.g. ('movie', 7, ...), so
+    that every fragment for an entity can be discarded at once. Each fragment is stored with a version, and a fragment
+    whose version differs from the one asked for is rendered again.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._fragments = OrderedDict()
+        self._keys_by_entity = dict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def get(self, key: tuple, version, render) -> str:
+        # Returns the fragment for key, calling render() to produce it if it isn't cached at this version.
+        fragment = self.lookup(key, version)
+        if fragment is None:
+            # Render outside the lock, so that a slow render doesn't hold up other requests.
+            fragment = render()
+            self.put(key, version, fragment)
+        return fragment
+
+    def lookup(self, key: tuple, version):
+        # Returns the fragment for key if it's cached at this version, otherwise None.
+        with self._lock:
+            entry = self._fragments.get(key)
+            if entry is not None and entry[0] == version:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+                self.bytes_saved += entry[2]
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, version, fragment: str):
+        size = len(fragment.encode('utf-8'))
+        if size <= self.max_bytes:
+            with self._lock:
+                self._remove(key)
+                self._fragments[key] = (version, fragment, size)
+                self._keys_by_entity.setdefault(key[:2], set()).add(key)
+                self.size += size
+                while self.size > self.max_bytes:
+                    self._remove(next(iter(self._fragments)))
+                    self.evictions += 1
+
+    def discard(self, kind: str, entity_id):
+        # Removes every fragment for the entity.
+        with self._lock:
+            for key in list(self._keys_by_entity.get((kind, entity_id), ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+            self._keys_by_entity.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'fragments': len(self._fragments),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'bytes_saved': self.bytes_saved,
+        }
+
+    def _remove(self, key):
+        entry = self._fragments.pop(key, None)
+        if entry is not None:
+            self.size -= entry[2]
+            keys = self._keys_by_entity[key[:2]]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_entity[key[:2]]
@@ -0,0 +1,105 @@
+import re
+from bisect import bisect_right
+
+from better_profanity import profanity
+from better_profanity.utils import get_complete_path_of_file, read_wordlist
+
+# Separates the texts of a batch. It isn't a word character, and separators between the words of a swear word never
+# span it, so a match can't start in one text and end in the next.
+_TEXT_SEPARATOR = '\x00'
+
+# better_profanity's words are runs of letters, digits and the characters below, which stand in for letters. Its
+# letters are a list of Unicode alphabetic characters, which \w covers apart from the underscore; the underscore
+# separates words.
+_SYMBOLS = '@$*"\''
+_WORD_CHARACTER = f'(?:[^\\W_]|[{re.escape(_SYMBOLS)}])'
+_SEPARATORS = f'(?:[^\\w{re.escape(_SYMBOLS)}{_TEXT_SEPARATOR}]|_)*'
+
+
+class ProfanityMatcher:
+    """ Finds swear words with one regular expression compiled from better_profanity's wordlist.
+
+    better_profanity censors a text word by word in Python, comparing each word, and each run of it with the following
+    words, against a set of every leetspeak spelling of every swear word. Here the wordlist is compiled into a trie of
+    character classes, e.g. 'a' matches any of 'a@*4', with an optional run of separators between characters so that
+    'bull shit' and 'b.u.l.l.s.h.i.t' match 'bullshit'. A match has to start and end on word boundaries, as
+    better_profanity's words do. The regular expression engine then scans a whole text, or a whole batch of texts, in
+    one call, about ten times as fast as better_profanity.
+    """
+
+    def __init__(self, words=None):
+        if words is None:
+            words = read_wordlist(get_complete_path_of_file('profanity_wordlist.txt'))
+
+        self._chars_mapping = profanity.CHARS_MAPPING
+
+        trie = dict()
+        for word in words:
+            node = trie
+            for char in word.lower():
+                if char in profanity.ALLOWED_CHARACTERS:
+                    node = node.setdefault(char, dict())
+            node[''] = True
+
+        self._pattern = re.compile(
+            f'(?<!{_WORD_CHARACTER})' + self._trie_pattern(trie) + f'(?!{_WORD_CHARACTER})')
+
+    def contains_profanity(self, text: str) -> bool:
+        # The wordlist is in lower case, and lowering the text is quicker than matching without regard to case.
+        return self._pattern.search(text.lower()) is not None
+
+    def screen(self, texts):
+        # Returns, for each of texts, whether it contains profanity. The texts are joined and scanned together, and
+        # once a text has matched the scan skips to the next one.
+        texts = [text.replace(_TEXT_SEPARATOR, ' ').lower() for text in texts]
+        joined = _TEXT_SEPARATOR.join(texts)
+        starts = list()
+        position = 0
+        for text in texts:
+            starts.append(position)
+            position += len(text) + 1
+
+        flagged = [False] * len(texts)
+        position = 0
+        while True:
+            match = self._pattern.search(joined, position)
+            if match is None:
+                return flagged
+            i = bisect_right(starts, match.start()) - 1
+            flagged[i] = True
+            if i + 1 == len(texts):
+                return flagged
+            position = starts[i + 1]
+
+    def _trie_pattern(self, node):
+        alternatives = list()
+        for char, child in sorted(node.items()):
+            if char == '':
+                continue
+            char_class = _character_class(set(self._chars_mapping.get(char, ())) | {char})
+            if len(child) == 1 and '' in child:
+                alternatives.append(char_class)
+            elif '' in child:
+                alternatives.append(f'{char_class}(?:{_SEPARATORS}{self._trie_pattern(child)})?')
+            else:
+                alternatives.append(f'{char_class}{_SEPARATORS}{self._trie_pattern(child)}')
+        return '(?:' + '|'.join(alternatives) + ')'
+
+
+def _character_class(chars):
+    return '[' + ''.join(re.escape(char) for char in sorted(chars)) + ']'
+
+
+# One matcher per process, built the first time it's needed, so that pool workers build their own copy once.
+_matcher = None
+
+
+def get_matcher() -> ProfanityMatcher:
+    global _matcher
+    if _matcher is None:
+        _matcher = ProfanityMatcher()
+    return _matcher
+
+
+def screen_texts(texts):
+    return get_matcher().screen(texts)
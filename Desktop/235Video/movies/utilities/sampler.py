@@ -0,0 +1,61 @@
+import random
+from array import array
+
+
+class AliasSampler:
+    """ Draws indexes at random with probability proportional to their weights, using Vose's alias method.
+
+    Building the tables takes O(n) time. Each draw then takes O(1) time: pick a column uniformly, and either keep it
+    or take its alias, by comparing a uniform number with the column's probability. Items with a weight of 0 are never
+    drawn, and if every weight is 0 the items are drawn uniformly.
+    """
+
+    def __init__(self, weights):
+        weights = [max(float(weight), 0.0) for weight in weights]
+        total = sum(weights)
+        n = len(weights)
+        if total == 0:
+            weights = [1.0] * n
+            total = float(n)
+
+        self._probabilities = array('d', [0.0] * n)
+        self._aliases = array('I', range(n))
+        self._positive = sum(1 for weight in weights if weight > 0)
+
+        scaled = [weight * n / total for weight in weights]
+        small = [i for i, weight in enumerate(scaled) if weight < 1]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probabilities[less] = scaled[less]
+            self._aliases[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1
+            (small if scaled[more] < 1 else large).append(more)
+
+        # Whatever is left has a scaled weight of 1, give or take rounding error.
+        for i in small + large:
+            self._probabilities[i] = 1.0
+
+    def __len__(self):
+        return len(self._probabilities)
+
+    def draw(self, rng=random) -> int:
+        column = int(rng.random() * len(self._probabilities))
+        if rng.random() < self._probabilities[column]:
+            return column
+        return self._aliases[column]
+
+    def sample(self, k: int, rng=random):
+        # Returns up to k distinct indexes. Repeated draws are discarded, which is cheap while k is small compared with
+        # the number of items that can be drawn.
+        k = min(k, self._positive)
+        chosen = list()
+        seen = set()
+        attempts = 0
+        while len(chosen) < k and attempts < 100 * k:
+            index = self.draw(rng)
+            attempts += 1
+            if index not in seen:
+                seen.add(index)
+                chosen.append(index)
+        return chosen
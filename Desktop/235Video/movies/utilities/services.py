@@ -1,8 +1,8 @@
 from typing import Iterable
-import random
 
 from movies.adapters.repository import AbstractRepository
 from movies.domain.model import Movie
+from movies.utilities.sampler import AliasSampler
 
 
 def get_actor_names(repo: AbstractRepository):
@@ -26,14 +26,25 @@ def get_director_names(repo: AbstractRepository):
     return director_names
 
 
-def get_random_movies(quantity, repo: AbstractRepository):
-    movie_count = repo.get_number_of_movies()
+def popularity(movie: Movie):
+    # How strongly a movie is weighted when choosing what's hot: well rated movies that many people have rated.
+    return (movie.rating or 0) * (movie.votes or 0)
 
-    if quantity >= movie_count:
-        quantity = movie_count - 1
 
-    random_ids = random.sample(range(1, movie_count), quantity)
-    movies = repo.get_movies_by_id(random_ids)
+def build_popularity_sampler(repo: AbstractRepository):
+    # Returns an AliasSampler over the repository's movies, weighted by popularity, and the movie id of each index.
+    # Movie ids come from the data file's ranks and needn't run from 1 to the number of movies, so they're read from
+    # the rank index.
+    movies = repo.get_movies_by_id(list(repo.get_rank_index()))
+    movie_ids = [movie.id for movie in movies]
+
+    return AliasSampler([popularity(movie) for movie in movies]), movie_ids
+
+
+def get_popular_movies(quantity, sampler: AliasSampler, movie_ids, repo: AbstractRepository):
+    # Returns quantity distinct movies chosen at random, the more popular ones more likely, in dict form.
+    chosen_ids = [movie_ids[index] for index in sampler.sample(quantity)]
+    movies = repo.get_movies_by_id(chosen_ids)
 
     return movies_to_dict(movies)
 
@@ -1,44 +1,270 @@
-from flask import Blueprint, url_for
+import time
+from datetime import datetime
+from functools import wraps
+
+from flask import Blueprint, abort, current_app, jsonify, render_template, request, url_for
+from jinja2 import contextfunction
+from markupsafe import Markup
 
 import movies.adapters.repository as repo
 import movies.utilities.services as services
+from movies.utilities.fragment_cache import FragmentCache
 
 # Configure Blueprint.
 utilities_blueprint = Blueprint(
     'utilities_bp', __name__)
 
 
-def get_actors_and_urls():
-    actor_names = services.get_actor_names(repo.repo_instance)
-    actor_urls = dict()
-    for name in actor_names:
-        actor_urls[name] = url_for('showcase_bp.movies_by_actor', actor=name)
+# Browse URLs for every actor, director and genre. Generating these costs one url_for call per entity, so the maps
+# are built once and only rebuilt when the repository reports that its set of entities has changed.
+_url_maps = {
+    'repository': None,
+    'entity_version': None,
+    'actor_urls': dict(),
+    'director_urls': dict(),
+    'genre_urls': dict(),
+}
 
-    return actor_urls
 
+def build_url_maps():
+    repository = repo.repo_instance
+
+    actor_urls = dict()
+    for name in services.get_actor_names(repository):
+        actor_urls[name] = url_for('showcase_bp.movies_by_actor', actor=name)
 
-def get_directors_and_urls():
-    director_names = services.get_director_names(repo.repo_instance)
     director_urls = dict()
-    for name in director_names:
+    for name in services.get_director_names(repository):
         director_urls[name] = url_for('showcase_bp.movies_by_director', director=name)
 
-    return director_urls
+    genre_urls = dict()
+    for name in services.get_genre_names(repository):
+        genre_urls[name] = url_for('showcase_bp.movies_by_genre', genre=name)
+
+    _url_maps['repository'] = repository
+    _url_maps['entity_version'] = repository.get_entity_version()
+    _url_maps['actor_urls'] = actor_urls
+    _url_maps['director_urls'] = director_urls
+    _url_maps['genre_urls'] = genre_urls
+
+
+def get_url_maps():
+    repository = repo.repo_instance
+    if _url_maps['repository'] is not repository or \
+            _url_maps['entity_version'] != repository.get_entity_version():
+        build_url_maps()
+
+    return _url_maps
+
+
+def get_actors_and_urls():
+    return get_url_maps()['actor_urls']
+
+
+def get_directors_and_urls():
+    return get_url_maps()['director_urls']
 
 
 def get_genres_and_urls():
-    genre_names = services.get_genre_names(repo.repo_instance)
-    genre_urls = dict()
-    for name in genre_names:
-        genre_urls[name] = url_for('showcase_bp.movies_by_actor', genre=name)
+    return get_url_maps()['genre_urls']
+
+
+# The 'What's hot' movies in the sidebar. A popularity-weighted sampler over the catalog is built when the catalog
+# changes, and every HOT_LIST_INTERVAL seconds it picks a new hot list, which is converted to dicts once and shared by
+# all the pages rendered in that interval.
+HOT_LIST_SIZE = 10
+HOT_LIST_INTERVAL = 60
+
+_hot_list = {
+    'repository': None,
+    'catalog_version': None,
+    'sampler': None,
+    'movie_ids': None,
+    'expires': 0,
+    'generation': 0,
+    'movies': list(),
+}
+
 
-    return genre_urls
+def get_hot_list():
+    repository = repo.repo_instance
+    if _hot_list['repository'] is not repository or \
+            _hot_list['catalog_version'] != repository.get_catalog_version():
+        _hot_list['sampler'], _hot_list['movie_ids'] = services.build_popularity_sampler(repository)
+        _hot_list['repository'] = repository
+        _hot_list['catalog_version'] = repository.get_catalog_version()
+        _hot_list['expires'] = 0
+
+    now = time.monotonic()
+    if now >= _hot_list['expires']:
+        _hot_list['movies'] = services.get_popular_movies(HOT_LIST_SIZE, _hot_list['sampler'], _hot_list['movie_ids'],
+                                                          repository)
+        _hot_list['expires'] = now + HOT_LIST_INTERVAL
+        _hot_list['generation'] += 1
+
+    return _hot_list['movies']
+
+
+def get_hot_list_version():
+    # Returns a number that changes whenever a new hot list is picked.
+    get_hot_list()
+    return _hot_list['generation']
 
 
 def get_selected_movies(quantity=3):
-    movies = services.get_random_movies(quantity, repo.repo_instance)
+    return get_hot_list()[:quantity]
+
+
+# Rendered HTML for the parts of a page that are the same for many requests: the browse links in the navigation bar,
+# the sidebar movies and the movie cards. Each fragment is cached with the version of the data it was rendered from,
+# and movie cards are discarded when the movie gets a new review. Versions only mean something for one repository, so
+# the cache is cleared when the repository is replaced.
+FRAGMENT_CACHE_BYTES = 8 * 2 ** 20
+
+_fragments = {
+    'repository': None,
+    'cache': FragmentCache(FRAGMENT_CACHE_BYTES),
+}
+
+
+def get_fragment_cache():
+    repository = repo.repo_instance
+    if _fragments['repository'] is not repository:
+        _fragments['cache'].clear()
+        _fragments['repository'] = repository
+
+    return _fragments['cache']
+
+
+@utilities_blueprint.app_template_global()
+def browse_links(genre_urls, actor_urls):
+    # Pages rendered without the URL maps get an empty list of links, as before.
+    genre_urls = genre_urls or dict()
+    actor_urls = actor_urls or dict()
+    key = ('navigation', None, bool(genre_urls), bool(actor_urls))
+    return Markup(get_fragment_cache().get(
+        key, repo.repo_instance.get_entity_version(),
+        lambda: render_template('fragments/browse_links.html', genre_urls=genre_urls, actor_urls=actor_urls)))
+
+
+@utilities_blueprint.app_template_global()
+def sidebar_movies(selected_movies):
+    selected_movies = selected_movies or list()
+    key = ('sidebar', None) + tuple(movie['id'] for movie in selected_movies)
+    return Markup(get_fragment_cache().get(
+        key, repo.repo_instance.get_catalog_version(),
+        lambda: render_template('fragments/sidebar_movies.html', selected_movies=selected_movies)))
+
+
+@utilities_blueprint.app_template_global()
+@contextfunction
+def movie_card(context, movie):
+    # A card's links depend on the listing it's shown in, and it lists a page of the movie's reviews on the listing page
+    # that asked to see them, so these are part of the key. The review count is part of the version, in case a review
+    # is added without going through discard_movie_fragments.
+    expanded = movie['id'] == context.get('show_reviews_for_movie')
+    reviews_after = reviews_before = None
+    if expanded:
+        reviews_after = request.args.get('reviews_after', type=int)
+        reviews_before = request.args.get('reviews_before', type=int)
+
+    key = ('movie', movie['id'], movie.get('view_review_url'), movie.get('add_review_url'), expanded, reviews_after,
+           reviews_before)
+    version = (repo.repo_instance.get_catalog_version(), len(movie['reviews']))
+    return Markup(get_fragment_cache().get(key, version, lambda: render_movie_card(
+        context, movie, expanded, reviews_after, reviews_before)))
+
+
+def render_movie_card(context, movie, expanded, reviews_after, reviews_before):
+    reviews = list()
+    prev_reviews_url = next_reviews_url = None
+    if expanded:
+        reviews = movie['reviews'].page(after=reviews_after, before=reviews_before)
+        if len(reviews) > 0 and movie['reviews'].has_before(reviews[0]['id']):
+            prev_reviews_url = get_reviews_page_url(reviews_before=reviews[0]['id'])
+        if len(reviews) > 0 and movie['reviews'].has_after(reviews[-1]['id']):
+            next_reviews_url = get_reviews_page_url(reviews_after=reviews[-1]['id'])
+
+    return render_template(
+        'fragments/movie_card.html',
+        movie=movie,
+        reviews=reviews,
+        prev_reviews_url=prev_reviews_url,
+        next_reviews_url=next_reviews_url,
+        actor_urls=context.get('actor_urls'),
+        director_urls=context.get('director_urls'),
+        genre_urls=context.get('genre_urls'),
+        show_reviews_for_movie=context.get('show_reviews_for_movie'))
+
+
+def get_reviews_page_url(**cursor):
+    # The URL of the current page showing the page of reviews after or before a review.
+    args = request.args.to_dict()
+    args.pop('reviews_after', None)
+    args.pop('reviews_before', None)
+    args.update(cursor)
+    return url_for(request.endpoint, **args)
+
+
+def discard_movie_fragments(movie_id: int):
+    get_fragment_cache().discard('movie', movie_id)
+
+
+# Whole rendered showcase pages, keyed by URL and the user they were rendered for. A page is rendered from the catalog,
+# its entities and reviews, and the hot list, so the versions of these together are the version of every page.
+PAGE_CACHE_BYTES = 16 * 2 ** 20
+
+_pages = {
+    'repository': None,
+    'cache': FragmentCache(PAGE_CACHE_BYTES),
+    'version': None,
+    'last_modified': None,
+}
+
+
+def get_page_cache():
+    repository = repo.repo_instance
+    if _pages['repository'] is not repository:
+        _pages['cache'].clear()
+        _pages['repository'] = repository
+        _pages['version'] = None
+
+    return _pages['cache']
+
+
+def get_page_version():
+    # Returns the version of the showcase pages, and when it last changed, to the second as HTTP dates are. The time is
+    # naive UTC, as Werkzeug parses If-Modified-Since into, so that the two can be compared.
+    get_page_cache()
+    repository = repo.repo_instance
+    version = (repository.get_catalog_version(), repository.get_entity_version(), repository.get_review_version(),
+               get_hot_list_version())
+    if version != _pages['version']:
+        _pages['version'] = version
+        _pages['last_modified'] = datetime.utcnow().replace(microsecond=0)
+
+    return version, _pages['last_modified']
+
+
+def discard_pages():
+    get_page_cache().clear()
+
+
+def diagnostics_only(view):
+    # Restricts a view of internal statistics to debugging and testing. Otherwise it's as if the view didn't exist, so
+    # clients can't read how the app's caches and limits behave.
+    @wraps(view)
+    def wrapped_view(**kwargs):
+        if not (current_app.debug or current_app.testing):
+            abort(404)
+        return view(**kwargs)
+    return wrapped_view
+
 
-    return movies
+@utilities_blueprint.route('/fragment_cache', methods=['GET'])
+@diagnostics_only
+def fragment_cache_stats():
+    return jsonify(fragments=get_fragment_cache().stats(), pages=get_page_cache().stats())
 
 
 def get_watchlist_url():
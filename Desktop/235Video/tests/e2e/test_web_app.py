@@ -143,3 +143,65 @@ def test_articles_with_tag(client):
     assert b'Articles tagged by Health' in response.data
     assert b'Coronavirus: First case of virus in New Zealand' in response.data
     assert b'Covid 19 coronavirus: US deaths double in two days, Trump says quarantine not necessary' in response.data
+
+
+@pytest.mark.parametrize('query', ('per_page=abc', 'per_page=-5', 'page=-1', 'page=abc', 'id=abc',
+                                   'view_reviews_for=abc'))
+def test_movies_by_ranking_with_invalid_numbers_shows_the_first_page(client, query):
+    response = client.get('/movies_by_ranking?' + query)
+    assert response.status_code == 200
+    assert b'Rank #1<' in response.data
+
+
+def test_query_search(client):
+    response = client.get('/query?q=genre=Sci-Fi AND director=Ridley Scott AND year=2010-2016')
+    assert response.status_code == 200
+
+    assert b'Prometheus' in response.data
+    assert b'The Martian' in response.data
+
+
+def test_autocomplete(client):
+    response = client.get('/autocomplete?q=ridley&kind=director')
+    assert response.status_code == 200
+
+    assert response.get_json() == [{
+        'kind': 'director',
+        'name': 'Ridley Scott',
+        'movie_id': None,
+        'url': '/movies_by_director?director=Ridley+Scott'
+    }]
+
+
+def test_text_search(client):
+    response = client.get('/text?q=galaxy')
+    assert response.status_code == 200
+
+    assert b'Guardians of the Galaxy' in response.data
+
+
+@pytest.mark.parametrize('url', ('/query?q=genre%3DAction&page=-1', '/query?q=genre%3DAction&page=abc',
+                                 '/text?q=galaxy&page=-1'))
+def test_search_results_with_an_invalid_page_start_at_the_first_page(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert b'Guardians of the Galaxy' in response.data
+
+
+def test_movies_by_genre_sorted_by_votes(client):
+    response = client.get('/movies_by_genre?genre=Sci-Fi&sort=votes')
+    assert response.status_code == 200
+
+    assert b'Inception' in response.data
+    assert b'Guardians of the Galaxy' not in response.data
+    assert b'/movies_by_genre?genre=Sci-Fi&amp;cursor=3&amp;sort=votes' in response.data
+
+
+@pytest.mark.parametrize('url', (
+        '/movies_by_genre?genre=Action&after=1000',
+        '/movies_by_genre?genre=Action&cursor=303',
+        '/movies_by_actor?actor=Chris%20Pratt&after=99999',
+))
+def test_listing_past_the_end_is_empty(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+import movies.adapters.repository as repo
+import movies.showcase.services as showcase_services
+from movies.domain.model import User, make_review
+
+
+def test_api_lists_movies_with_the_fields_asked_for(client):
+    response = client.get('/api/movies?limit=2&fields=id,title')
+    assert response.status_code == 200
+    assert response.json['total'] == 1000
+    assert response.json['movies'] == [{'id': 1, 'title': 'Guardians of the Galaxy'}, {'id': 2, 'title': 'Prometheus'}]
+
+    next_url = response.json['links']['next']
+    assert next_url == '/api/movies?after=2&limit=2&fields=id%2Ctitle'
+    assert [movie['id'] for movie in client.get(next_url).json['movies']] == [3, 4]
+
+    response = client.get('/api/movies?actor=Chris+Pratt&sort=votes&limit=3&cursor=3&fields=id,actors')
+    assert response.json['total'] == 7
+    assert all('Chris Pratt' in movie['actors'] for movie in response.json['movies'])
+    assert response.json['links']['previous'] == \
+        '/api/movies?actor=Chris+Pratt&cursor=0&sort=votes&limit=3&fields=id%2Cactors'
+
+
+@pytest.mark.parametrize('query', ('after=1000', 'cursor=5000', 'genre=Action&after=1000', 'sort=votes&cursor=5000'))
+def test_api_answers_a_cursor_past_the_end_with_an_empty_page(client, query):
+    response = client.get('/api/movies?limit=10&fields=id&' + query)
+    assert response.status_code == 200
+    assert response.json['movies'] == []
+    assert response.json['total'] > 0
+    assert response.json['links']['next'] is None
+
+    # The previous page is the last page of the listing.
+    response = client.get(response.json['links']['previous'])
+    assert 0 < len(response.json['movies']) <= 10
+    assert response.json['links']['next'] is None
+
+
+def test_api_serves_a_movie_and_its_reviews(client):
+    movie = client.get('/api/movies/5').json
+    assert movie['title'] == 'Suicide Squad'
+    assert movie['director'] == 'David Ayer'
+    assert movie['number_of_reviews'] == 0
+
+    user = User('thorke', 'cLQ^C#oFXloS')
+    repo.repo_instance.add_user(user)
+    for i in range(3):
+        repo.repo_instance.add_review(make_review(f'Review {i}', user, repo.repo_instance.get_movie(5)))
+
+    response = client.get('/api/movies/5/reviews?limit=2')
+    assert response.json['total'] == 3
+    assert [review['review_text'] for review in response.json['reviews']] == ['Review 0', 'Review 1']
+    assert response.json['reviews'][0]['user_name'] == 'thorke'
+    response = client.get(response.json['links']['next'])
+    assert [review['review_text'] for review in response.json['reviews']] == ['Review 2']
+    assert response.json['links']['next'] is None
+
+    assert client.get('/api/movies/5000').status_code == 404
+    assert client.get('/api/movies/5/reviews?fields=bogus').status_code == 200
+    assert client.get('/api/movies/5?fields=bogus').status_code == 400
+
+
+def test_api_pages_entity_names(client):
+    response = client.get('/api/genres?limit=5')
+    assert response.json['total'] == len(repo.repo_instance.get_genres())
+    assert response.json['genres'] == [genre.genre_name for genre in repo.repo_instance.get_genres()[:5]]
+    assert response.json['links']['next'] == '/api/genres?cursor=5&limit=5'
+    assert client.get('/api/studios').status_code == 404
+
+
+def test_api_streams_the_catalog_without_keeping_it(client):
+    movie_dtos = len(showcase_services._movie_dtos)
+
+    response = client.get('/api/export/movies.ndjson?fields=id,title')
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 1000
+    assert json.loads(lines[0]) == {'id': 1, 'title': 'Guardians of the Galaxy'}
+    assert len(showcase_services._movie_dtos) == movie_dtos
+
+    assert client.get('/api/export/movies.ndjson?fields=bogus').status_code == 400
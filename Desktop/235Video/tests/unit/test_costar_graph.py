@@ -0,0 +1,48 @@
+from movies.adapters.costar_graph import CostarGraph
+from movies.domain.model import Movie
+from movies.showcase import services
+
+CASTS = [
+    ['Ann', 'Bob', 'Cat'],
+    ['Ann', 'Bob'],
+    ['Bob', 'Dan'],
+    ['Dan', 'Eve'],
+    ['Fay'],
+    ['Ann', 'Ann', 'Bob'],
+]
+
+
+def test_costar_graph_weights_pairs_by_shared_films():
+    graph = CostarGraph(CASTS)
+
+    assert graph.number_of_actors == 6
+    assert graph.number_of_pairs == 5
+    assert graph.costars('bob') == [('Ann', 3), ('Cat', 1), ('Dan', 1)]
+    assert graph.costars(' BOB ', limit=1) == [('Ann', 3)]
+    assert graph.degree('Ann') == 2 and graph.degree('Fay') == 0 and graph.degree('Nobody') == 0
+    assert graph.worked_with('Ann', 'Cat') == 1 and graph.worked_with('Ann', 'Eve') == 0
+    assert graph.top_pairs(2) == [('Ann', 'Bob', 3), ('Ann', 'Cat', 1)]
+    assert graph.name('eve') == 'Eve' and 'Fay' in graph and 'Nobody' not in graph
+
+
+def test_costar_graph_finds_the_shortest_chain_between_actors():
+    graph = CostarGraph(CASTS)
+
+    assert graph.path('Cat', 'Eve') == ['Cat', 'Bob', 'Dan', 'Eve']
+    assert graph.path('Eve', 'Cat') == ['Eve', 'Dan', 'Bob', 'Cat']
+    assert graph.path('Cat', 'Eve', max_degrees=2) is None
+    assert graph.path('Ann', 'ann') == ['Ann']
+    assert graph.path('Ann', 'Fay') is None
+    assert graph.path('Ann', 'Nobody') is None
+
+
+def test_costar_graph_is_built_from_the_catalog_and_rebuilt_when_it_changes(in_memory_repo):
+    graph = services.get_costar_graph(in_memory_repo)
+    assert services.get_costar_graph(in_memory_repo) is graph
+
+    name, degree, costars = services.get_costars('chris pratt', 3, in_memory_repo)
+    assert name == 'Chris Pratt' and degree == graph.degree('Chris Pratt') and len(costars) == 3
+    assert all(graph.worked_with('Chris Pratt', costar['actor']) == costar['shared_movies'] for costar in costars)
+
+    in_memory_repo.add_movie(Movie('One More', 2020))
+    assert services.get_costar_graph(in_memory_repo) is not graph
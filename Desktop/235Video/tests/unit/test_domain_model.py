@@ -1,6 +1,6 @@
 from datetime import date
 
-from movies.domain.model import Movie, Genre, Director, Actor, Review, make_review, User
+from movies.domain.model import Movie, Genre, Director, Actor, Review, make_review, User, EntityRegistry
 
 import pytest
 
@@ -76,3 +76,27 @@ def test_actor_construction(actor):
 
     for colleague in actor.colleagues:
         assert False
+
+
+def test_domain_objects_have_no_instance_dictionary(movie, user, actor, genre, director):
+    for entity in [movie, user, actor, genre, director]:
+        assert not hasattr(entity, '__dict__')
+
+
+def test_actor_colleagues(actor):
+    colleague = Actor('Zoe Saldana')
+    assert not actor.check_if_this_actor_worked_with(colleague)
+
+    actor.add_actor_colleague(colleague)
+    assert actor.check_if_this_actor_worked_with(colleague)
+
+
+def test_entity_registry_returns_one_instance_per_name():
+    registry = EntityRegistry()
+
+    assert registry.actor('Chris Pratt') is registry.actor(' Chris Pratt ')
+    assert registry.actor('Chris Pratt') == Actor('Chris Pratt')
+    assert hash(registry.genre('Action')) == hash(Genre('Action'))
+    assert registry.director('James Gunn') is registry.director('James Gunn')
+    assert registry.actor('') is registry.actor(None)
+    assert registry.actor('').actor_full_name is None
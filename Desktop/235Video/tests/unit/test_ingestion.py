@@ -0,0 +1,63 @@
+import csv
+import os
+
+from movies.adapters.ingestion import ingest_movies, read_csv_blocks
+from movies.adapters.memory_repository import MemoryRepository
+from movies.domain.model import Actor, Director, Genre, Movie
+
+from tests.conftest import TEST_DATA_PATH
+
+DATA_FILE = os.path.join(TEST_DATA_PATH, 'Data1000Movies.csv')
+
+
+def load_row_by_row(filename):
+    # The loader as it was before ingestion was split into blocks.
+    movies = list()
+    with open(filename, encoding='utf-8-sig') as infile:
+        reader = csv.reader(infile)
+        next(reader)
+        for row in reader:
+            row = [item.strip() for item in row]
+            movie = Movie(row[1], int(row[6]))
+            movie.add_id(int(row[0]))
+            movie.description = row[3]
+            for genre in row[2].split(","):
+                movie.add_genre(Genre(genre.strip()))
+            movie.add_director(Director(row[4]))
+            for actor in row[5].split(","):
+                movie.add_actor(Actor(actor.strip()))
+            movies.append(movie)
+    return movies
+
+
+def movie_fields(movie):
+    return movie.id, movie.title, movie.release_year, movie.description, movie.genres, movie.director, movie.actors
+
+
+def test_ingestion_in_worker_processes_matches_row_by_row_loading():
+    repo = MemoryRepository()
+    stats = ingest_movies(DATA_FILE, repo, workers=2, block_size=64)
+
+    expected = load_row_by_row(DATA_FILE)
+    assert stats.rows == len(expected) == 1000
+    assert [movie_fields(repo.get_movie(movie.id)) for movie in expected] == [movie_fields(movie) for movie in expected]
+    assert list(repo.get_movie_ids_for_genre('Sci-Fi')[:5]) == [1, 2, 13, 20, 25]
+
+
+def test_ingestion_shares_entity_instances_between_movies():
+    repo = MemoryRepository()
+    ingest_movies(DATA_FILE, repo)
+
+    guardians, passengers = repo.get_movies_by_id([1, 10])
+    chris_pratt = [actor for actor in guardians.actors if actor.actor_full_name == 'Chris Pratt'][0]
+    assert any(actor is chris_pratt for actor in passengers.actors)
+
+
+def test_csv_blocks_do_not_split_quoted_line_breaks(tmpdir):
+    filename = os.path.join(tmpdir, 'movies.csv')
+    with open(filename, 'w', encoding='utf-8') as outfile:
+        outfile.write('Rank,Title\n1,"First\nline"\n2,Second\n3,Third\n')
+
+    blocks = list(read_csv_blocks(filename, block_size=1))
+    assert [len(list(csv.reader(block))) for block in blocks] == [1, 1, 1]
+    assert list(csv.reader(blocks[0])) == [['1', 'First\nline']]
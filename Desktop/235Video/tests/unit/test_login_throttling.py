@@ -0,0 +1,90 @@
+import pytest
+from password_validator import PasswordValidator
+
+from movies.authentication.throttling import LoginThrottle
+from movies.authentication.validation import PasswordPolicy
+
+PASSWORDS = ['Abcd1234', 'abcd1234', 'ABCD1234', 'Abcdefgh', 'Abc123', 'ÀBCDÉFG1', 'abcdefg١', 'Passw0rd!', '',
+             '12345678', 'aB3' * 3, 'straße12X']
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_policy_agrees_with_password_validator():
+    schema = PasswordValidator()
+    schema.min(8).has().uppercase().has().lowercase().has().digits()
+    policy = PasswordPolicy()
+
+    assert [policy.validate(password) for password in PASSWORDS] == [schema.validate(password) for password in PASSWORDS]
+
+
+def test_throttle_refuses_a_client_that_has_used_its_burst(clock):
+    throttle = LoginThrottle(rate=0.5, burst=3, clock=clock)
+
+    assert [throttle.check('10.0.0.1', f'user{i}') for i in range(3)] == [0, 0, 0]
+    assert throttle.check('10.0.0.1', 'user3') == 2
+    assert throttle.check('10.0.0.2', 'user3') == 0
+
+    # The bucket refills at rate tokens a second.
+    clock.now += 2
+    assert throttle.check('10.0.0.1', 'user3') == 0
+    assert throttle.check('10.0.0.1', 'user3') == 2
+    assert throttle.stats()['refused'] == 2
+
+
+def test_throttle_locks_out_a_user_name_after_repeated_failures(clock):
+    throttle = LoginThrottle(rate=100, burst=100, max_failures=3, failure_window=60, clock=clock)
+
+    for _ in range(3):
+        assert throttle.check('10.0.0.1', 'Dave') == 0
+        throttle.record_failure('10.0.0.1', 'Dave')
+    assert throttle.check('10.0.0.1', ' dave') == 60
+    assert throttle.check('10.0.0.1', 'thorke') == 0
+    assert throttle.check('10.0.0.2', 'dave') == 0
+
+    clock.now += 60
+    assert throttle.check('10.0.0.1', 'dave') == 0
+
+    # A successful login clears the failures.
+    throttle.record_failure('10.0.0.1', 'dave')
+    throttle.record_failure('10.0.0.1', 'dave')
+    throttle.record_success('10.0.0.1', 'dave')
+    throttle.record_failure('10.0.0.1', 'dave')
+    assert throttle.check('10.0.0.1', 'dave') == 0
+
+
+def test_throttle_sweeps_expired_entries(clock):
+    throttle = LoginThrottle(rate=1, burst=5, failure_window=30, sweep_interval=10, clock=clock)
+    throttle.check('10.0.0.1', 'dave')
+    throttle.record_failure('10.0.0.1', 'dave')
+    assert throttle.stats()['buckets'] == 1
+    assert throttle.stats()['failures'] == 1
+
+    clock.now += 10
+    throttle.check('10.0.0.2')
+    assert throttle.stats()['buckets'] == 1
+    assert throttle.stats()['failures'] == 1
+
+    clock.now += 30
+    throttle.check('10.0.0.2')
+    assert throttle.stats()['buckets'] == 1
+    assert throttle.stats()['failures'] == 0
+
+
+def test_login_statistics_are_only_served_when_testing_or_debugging(client):
+    assert set(client.get('/authentication/login_stats').json) == {'hashing', 'throttle'}
+
+    client.application.testing = False
+    client.application.debug = False
+    assert client.get('/authentication/login_stats').status_code == 404
@@ -0,0 +1,71 @@
+import pytest
+from better_profanity import profanity
+
+from movies.showcase.moderation import ModerationQueue
+from movies.utilities.profanity_filter import ProfanityMatcher
+
+REVIEWS = [
+    'This movie was great fun',
+    'What a load of bullshit',
+    'The bull shit plot',
+    'Sh1t acting',
+    'A$$hole director',
+    'Classic film, assessment positive',
+    'Scunthorpe United',
+    "It's the shit!",
+    'F*ck this',
+    'A cocktail party for the analyst and the therapist',
+    'Dickens novel',
+    'Hand_job',
+    'Café shit',
+]
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return ProfanityMatcher()
+
+
+def test_matcher_agrees_with_better_profanity(matcher):
+    assert [matcher.contains_profanity(review) for review in REVIEWS] == \
+        [profanity.contains_profanity(review) for review in REVIEWS]
+
+
+def test_matcher_screens_a_batch_as_it_screens_each_review(matcher):
+    # Words at the ends of neighbouring reviews mustn't join up into a swear word.
+    reviews = REVIEWS + ['Bull', 'shit happens', 'fine']
+    assert matcher.screen(reviews) == [matcher.contains_profanity(review) for review in reviews]
+    assert matcher.screen(['A great bull', 'Shiteless']) == [False, False]
+    assert matcher.screen([]) == []
+
+
+def test_moderation_queue_publishes_clean_reviews_in_order():
+    published = list()
+    moderation_queue = ModerationQueue(lambda *review: published.append(review), workers=1, batch_size=4)
+    for i, review in enumerate(REVIEWS):
+        moderation_queue.submit(i, review, 'thorke')
+    moderation_queue.join()
+
+    expected = [(i, review, 'thorke') for i, review in enumerate(REVIEWS) if not profanity.contains_profanity(review)]
+    assert published == expected
+    assert moderation_queue.published == len(expected)
+    assert moderation_queue.rejected == len(REVIEWS) - len(expected)
+
+
+def test_moderation_queue_keeps_publishing_after_publish_fails():
+    published = list()
+
+    def publish(movie_id, review_text, username):
+        if movie_id == 0:
+            raise RuntimeError('database is locked')
+        published.append(movie_id)
+
+    moderation_queue = ModerationQueue(publish, workers=1, batch_size=1)
+    moderation_queue.submit(0, 'This movie was great fun', 'thorke')
+    moderation_queue.join()
+    moderation_queue.submit(1, 'Scunthorpe United', 'thorke')
+    moderation_queue.join()
+
+    assert published == [1]
+    assert moderation_queue.failed == 1
+    assert moderation_queue.published == 1
@@ -0,0 +1,69 @@
+from array import array
+
+from movies.showcase import services
+from movies.showcase.pagination import CURSOR, Page, PageUrls, with_reviews_for
+
+MOVIE_IDS = array('I', [2, 3, 5, 8, 13, 21, 34])
+
+
+def test_page_finds_the_same_items_by_offset_and_by_keyset():
+    assert list(Page(MOVIE_IDS, 3).items) == [2, 3, 5]
+    assert list(Page(MOVIE_IDS, 3, cursor=3).items) == [8, 13, 21]
+    assert list(Page(MOVIE_IDS, 3, after=5).items) == [8, 13, 21]
+    assert list(Page(MOVIE_IDS, 3, after=6).items) == [8, 13, 21]
+    assert list(Page(MOVIE_IDS, 3, before=34).items) == [8, 13, 21]
+    assert list(Page(MOVIE_IDS, 3, before=5).items) == [2, 3, 5]
+    assert list(Page(MOVIE_IDS, 3, after=34).items) == []
+    assert list(Page(MOVIE_IDS, 3, cursor=99).items) == []
+
+
+def test_page_links_to_the_pages_around_it(client):
+    with client.application.test_request_context():
+        urls = PageUrls('showcase_bp.movies_by_genre', genre='Sci-Fi', cursor=CURSOR, sort=None)
+        assert urls.first == '/movies_by_genre?genre=Sci-Fi'
+
+        navigation = Page(MOVIE_IDS, 3, after=5).navigation(urls)
+        assert navigation == {
+            'first_movie_url': '/movies_by_genre?genre=Sci-Fi',
+            'prev_movie_url': '/movies_by_genre?genre=Sci-Fi&before=8',
+            'next_movie_url': '/movies_by_genre?genre=Sci-Fi&after=21',
+            'last_movie_url': '/movies_by_genre?genre=Sci-Fi&after=21',
+        }
+        assert Page(MOVIE_IDS, 3, keyset=True).navigation(urls)['prev_movie_url'] is None
+        assert Page(MOVIE_IDS, 3, after=21).navigation(urls)['next_movie_url'] is None
+
+        urls = PageUrls('showcase_bp.movies_by_genre', genre='Sci-Fi', cursor=CURSOR, sort='votes')
+        page = Page(MOVIE_IDS, 3, cursor=3)
+        assert page.navigation(urls)['last_movie_url'] == '/movies_by_genre?genre=Sci-Fi&cursor=6&sort=votes'
+        assert with_reviews_for(page.url(urls), 13) == \
+            '/movies_by_genre?genre=Sci-Fi&cursor=3&sort=votes&view_reviews_for=13'
+
+
+def test_page_past_the_end_links_back_to_the_last_page(client):
+    with client.application.test_request_context():
+        urls = PageUrls('showcase_bp.movies_by_genre', genre='Sci-Fi', cursor=CURSOR, sort=None)
+        for page in (Page(MOVIE_IDS, 3, after=34), Page(MOVIE_IDS, 3, after=99)):
+            assert list(page.items) == []
+            assert page.navigation(urls) == {
+                'first_movie_url': '/movies_by_genre?genre=Sci-Fi',
+                'prev_movie_url': '/movies_by_genre?genre=Sci-Fi&after=21',
+                'next_movie_url': None,
+                'last_movie_url': None,
+            }
+
+        urls = PageUrls('showcase_bp.movies_by_genre', genre='Sci-Fi', cursor=CURSOR, sort='votes')
+        page = Page(MOVIE_IDS, 3, cursor=7)
+        assert list(page.items) == []
+        assert page.navigation(urls)['prev_movie_url'] == '/movies_by_genre?genre=Sci-Fi&cursor=6&sort=votes'
+        assert page.url(urls) == '/movies_by_genre?genre=Sci-Fi&cursor=7&sort=votes'
+
+        assert Page(array('I'), 3, after=5).navigation(urls)['prev_movie_url'] is None
+
+
+def test_page_reads_only_its_slice_of_a_lazy_sequence(in_memory_repo):
+    movies = services.get_movies_by_year_range(2016, 2016, in_memory_repo)
+    assert len(movies) == in_memory_repo.count_movies_by_year_range(2016, 2016)
+
+    page = Page(movies, 3, cursor=6)
+    assert page.items == in_memory_repo.get_movies_by_year_range(2016, 2016, 3, 6)
+    assert page.total == len(movies)
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+from werkzeug.security import check_password_hash, generate_password_hash
+
+import movies.authentication.hashing as hashing
+import movies.authentication.services as services
+from movies.adapters.memory_repository import MemoryRepository
+from movies.authentication.hashing import HashingBusyException, PasswordHasher
+from movies.domain.model import User
+
+
+def test_hasher_hashes_at_the_configured_cost():
+    hasher = PasswordHasher(iterations=1000)
+    password_hash = hasher.hash('Abcd1234')
+
+    assert password_hash.startswith('pbkdf2:sha256:1000$')
+    assert check_password_hash(password_hash, 'Abcd1234')
+    assert hasher.check(password_hash, 'Abcd1234')
+    assert not hasher.check(password_hash, 'abcd1234')
+    assert not hasher.needs_rehash(password_hash)
+    assert hasher.needs_rehash(generate_password_hash('Abcd1234', 'pbkdf2:sha256:2000'))
+
+
+def test_hasher_hashes_in_worker_processes():
+    hasher = PasswordHasher(iterations=1000, workers=2)
+    try:
+        password_hashes = [hasher.hash(f'Abcd123{i}') for i in range(4)]
+        assert all(hasher.check(password_hash, f'Abcd123{i}') for i, password_hash in enumerate(password_hashes))
+        assert hasher.stats()['completed'] == 8
+        assert hasher.stats()['pending'] == 0
+    finally:
+        hasher.close()
+
+
+def test_hasher_turns_work_away_when_full():
+    hasher = PasswordHasher(iterations=1000, max_pending=1, wait=0.01)
+    started = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        started.set()
+        release.wait()
+
+    holder = threading.Thread(target=hasher._run, args=(hold,))
+    holder.start()
+    started.wait()
+    try:
+        assert hasher.stats()['pending'] == 1
+        with pytest.raises(HashingBusyException):
+            hasher.hash('Abcd1234')
+        assert hasher.stats()['rejected'] == 1
+    finally:
+        release.set()
+        holder.join()
+
+    assert hasher.stats()['pending'] == 0
+    assert hasher.stats()['peak_pending'] == 1
+    assert hasher.check(hasher.hash('Abcd1234'), 'Abcd1234')
+
+
+def test_login_rehashes_a_password_hashed_at_another_cost(monkeypatch):
+    monkeypatch.setattr(hashing, 'hasher_instance', PasswordHasher(iterations=1000))
+    repo = MemoryRepository()
+    repo.add_user(User('dave', generate_password_hash('Abcd1234', 'pbkdf2:sha256:2000')))
+
+    with pytest.raises(services.AuthenticationException):
+        services.authenticate_user('dave', 'abcd1234', repo)
+    assert repo.get_user('dave').password.startswith('pbkdf2:sha256:2000$')
+
+    services.authenticate_user('dave', 'Abcd1234', repo)
+    password_hash = repo.get_user('dave').password
+    assert password_hash.startswith('pbkdf2:sha256:1000$')
+
+    # The new hash checks, and isn't replaced again.
+    services.authenticate_user('dave', 'Abcd1234', repo)
+    assert repo.get_user('dave').password == password_hash
@@ -0,0 +1,288 @@
+import time
+
+import pytest
+
+from movies.adapters.memory_repository import MemoryRepository
+from movies.adapters.repository import RepositoryException
+from movies.domain.model import User, Movie, Actor, Director, Genre, Review, make_review
+
+
+def test_repository_retrieves_a_user_regardless_of_case(in_memory_repo):
+    user = User('Dave', '123456789')
+    in_memory_repo.add_user(user)
+
+    assert in_memory_repo.get_user('dave') is user
+    assert in_memory_repo.get_user(' DAVE ') is user
+
+
+def test_repository_does_not_duplicate_entities_shared_by_movies(in_memory_repo):
+    number_of_actors = len(in_memory_repo.get_actors())
+    number_of_genres = len(in_memory_repo.get_genres())
+
+    movie = Movie('Passengers 2', 2020)
+    movie.add_actor(Actor('Chris Pratt'))
+    movie.add_genre(Genre('Sci-Fi'))
+    in_memory_repo.add_movie(movie)
+
+    assert len(in_memory_repo.get_actors()) == number_of_actors
+    assert len(in_memory_repo.get_genres()) == number_of_genres
+
+
+def test_repository_returns_movie_ids_for_actor_in_rank_order(in_memory_repo):
+    movie_ids = in_memory_repo.get_movie_ids_for_actor('Chris Pratt')
+
+    assert list(movie_ids) == [1, 10, 39, 86, 385, 407, 697]
+    assert list(movie_ids[3:6]) == [86, 385, 407]
+
+
+def test_repository_returns_movie_ids_for_director(in_memory_repo):
+    movie_ids = in_memory_repo.get_movie_ids_for_director('Ridley Scott')
+
+    assert list(movie_ids) == [2, 103, 388, 471, 517, 522, 531, 738]
+
+
+def test_repository_returns_movie_ids_for_genre(in_memory_repo):
+    movie_ids = in_memory_repo.get_movie_ids_for_genre('Sci-Fi')
+
+    assert len(movie_ids) == 120
+    assert list(movie_ids[:5]) == [1, 2, 13, 20, 25]
+
+
+def test_repository_returns_no_movie_ids_for_non_existent_actor(in_memory_repo):
+    assert len(in_memory_repo.get_movie_ids_for_actor('Nobody Atall')) == 0
+
+
+def test_repository_keeps_posting_lists_sorted_when_movies_arrive_out_of_order():
+    repo = MemoryRepository()
+    for movie_id in [3, 1, 2]:
+        movie = Movie(f'Guardians of the Galaxy Vol. {movie_id}', 2013 + movie_id)
+        movie.add_id(movie_id)
+        movie.add_actor(Actor('Chris Pratt'))
+        repo.add_movie(movie)
+
+    assert list(repo.get_movie_ids_for_actor('Chris Pratt')) == [1, 2, 3]
+
+
+def test_repository_numbers_movies_alike_one_at_a_time_and_in_batches():
+    repo = MemoryRepository()
+    numbered = Movie('Numbered', 2010)
+    numbered.add_id(5)
+    repo.add_movie(numbered)
+    first, second = Movie('First', 2011), Movie('Second', 2012)
+    repo.add_movies([first, second])
+    third = Movie('Third', 2013)
+    repo.add_movie(third)
+
+    assert [first.id, second.id, third.id] == [6, 7, 8]
+
+    duplicate = Movie('Duplicate', 2014)
+    duplicate.add_id(7)
+    with pytest.raises(RepositoryException):
+        repo.add_movies([Movie('Unnumbered', 2014), duplicate])
+    with pytest.raises(RepositoryException):
+        repo.add_movie(duplicate)
+    assert repo.get_number_of_movies() == 4
+    assert repo.get_movie(7) is second
+
+
+def test_repository_loads_numeric_movie_attributes(in_memory_repo):
+    movie = in_memory_repo.get_movie(1)
+
+    assert movie.runtime_minutes == 121
+    assert movie.rating == 8.1
+    assert movie.votes == 757074
+    assert movie.revenue_millions == 333.13
+    assert movie.metascore == 76
+
+
+def test_repository_loads_long_runtimes_and_skips_values_too_large_to_store(in_memory_repo):
+    movie = Movie('Logistics', 2012)
+    movie.runtime_minutes = 51420
+    movie.votes = 2 ** 40
+    in_memory_repo.add_movie(movie)
+    long_movie = Movie('Longer Still', 2020)
+    long_movie.runtime_minutes = 100000
+    in_memory_repo.add_movie(long_movie)
+
+    assert in_memory_repo.sort_movie_ids([1, movie.id, long_movie.id], 'runtime_minutes') == \
+        [long_movie.id, movie.id, 1]
+    # Votes beyond the column's range are treated as missing, so the movie sorts last.
+    assert in_memory_repo.sort_movie_ids([1, movie.id], 'votes') == [1, movie.id]
+
+
+def test_repository_sorts_movie_ids_by_numeric_attribute(in_memory_repo):
+    movie_ids = in_memory_repo.sort_movie_ids(in_memory_repo.get_movie_ids_for_genre('Sci-Fi'), 'votes')
+
+    # Inception, Interstellar and The Avengers.
+    assert movie_ids[:3] == [81, 37, 77]
+
+
+def test_repository_sorts_movies_without_a_value_last(in_memory_repo):
+    movie = Movie('Alien: Covenant 2', 2022)
+    movie.add_director(Director('Ridley Scott'))
+    in_memory_repo.add_movie(movie)
+
+    movie_ids = in_memory_repo.sort_movie_ids(in_memory_repo.get_movie_ids_for_director('Ridley Scott'),
+                                              'revenue_millions')
+    assert movie_ids == [103, 471, 2, 388, 517, 738, 522, 531, movie.id]
+
+
+def test_repository_filters_movie_ids_by_numeric_attribute(in_memory_repo):
+    movie_ids = in_memory_repo.filter_movie_ids(in_memory_repo.get_movie_ids_for_genre('Sci-Fi'), 'rating', 8.0)
+
+    assert list(movie_ids) == [1, 20, 37, 65, 68, 77, 81, 103, 141, 163, 174, 469]
+
+
+def test_repository_counts_and_pages_reviews_by_movie_and_by_user(in_memory_repo):
+    dave = User('Dave', '123456789')
+    fiona = User('Fiona', '123456789')
+    in_memory_repo.add_user(dave)
+    in_memory_repo.add_user(fiona)
+    movie = in_memory_repo.get_movie(1)
+    for i in range(7):
+        in_memory_repo.add_review(make_review(f'Review {i}', dave if i % 2 == 0 else fiona, movie))
+    in_memory_repo.add_review(make_review('Another movie', dave, in_memory_repo.get_movie(2)))
+
+    assert in_memory_repo.count_reviews_for_movie(1) == 7
+    assert in_memory_repo.count_reviews_for_user('DAVE') == 5
+    assert in_memory_repo.count_reviews_for_movie(3) == 0
+
+    first_page = in_memory_repo.get_reviews_for_movie(1, 3)
+    assert [review.review_text for review in first_page] == ['Review 0', 'Review 1', 'Review 2']
+    second_page = in_memory_repo.get_reviews_for_movie(1, 3, after=first_page[-1].id)
+    assert [review.review_text for review in second_page] == ['Review 3', 'Review 4', 'Review 5']
+    assert in_memory_repo.get_reviews_for_movie(1, 3, before=second_page[0].id) == first_page
+    assert [review.review_text for review in in_memory_repo.get_reviews_for_user('dave', 2, after=first_page[0].id)] \
+        == ['Review 2', 'Review 4']
+    assert in_memory_repo.get_review(second_page[0].id) is second_page[0]
+
+
+def test_repository_orders_reviews_by_timestamp_when_they_arrive_out_of_order(in_memory_repo):
+    user = User('Dave', '123456789')
+    in_memory_repo.add_user(user)
+    movie = in_memory_repo.get_movie(1)
+    earlier = make_review('Earlier', user, movie)
+    time.sleep(0.001)
+    later = make_review('Later', user, movie)
+
+    in_memory_repo.add_review(later)
+    in_memory_repo.add_review(earlier)
+
+    assert in_memory_repo.get_reviews_for_movie(1) == [earlier, later]
+    assert in_memory_repo.get_reviews_for_movie(1, 1, after=earlier.id) == [later]
+
+
+def test_repository_finds_reviews_by_their_own_ids(in_memory_repo):
+    user = User('Dave', '123456789')
+    in_memory_repo.add_user(user)
+    reviews = [make_review(f'Review {i}', user, in_memory_repo.get_movie(1)) for i in range(3)]
+    for review, review_id in zip(reviews, [7, 3, 12]):
+        review.add_id(review_id)
+    in_memory_repo.add_review(reviews[0])
+    in_memory_repo.add_reviews(reviews[1:])
+    new_review = make_review('Review 3', user, in_memory_repo.get_movie(1))
+    in_memory_repo.add_review(new_review)
+
+    assert [in_memory_repo.get_review(review_id) for review_id in [7, 3, 12]] == reviews
+    assert in_memory_repo.get_review(1) is None
+    assert new_review.id == 13
+    assert in_memory_repo.count_reviews_for_movie(1) == 4
+
+    duplicate = make_review('Review 4', user, in_memory_repo.get_movie(1))
+    duplicate.add_id(3)
+    with pytest.raises(ValueError):
+        in_memory_repo.add_review(duplicate)
+    assert in_memory_repo.get_review(3) is reviews[1]
+
+
+def test_repository_adds_a_batch_of_reviews_as_add_review_does(in_memory_repo):
+    user = User('Dave', '123456789')
+    in_memory_repo.add_user(user)
+    movie = in_memory_repo.get_movie(1)
+    earlier = make_review('Earlier', user, movie)
+    time.sleep(0.001)
+    in_memory_repo.add_review(make_review('Later', user, movie))
+    batch = [make_review(f'Review {i}', user, in_memory_repo.get_movie(i % 2 + 1)) for i in range(4)]
+
+    in_memory_repo.add_reviews(review for review in batch + [earlier])
+
+    assert [review.id for review in batch + [earlier]] == [2, 3, 4, 5, 6]
+    assert [review.review_text for review in in_memory_repo.get_reviews_for_movie(1)] == \
+        ['Earlier', 'Later', 'Review 0', 'Review 2']
+    assert [review.review_text for review in in_memory_repo.get_reviews_for_user('dave', 3, after=earlier.id)] == \
+        ['Later', 'Review 0', 'Review 1']
+    assert in_memory_repo.get_review_version() == 6
+
+
+def test_repository_adds_no_reviews_from_a_batch_with_an_unattached_review(in_memory_repo):
+    user = User('Dave', '123456789')
+    movie = in_memory_repo.get_movie(1)
+    with pytest.raises(RepositoryException):
+        in_memory_repo.add_reviews([make_review('Attached', user, movie), Review(user, movie, 'Not attached')])
+    assert in_memory_repo.get_review_version() == 0
+
+
+def test_repository_adds_a_batch_of_movies_from_any_iterable():
+    repo = MemoryRepository()
+    repo.add_movies(Movie(title, 2020) for title in ['Zeta', 'Alpha', 'Mu'])
+
+    assert [movie.title for movie in repo.get_movies_by_id(iter([3, 1, 7, 2]))] == ['Mu', 'Zeta', 'Alpha']
+    assert repo.get_catalog_version() == 3
+
+
+def test_repository_ranks_the_catalog_in_each_ordering(in_memory_repo):
+    by_rank = in_memory_repo.get_rank_index()
+    assert list(by_rank) == list(range(1, 1001))
+    assert by_rank.previous(5) == 4 and by_rank.next(5) == 6
+    assert by_rank.previous(1) is None and by_rank.next(1000) is None and by_rank.next(5000) is None
+
+    by_rating = in_memory_repo.get_rank_index('rating')
+    ratings = [in_memory_repo.get_movie(movie_id).rating for movie_id in by_rating]
+    assert ratings == sorted(ratings, reverse=True)
+
+    by_year = in_memory_repo.get_rank_index('year')
+    years = [in_memory_repo.get_movie(movie_id).release_year for movie_id in by_year]
+    assert years == sorted(years, reverse=True)
+    assert by_year.first() == 3
+
+    by_title = in_memory_repo.get_rank_index('title')
+    titles = [in_memory_repo.get_movie(movie_id).title for movie_id in by_title]
+    assert titles == sorted(titles)
+
+
+def test_repository_pages_a_rank_index_and_rebuilds_it_for_new_movies(in_memory_repo):
+    by_rank = in_memory_repo.get_rank_index()
+    assert list(by_rank.page(3, 7)) == list(range(15, 22))
+    assert list(by_rank.page(143, 7)) == [995, 996, 997, 998, 999, 1000]
+    assert list(by_rank.page(144, 7)) == [] and list(by_rank.page(0, 7)) == []
+    assert by_rank.number_of_pages(7) == 143
+    assert by_rank.page_of(15, 7) == 3 and by_rank.page_of(14, 7) == 2 and by_rank.page_of(5000, 7) is None
+    assert in_memory_repo.get_rank_index() is by_rank
+
+    movie = Movie('Aaa', 2030)
+    in_memory_repo.add_movie(movie)
+    assert in_memory_repo.get_rank_index() is not by_rank
+    assert in_memory_repo.get_last_movie() is movie
+    assert in_memory_repo.get_rank_index('year').first() == movie.id
+    by_title = in_memory_repo.get_rank_index('title')
+    titles = [in_memory_repo.get_movie(movie_id).title for movie_id in by_title]
+    assert by_title.position(movie.id) == titles.index('Aaa') and titles == sorted(titles)
+
+
+def test_repository_lists_movies_in_a_range_of_years(in_memory_repo):
+    movies = in_memory_repo.get_movies_by_year_range(2010, 2011)
+    assert len(movies) == in_memory_repo.count_movies_by_year_range(2010, 2011)
+    assert [(movie.release_year, movie.id) for movie in movies] == \
+        sorted((movie.release_year, movie.id) for movie in movies)
+    assert {movie.release_year for movie in movies} == {2010, 2011}
+
+    assert in_memory_repo.get_movies_by_year_range(2010, 2011, limit=3, cursor=3) == movies[3:6]
+    assert in_memory_repo.get_movies_by_year_range(2010, 2011, limit=3, cursor=len(movies)) == []
+    assert in_memory_repo.count_movies_by_year_range() == 1000
+    assert in_memory_repo.count_movies_by_year_range(2011, 2010) == 0
+    assert in_memory_repo.count_movies_by_year_range(1900, 2005) == 0
+
+    movie = Movie('Far Future', 2090)
+    in_memory_repo.add_movie(movie)
+    assert in_memory_repo.get_movies_by_year_range(2050) == [movie]
+    assert [movie.title for movie in in_memory_repo.get_movies_by_release_year(2090)] == ['Far Future']
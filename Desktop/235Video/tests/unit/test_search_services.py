@@ -0,0 +1,152 @@
+import pytest
+
+from movies.adapters.text_index import TextIndex
+from movies.domain.model import Movie, Actor, Genre
+from movies.search import services as search_services
+
+
+def test_parse_query_with_conjunctions_and_disjunctions():
+    clauses = search_services.parse_query('genre=Sci-Fi AND director=Ridley Scott AND year 2010–2016 OR actor=Chris Pratt')
+
+    assert clauses == [
+        [('genre', 'Sci-Fi'), ('director', 'Ridley Scott'), ('year', (2010, 2016))],
+        [('actor', 'Chris Pratt')],
+    ]
+
+
+def test_parse_query_with_numeric_ranges():
+    clauses = search_services.parse_query('genre=Sci-Fi AND rating=7.5+ AND votes=1000-500000 AND runtime 120')
+
+    assert clauses == [
+        [('genre', 'Sci-Fi'), ('rating', (7.5, None)), ('votes', (1000, 500000)), ('runtime', (120, 120))],
+    ]
+
+
+@pytest.mark.parametrize('query', ('', 'Sci-Fi', 'genre=Sci-Fi AND year=recent', 'colour=blue', 'rating=8+',
+                                   'genre=Sci-Fi AND rating=high'))
+def test_parse_query_rejects_invalid_queries(query):
+    with pytest.raises(search_services.InvalidQueryException):
+        search_services.parse_query(query)
+
+
+def test_search_movies_intersects_criteria(in_memory_repo):
+    movie_ids, has_next_page = search_services.search_movies(
+        'genre=Sci-Fi AND director=Ridley Scott AND year=2010-2016', in_memory_repo)
+
+    # Prometheus and The Martian.
+    assert movie_ids == [2, 103]
+    assert has_next_page is False
+
+
+def test_search_movies_merges_clauses_in_ranking_order(in_memory_repo):
+    movie_ids, has_next_page = search_services.search_movies(
+        'actor=Chris Pratt OR director=James Gunn', in_memory_repo, page=0, page_size=5)
+
+    assert movie_ids == [1, 10, 39, 86, 385]
+    assert has_next_page is True
+
+    movie_ids, has_next_page = search_services.search_movies(
+        'actor=Chris Pratt OR director=James Gunn', in_memory_repo, page=1, page_size=5)
+
+    assert movie_ids == [407, 697, 909, 938]
+    assert has_next_page is False
+
+
+def test_search_movies_by_year_alone(in_memory_repo):
+    movie_ids, has_next_page = search_services.search_movies('year=2006', in_memory_repo, page_size=3)
+
+    assert movie_ids == [65, 79, 100]
+    assert has_next_page is True
+
+
+def test_search_movies_filters_and_sorts_by_numeric_attributes(in_memory_repo):
+    movie_ids, has_next_page = search_services.search_movies(
+        'genre=Sci-Fi AND year=2013-2016 AND rating=8+', in_memory_repo, sort='votes')
+
+    # Interstellar has the most votes of the top rated recent Sci-Fi movies.
+    assert movie_ids == [37, 1, 68, 103, 163, 174, 20]
+    assert has_next_page is False
+
+
+def test_search_movies_by_year_skips_movies_without_a_release_year(in_memory_repo):
+    movie = Movie('Undated', 1800)
+    movie.add_genre(Genre('Sci-Fi'))
+    in_memory_repo.add_movie(movie)
+    assert movie.release_year is None
+
+    # The year range matches more movies than the genre, so the genre's matches are checked for their release year.
+    movie_ids, has_next_page = search_services.search_movies('genre=Sci-Fi AND year=2006-2016', in_memory_repo, 0, 1000)
+    assert len(movie_ids) > 0
+    assert movie.id not in movie_ids
+
+
+def test_get_completions_matches_any_word_of_a_name(in_memory_repo):
+    completions = search_services.get_completions('pratt', in_memory_repo)
+
+    assert completions == [{'kind': 'actor', 'name': 'Chris Pratt', 'movie_id': None}]
+
+
+def test_get_completions_for_selected_kinds(in_memory_repo):
+    completions = search_services.get_completions('the ma', in_memory_repo, limit=2, kinds={'title'})
+
+    assert [completion['name'] for completion in completions] == ['The Magnificent Seven', "She's the Man"]
+    assert completions[0]['movie_id'] == 39
+
+
+def test_get_completions_include_names_added_after_loading(in_memory_repo):
+    movie = Movie('Zardoz', 1974)
+    movie.add_actor(Actor('Sean Connery'))
+    in_memory_repo.add_movie(movie)
+
+    completions = search_services.get_completions('z', in_memory_repo, kinds={'title'})
+    assert {'kind': 'title', 'name': 'Zardoz', 'movie_id': movie.id} in completions
+
+    completions = search_services.get_completions('conn', in_memory_repo)
+    assert {'kind': 'actor', 'name': 'Sean Connery', 'movie_id': None} in completions
+
+
+def test_search_movies_by_text_ranks_best_matches_first(in_memory_repo):
+    movie_ids, has_next_page = search_services.search_movies_by_text('galaxy', in_memory_repo)
+
+    # Guardians of the Galaxy has the word in its title, The Force Awakens only in its description.
+    assert movie_ids == [1, 51]
+    assert has_next_page is False
+
+
+def test_search_movies_by_text_pages_results(in_memory_repo):
+    first_page, has_next_page = search_services.search_movies_by_text('serial killer', in_memory_repo, page_size=3)
+    assert len(first_page) == 3
+    assert has_next_page is True
+
+    second_page, has_next_page = search_services.search_movies_by_text('serial killer', in_memory_repo, page=1,
+                                                                        page_size=3)
+    assert len(second_page) == 3
+    assert set(first_page).isdisjoint(second_page)
+
+
+def test_search_movies_by_text_includes_movies_added_after_loading(in_memory_repo):
+    movie = Movie('Zardoz', 1974)
+    movie.description = 'In the distant future, an Exterminator is let into the world of the Eternals.'
+    in_memory_repo.add_movie(movie)
+
+    movie_ids, has_next_page = search_services.search_movies_by_text('exterminator eternals', in_memory_repo)
+    assert movie_ids[0] == movie.id
+
+
+def test_text_index_refuses_to_index_a_movie_twice():
+    index = TextIndex()
+    index.add_document(1, 'Zardoz', 'An Exterminator is let into the world of the Eternals.')
+    index.add_document(2, '!!!', None)
+    scores = index.search('eternals')
+
+    with pytest.raises(ValueError):
+        index.add_document(1, 'Zardoz', 'An Exterminator is let into the world of the Eternals.')
+    with pytest.raises(ValueError):
+        index.add_document(2, '!!!', None)
+    assert index.number_of_documents == 2
+    assert index.search('eternals') == scores
+    assert 3 not in index
+
+    restored = TextIndex.restore(*index.export())
+    assert restored.search('eternals') == scores
+    assert 2 in restored
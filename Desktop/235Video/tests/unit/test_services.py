@@ -7,7 +7,7 @@ from movies.authentication.services import AuthenticationException
 from movies.showcase import services as showcase_services
 from movies.authentication import services as auth_services
 from movies.showcase.services import NonExistentMovieException
-from movies.domain.model import Movie, Genre, Director, Actor, Review, User
+from movies.domain.model import Movie, Genre, Director, Actor, Review, User, make_review
 
 
 def test_can_add_user(in_memory_repo):
@@ -197,3 +197,49 @@ def test_get_reviews_for_non_existent_movie(in_memory_repo):
 def test_get_reviews_for_movie_without_reviews(in_memory_repo):
     reviews_as_dict = showcase_services.get_reviews_for_movie(2, in_memory_repo)
     assert len(reviews_as_dict) == 0
+
+
+def test_movie_dicts_are_memoized_until_the_movie_gets_a_review(in_memory_repo):
+    in_memory_repo.add_user(User('thorke', 'cLQ^C#oFXloS'))
+    movie_as_dict = showcase_services.get_movie(1, in_memory_repo)
+    movie_as_dict['view_review_url'] = '/movies_by_ranking?id=1'
+
+    again = showcase_services.get_movie(1, in_memory_repo)
+    assert 'view_review_url' not in again
+    assert again['reviews'] is movie_as_dict['reviews']
+
+    showcase_services.add_review(1, 'Really good', 'thorke', in_memory_repo)
+    movie_as_dict = showcase_services.get_movie(1, in_memory_repo)
+    assert len(movie_as_dict['reviews']) == 1
+    assert [review['review_text'] for review in movie_as_dict['reviews'].page()] == ['Really good']
+
+
+def test_review_lists_are_read_a_page_at_a_time(in_memory_repo):
+    user = User('thorke', 'cLQ^C#oFXloS')
+    in_memory_repo.add_user(user)
+    movie = in_memory_repo.get_movie(1)
+    for i in range(25):
+        in_memory_repo.add_review(make_review(f'Review {i}', user, movie))
+
+    reviews = showcase_services.get_movie(1, in_memory_repo)['reviews']
+    assert len(reviews) == 25
+
+    page = reviews.page(after=reviews.page()[-1]['id'])
+    assert [review['review_text'] for review in page] == [f'Review {i}' for i in range(10, 20)]
+    assert reviews.has_before(page[0]['id']) and reviews.has_after(page[-1]['id'])
+
+    page = reviews.page(after=page[-1]['id'])
+    assert len(page) == 5 and not reviews.has_after(page[-1]['id'])
+    assert [review['review_text'] for review in reviews.page(before=page[0]['id'])] == \
+        [f'Review {i}' for i in range(10, 20)]
+
+
+def test_movie_dicts_are_memoized_up_to_a_limit(in_memory_repo, monkeypatch):
+    monkeypatch.setattr(showcase_services, 'MOVIE_DTO_CACHE_SIZE', 3)
+    showcase_services._movie_dtos.clear()
+
+    for movie_id in [1, 2, 3, 1, 4]:
+        showcase_services.get_movie(movie_id, in_memory_repo)
+
+    # Movie 2 was the least recently used.
+    assert list(showcase_services._movie_dtos) == [3, 1, 4]
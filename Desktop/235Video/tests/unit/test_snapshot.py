@@ -0,0 +1,75 @@
+import os
+import shutil
+
+import pytest
+
+from movies.adapters.memory_repository import MemoryRepository, populate, snapshot_filename
+from movies.adapters.snapshot import SnapshotException, read_snapshot
+from movies.domain.model import Actor, Movie
+
+from tests.conftest import TEST_DATA_PATH
+
+
+@pytest.fixture
+def data_path(tmpdir):
+    shutil.copy(os.path.join(TEST_DATA_PATH, 'Data1000Movies.csv'), tmpdir)
+    return str(tmpdir)
+
+
+def movie_fields(movie):
+    return movie.id, movie.title, movie.release_year, movie.description, movie.genres, movie.director, movie.actors
+
+
+def test_repository_loaded_from_snapshot_matches_repository_loaded_from_csv(in_memory_repo, data_path):
+    in_memory_repo.write_snapshot(snapshot_filename(data_path))
+
+    repo = MemoryRepository()
+    repo.load_snapshot(snapshot_filename(data_path))
+
+    assert [movie_fields(movie) for movie in repo.get_movies_by_id(range(1, 1001))] == \
+        [movie_fields(movie) for movie in in_memory_repo.get_movies_by_id(range(1, 1001))]
+    assert repo.get_actors() == in_memory_repo.get_actors()
+    assert repo.get_entity_version() == in_memory_repo.get_entity_version()
+    assert list(repo.get_movie_ids_for_actor('Chris Pratt')) == [1, 10, 39, 86, 385, 407, 697]
+    assert list(repo.get_movie_ids_for_release_year(2016)) == list(in_memory_repo.get_movie_ids_for_release_year(2016))
+    assert repo.search_movie_ids_by_text('galaxy') == in_memory_repo.search_movie_ids_by_text('galaxy')
+    assert repo.get_name_completions('pra') == in_memory_repo.get_name_completions('pra')
+
+
+def test_repository_loaded_from_snapshot_accepts_new_movies(data_path):
+    repo = MemoryRepository()
+    populate(data_path, repo)
+    repo.write_snapshot(snapshot_filename(data_path))
+
+    repo = MemoryRepository()
+    repo.load_snapshot(snapshot_filename(data_path))
+    movie = Movie('Guardians of the Galaxy Vol. 2', 2017)
+    movie.add_actor(Actor('Chris Pratt'))
+    repo.add_movie(movie)
+
+    assert repo.get_movie(1001) is movie
+    assert list(repo.get_movie_ids_for_actor('Chris Pratt'))[-1] == 1001
+    assert 1001 in [movie_id for movie_id, score in repo.search_movie_ids_by_text('guardians')]
+
+
+def test_populate_only_uses_a_snapshot_newer_than_the_csv_file(data_path):
+    repo = MemoryRepository()
+    populate(data_path, repo)
+    repo.get_movie(1).title = 'Changed'
+    repo.write_snapshot(snapshot_filename(data_path))
+
+    csv_modified = os.path.getmtime(os.path.join(data_path, 'Data1000Movies.csv'))
+    os.utime(snapshot_filename(data_path), (csv_modified + 10, csv_modified + 10))
+    repo = MemoryRepository()
+    populate(data_path, repo)
+    assert repo.get_movie(1).title == 'Changed'
+
+    os.utime(snapshot_filename(data_path), (csv_modified - 10, csv_modified - 10))
+    repo = MemoryRepository()
+    populate(data_path, repo)
+    assert repo.get_movie(1).title == 'Guardians of the Galaxy'
+
+
+def test_reading_a_file_that_is_not_a_snapshot_raises_exception(data_path):
+    with pytest.raises(SnapshotException):
+        read_snapshot(os.path.join(data_path, 'Data1000Movies.csv'))
@@ -0,0 +1,212 @@
+import os
+import threading
+
+import pytest
+
+from movies.adapters import sqlite_repository
+from movies.adapters.rank_index import ORDERINGS
+from movies.adapters.repository import RepositoryException
+from movies.adapters.sqlite_repository import SqliteRepository
+from movies.domain.model import Movie, User
+from movies.showcase import services as showcase_services
+from movies.showcase.services import make_review
+
+from tests.conftest import TEST_DATA_PATH
+
+ALL_IDS = list(range(1, 1001))
+
+
+@pytest.fixture
+def database(tmpdir):
+    return os.path.join(str(tmpdir), 'movies.sqlite3')
+
+
+@pytest.fixture
+def sqlite_repo(database):
+    repo = SqliteRepository(database)
+    sqlite_repository.populate(TEST_DATA_PATH, repo)
+    yield repo
+    repo.close()
+
+
+def movie_fields(movie):
+    return movie.id, movie.title, movie.release_year, movie.description, movie.genres, movie.director, movie.actors, \
+        movie.runtime_minutes, movie.rating, movie.votes, movie.revenue_millions, movie.metascore
+
+
+def add_review(repo, movie_id, user_name, text):
+    review = make_review(text, repo.get_user(user_name), repo.get_movie(movie_id))
+    repo.add_review(review)
+    return review
+
+
+def test_sqlite_repository_holds_the_same_catalog_as_memory_repository(in_memory_repo, sqlite_repo):
+    assert [movie_fields(movie) for movie in sqlite_repo.get_movies_by_id(ALL_IDS)] == \
+        [movie_fields(movie) for movie in in_memory_repo.get_movies_by_id(ALL_IDS)]
+    assert sqlite_repo.get_number_of_movies() == 1000
+    assert sqlite_repo.get_actors() == in_memory_repo.get_actors()
+    assert sqlite_repo.get_directors() == in_memory_repo.get_directors()
+    assert sqlite_repo.get_genres() == in_memory_repo.get_genres()
+    assert sqlite_repo.get_entity_version() == in_memory_repo.get_entity_version()
+    assert sqlite_repo.get_catalog_version() == in_memory_repo.get_catalog_version()
+
+
+def test_sqlite_repository_answers_lookups_as_memory_repository_does(in_memory_repo, sqlite_repo):
+    assert list(sqlite_repo.get_movie_ids_for_actor(' chris PRATT')) == [1, 10, 39, 86, 385, 407, 697]
+    for genre in in_memory_repo.get_genres():
+        assert list(sqlite_repo.get_movie_ids_for_genre(genre.genre_name)) == \
+            list(in_memory_repo.get_movie_ids_for_genre(genre.genre_name))
+    assert list(sqlite_repo.get_movie_ids_for_director('Ridley Scott')) == \
+        list(in_memory_repo.get_movie_ids_for_director('Ridley Scott'))
+    assert list(sqlite_repo.get_movie_ids_for_release_year(2016)) == \
+        list(in_memory_repo.get_movie_ids_for_release_year(2016))
+    assert list(sqlite_repo.get_movie_ids_for_actor('Nobody')) == []
+
+    movie_ids = ALL_IDS[::-1] + [5000]
+    for attribute in ['runtime_minutes', 'rating', 'votes', 'revenue_millions', 'metascore']:
+        for descending in [True, False]:
+            assert sqlite_repo.sort_movie_ids(movie_ids, attribute, descending) == \
+                in_memory_repo.sort_movie_ids(movie_ids, attribute, descending)
+        assert list(sqlite_repo.filter_movie_ids(movie_ids, attribute, 50, None)) == \
+            list(in_memory_repo.filter_movie_ids(movie_ids, attribute, 50, None))
+        assert list(sqlite_repo.filter_movie_ids(movie_ids, attribute, 5, 100)) == \
+            list(in_memory_repo.filter_movie_ids(movie_ids, attribute, 5, 100))
+
+    for prefix in ['pra', 'the', 'a', 'chris p', 'zzz']:
+        assert sqlite_repo.get_name_completions(prefix, 20) == in_memory_repo.get_name_completions(prefix, 20)
+        assert sqlite_repo.get_name_completions(prefix, 5, ['actor', 'genre']) == \
+            in_memory_repo.get_name_completions(prefix, 5, ['actor', 'genre'])
+    for query in ['galaxy', 'the dark knight', 'love and war', 'xyzzy']:
+        assert sqlite_repo.search_movie_ids_by_text(query, 20) == in_memory_repo.search_movie_ids_by_text(query, 20)
+
+
+def test_sqlite_repository_navigates_between_movies(sqlite_repo):
+    movie = sqlite_repo.get_movie(5)
+    assert sqlite_repo.get_id_of_previous_movie(movie) == 4
+    assert sqlite_repo.get_id_of_next_movie(movie) == 6
+    assert sqlite_repo.get_first_movie().id == 1
+    assert sqlite_repo.get_last_movie().id == 1000
+    assert sqlite_repo.get_id_of_previous_movie(sqlite_repo.get_first_movie()) is None
+    assert sqlite_repo.get_id_of_next_movie(sqlite_repo.get_last_movie()) is None
+    assert sqlite_repo.get_movie(1001) is None
+    assert [movie.title for movie in sqlite_repo.get_movies_by_release_year(2006)][:2] == \
+        ['300', 'A Good Year']
+
+
+def test_sqlite_repository_adds_movies(sqlite_repo):
+    movie = Movie('Brand New', 2020)
+    sqlite_repo.add_movie(movie)
+
+    assert movie.id == 1001
+    assert sqlite_repo.get_movie(1001).title == 'Brand New'
+    assert sqlite_repo.get_catalog_version() == 1001
+    assert sqlite_repo.get_name_completions('bran', kinds=['title']) == [('title', 'Brand New', 1001)]
+    with pytest.raises(RepositoryException):
+        sqlite_repo.add_movie(movie)
+
+
+def test_sqlite_repository_stores_users_and_pages_reviews(sqlite_repo):
+    sqlite_repo.add_user(User('Dave', 'hash1'))
+    sqlite_repo.add_user(User('thorke', 'hash2'))
+    reviews = [add_review(sqlite_repo, 3, ['dave', 'thorke'][i % 2], f'Review {i}') for i in range(6)]
+
+    assert [review.id for review in reviews] == [1, 2, 3, 4, 5, 6]
+    assert sqlite_repo.get_review_version() == 6
+    assert sqlite_repo.count_reviews_for_movie(3) == 6
+    assert sqlite_repo.count_reviews_for_user('DAVE') == 3
+
+    def texts(page):
+        return [review.review_text for review in page]
+
+    assert texts(sqlite_repo.get_reviews_for_movie(3, limit=2)) == ['Review 0', 'Review 1']
+    assert texts(sqlite_repo.get_reviews_for_movie(3, limit=2, after=2)) == ['Review 2', 'Review 3']
+    assert texts(sqlite_repo.get_reviews_for_movie(3, limit=2, before=5)) == ['Review 2', 'Review 3']
+    assert texts(sqlite_repo.get_reviews_for_movie(3, after=2, before=5)) == ['Review 2', 'Review 3']
+    assert texts(sqlite_repo.get_reviews_for_movie(3, limit=2, after=99)) == ['Review 0', 'Review 1']
+    assert texts(sqlite_repo.get_reviews_for_user('dave', limit=5, after=1)) == ['Review 2', 'Review 4']
+
+    review = sqlite_repo.get_review(2)
+    assert review.timestamp == reviews[1].timestamp
+    assert review.user.user_name == 'thorke'
+    assert review.movie.title == sqlite_repo.get_movie(3).title
+    assert sqlite_repo.get_review(7) is None
+
+    user = sqlite_repo.get_user(' dave ')
+    user.password = 'hash3'
+    sqlite_repo.update_user(user)
+    assert sqlite_repo.get_user('dave').password == 'hash3'
+
+
+def test_sqlite_repository_persists_and_serves_several_threads(sqlite_repo, database):
+    sqlite_repo.add_user(User('dave', 'hash'))
+    add_review(sqlite_repo, 1, 'dave', 'Stored')
+
+    reopened = SqliteRepository(database)
+    assert sqlite_repository.populate(TEST_DATA_PATH, reopened).seconds == 0.0
+    assert reopened.get_number_of_movies() == 1000
+    assert [review.review_text for review in reopened.get_reviews()] == ['Stored']
+
+    titles = list()
+
+    def read():
+        titles.append([movie.title for movie in reopened.get_movies_by_id(range(1, 51))])
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(titles) == 4 and all(titles_read == titles[0] for titles_read in titles)
+    reopened.close()
+
+
+def test_sqlite_repository_adds_batches_of_movies_and_reviews(sqlite_repo):
+    sqlite_repo.add_movies(Movie(title, 2020) for title in ['Zeta', 'Alpha'])
+    assert [movie.title for movie in sqlite_repo.get_movies_by_id(iter([1002, 5000, 1001]))] == ['Alpha', 'Zeta']
+
+    sqlite_repo.add_user(User('dave', 'hash'))
+    user = sqlite_repo.get_user('dave')
+    reviews = [make_review(f'Review {i}', user, sqlite_repo.get_movie(i % 2 + 1)) for i in range(5)]
+    sqlite_repo.add_reviews(iter(reviews))
+
+    assert [review.id for review in reviews] == [1, 2, 3, 4, 5]
+    assert [review.review_text for review in sqlite_repo.get_reviews_for_movie(1)] == \
+        ['Review 0', 'Review 2', 'Review 4']
+    assert sqlite_repo.count_reviews_for_user('dave') == 5
+
+
+def test_sqlite_repository_ranks_the_catalog_as_memory_repository_does(in_memory_repo, sqlite_repo):
+    for ordering in ORDERINGS:
+        assert list(sqlite_repo.get_rank_index(ordering)) == list(in_memory_repo.get_rank_index(ordering))
+
+    by_rank = sqlite_repo.get_rank_index()
+    assert sqlite_repo.get_rank_index() is by_rank
+    sqlite_repo.add_movie(Movie('Brand New', 2020))
+    assert sqlite_repo.get_rank_index() is not by_rank
+    assert sqlite_repo.get_last_movie().title == 'Brand New'
+
+
+def test_sqlite_repository_lists_ranges_of_years_as_memory_repository_does(in_memory_repo, sqlite_repo):
+    for start, end in [(None, None), (2006, 2006), (2010, 2019), (2015, None), (2020, 2029)]:
+        assert sqlite_repo.count_movies_by_year_range(start, end) == \
+            in_memory_repo.count_movies_by_year_range(start, end)
+        assert [movie.id for movie in sqlite_repo.get_movies_by_year_range(start, end, 10, 5)] == \
+            [movie.id for movie in in_memory_repo.get_movies_by_year_range(start, end, 10, 5)]
+    assert [movie.title for movie in sqlite_repo.get_movies_by_release_year(2012)] == \
+        [movie.title for movie in in_memory_repo.get_movies_by_release_year(2012)]
+
+
+def test_movie_dicts_are_memoized_for_the_sqlite_repository(sqlite_repo):
+    movie_dict = showcase_services.get_movie(3, sqlite_repo)
+    entry = showcase_services._movie_dtos[3]
+    assert showcase_services.get_movie(3, sqlite_repo) == movie_dict
+    assert showcase_services._movie_dtos[3] is entry
+
+    # A new review, or a new movie in the catalog, makes the dict again.
+    sqlite_repo.add_user(User('thorke', 'hash'))
+    add_review(sqlite_repo, 3, 'thorke', 'Review')
+    assert len(showcase_services.get_movie(3, sqlite_repo)['reviews']) == 1
+    entry = showcase_services._movie_dtos[3]
+    sqlite_repo.add_movie(Movie('Brand New', 2020))
+    showcase_services.get_movie(3, sqlite_repo)
+    assert showcase_services._movie_dtos[3] is not entry
@@ -0,0 +1,242 @@
+import random
+
+import movies.adapters.repository as repo
+import movies.utilities.services as services
+import movies.utilities.utilities as utilities
+from movies.domain.model import Movie, Actor, User, make_review
+from movies.utilities.fragment_cache import FragmentCache
+from movies.utilities.sampler import AliasSampler
+
+
+def test_url_maps_are_reused_between_requests(client):
+    with client:
+        client.get('/')
+        actor_urls = utilities.get_actors_and_urls()
+
+        client.get('/')
+        assert utilities.get_actors_and_urls() is actor_urls
+        assert actor_urls['Chris Pratt'] == '/movies_by_actor?actor=Chris+Pratt'
+
+
+def test_url_maps_are_rebuilt_when_entities_change(client):
+    with client:
+        client.get('/')
+        actor_urls = utilities.get_actors_and_urls()
+
+        movie = Movie('Bill and Ted Face the Music', 2020)
+        movie.add_actor(Actor('Keanu Reeves'))
+        movie.add_actor(Actor('Alex Winter'))
+        repo.repo_instance.add_movie(movie)
+
+        client.get('/')
+        assert utilities.get_actors_and_urls() is not actor_urls
+        assert 'Alex Winter' in utilities.get_actors_and_urls()
+
+
+def test_alias_sampler_draws_in_proportion_to_weights():
+    sampler = AliasSampler([0, 1, 3])
+    rng = random.Random(235)
+
+    draws = [sampler.draw(rng) for _ in range(10000)]
+    assert draws.count(0) == 0
+    assert 2.7 < draws.count(2) / draws.count(1) < 3.3
+
+
+def test_alias_sampler_samples_distinct_indexes_including_the_last():
+    sampler = AliasSampler([1, 1, 1, 1])
+
+    assert sorted(sampler.sample(4)) == [0, 1, 2, 3]
+    assert sorted(AliasSampler([0, 0, 5]).sample(3)) == [2]
+
+
+def test_popularity_sampler_covers_movies_whatever_their_ids(in_memory_repo):
+    movie = Movie('Zardoz', 1974)
+    movie.add_id(5000)
+    movie.rating, movie.votes = 9.9, 10 ** 9
+    in_memory_repo.add_movie(movie)
+
+    sampler, movie_ids = services.build_popularity_sampler(in_memory_repo)
+    assert len(movie_ids) == in_memory_repo.get_number_of_movies()
+    assert 5000 in movie_ids
+    assert 5000 in [movie['id'] for movie in services.get_popular_movies(10, sampler, movie_ids, in_memory_repo)]
+
+
+def test_hot_list_is_reused_between_requests(client):
+    with client:
+        client.get('/')
+        hot_list = utilities.get_hot_list()
+
+        client.get('/')
+        assert utilities.get_hot_list() is hot_list
+        assert len(utilities.get_selected_movies(3)) == 3
+        assert len({movie['id'] for movie in hot_list}) == utilities.HOT_LIST_SIZE
+
+
+def test_hot_list_is_rebuilt_when_the_catalog_changes(client):
+    with client:
+        client.get('/')
+        hot_list = utilities.get_hot_list()
+
+        movie = Movie('Bill and Ted Face the Music', 2020)
+        movie.rating = 9.9
+        movie.votes = 4 * 10 ** 9
+        repo.repo_instance.add_movie(movie)
+
+        client.get('/')
+        assert utilities.get_hot_list() is not hot_list
+        assert movie.id in [movie['id'] for movie in utilities.get_hot_list()]
+
+
+def test_fragment_cache_evicts_least_recently_used_fragments_to_stay_within_its_size():
+    cache = FragmentCache(max_bytes=10)
+    cache.get(('movie', 1), 0, lambda: 'aaaa')
+    cache.get(('movie', 2), 0, lambda: 'bbbb')
+    cache.get(('movie', 1), 0, lambda: 'not rendered')
+    cache.get(('movie', 3), 0, lambda: 'cccc')
+
+    assert cache.get(('movie', 1), 0, lambda: 'not rendered') == 'aaaa'
+    assert cache.get(('movie', 2), 0, lambda: 'BBBB') == 'BBBB'
+    assert cache.size <= 10
+    assert cache.stats()['evictions'] == 2
+    assert cache.stats()['bytes_saved'] == 8
+
+
+def test_fragment_cache_renders_again_for_a_new_version_or_after_discard():
+    cache = FragmentCache(max_bytes=1000)
+    cache.get(('movie', 1, 'url'), 0, lambda: 'old')
+    cache.get(('movie', 2, 'url'), 0, lambda: 'other')
+
+    assert cache.get(('movie', 1, 'url'), 1, lambda: 'new') == 'new'
+    cache.discard('movie', 1)
+    assert cache.get(('movie', 1, 'url'), 1, lambda: 'newer') == 'newer'
+    assert cache.get(('movie', 2, 'url'), 0, lambda: 'not rendered') == 'other'
+    assert cache.stats()['hits'] == 1
+
+
+def test_movie_cards_are_served_from_the_fragment_cache(client):
+    with client:
+        first = client.get('/movies_by_ranking?id=1')
+        hits = utilities.get_fragment_cache().stats()['hits']
+
+        # A different URL, so the page isn't cached, but with the same card for movie 1.
+        second = client.get('/movies_by_ranking?id=1&view_reviews_for=2')
+        assert second.data == first.data
+        assert utilities.get_fragment_cache().stats()['hits'] > hits
+        assert b'href="/movies_by_genre?genre=Action"' in second.data
+
+
+def test_cache_statistics_are_only_served_when_testing_or_debugging(client):
+    assert set(client.get('/fragment_cache').json) == {'fragments', 'pages'}
+
+    client.application.testing = False
+    client.application.debug = False
+    assert client.get('/fragment_cache').status_code == 404
+    client.application.debug = True
+    assert client.get('/fragment_cache').status_code == 200
+
+
+def test_movie_cards_are_rendered_again_after_a_review(client):
+    with client:
+        client.get('/movies_by_ranking?id=1')
+
+        movie = repo.repo_instance.get_movie(1)
+        user = User('thorke', 'cLQ^C#oFXloS')
+        repo.repo_instance.add_user(user)
+        repo.repo_instance.add_review(make_review('Really good', user, movie))
+        utilities.discard_movie_fragments(1)
+
+        assert b'1 reviews' in client.get('/movies_by_ranking?id=1').data
+
+
+def test_showcase_pages_answer_conditional_gets_until_a_review_is_added(client):
+    with client:
+        response = client.get('/movies_by_actor?actor=Chris+Pratt')
+        etag = response.headers['ETag']
+        last_modified = response.headers['Last-Modified']
+
+        response = client.get('/movies_by_actor?actor=Chris+Pratt', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+        # Browsers revalidate with both validators, or just the date.
+        response = client.get('/movies_by_actor?actor=Chris+Pratt',
+                              headers={'If-None-Match': etag, 'If-Modified-Since': last_modified})
+        assert response.status_code == 304
+        response = client.get('/movies_by_actor?actor=Chris+Pratt', headers={'If-Modified-Since': last_modified})
+        assert response.status_code == 304
+        response = client.get('/movies_by_actor?actor=Chris+Pratt',
+                              headers={'If-Modified-Since': 'Sat, 01 Jan 2000 00:00:00 GMT'})
+        assert response.status_code == 200
+        assert 'Cookie' in response.vary
+        assert not response.cache_control.private
+
+        with client.session_transaction() as session:
+            session['username'] = 'thorke'
+        response = client.get('/movies_by_actor?actor=Chris+Pratt')
+        assert response.cache_control.private
+        assert response.headers['ETag'] != etag
+        with client.session_transaction() as session:
+            session.clear()
+
+        user = User('thorke', 'cLQ^C#oFXloS')
+        repo.repo_instance.add_user(user)
+        repo.repo_instance.add_review(make_review('Really good', user, repo.repo_instance.get_movie(1)))
+
+        response = client.get('/movies_by_actor?actor=Chris+Pratt', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert b'1 reviews' in response.data
+
+
+def test_showcase_pages_are_served_from_the_page_cache(client):
+    with client:
+        first = client.get('/movies_by_director?director=James+Gunn')
+        hits = utilities.get_page_cache().stats()['hits']
+
+        assert client.get('/movies_by_director?director=James+Gunn').data == first.data
+        assert utilities.get_page_cache().stats()['hits'] == hits + 1
+
+
+def test_ranking_pages_list_the_catalog_in_any_order(client):
+    with client:
+        response = client.get('/movies_by_ranking?page=2&per_page=3')
+        assert b'Ranks #4-6' in response.data
+        assert b'href="/movies_by_genre?genre=Action"' in response.data
+        assert b'/movies_by_ranking?page=3&amp;per_page=3' in response.data
+        assert b'/movies_by_ranking?page=334&amp;per_page=3' in response.data
+
+        # The id query parameter opens the page with the movie on it, in whichever order.
+        top_rated_id = repo.repo_instance.get_rank_index('rating').first()
+        response = client.get(f'/movies_by_ranking?order=rating&id={top_rated_id}')
+        assert b'Rank #1 by rating' in response.data
+        assert repo.repo_instance.get_movie(top_rated_id).title.encode() in response.data
+
+        assert client.get('/movies_by_ranking?id=5000').status_code == 302
+
+
+def test_year_and_decade_pages_list_movies_released_then(client):
+    with client:
+        response = client.get('/movies_by_year?year=2016&cursor=3')
+        assert b'Movies from 2016' in response.data
+        assert b'/movies_by_year?cursor=6&amp;year=2016' in response.data
+        assert b'<a href="/movies_by_year?year=2016">2016</a>' in response.data
+
+        response = client.get('/movies_by_year?decade=2014')
+        assert b'Movies from the 2010s' in response.data
+        assert b'/movies_by_year?cursor=3&amp;decade=2010' in response.data
+
+        assert client.get('/movies_by_year').status_code == 302
+
+
+def test_showcase_answers_costar_and_separation_queries(client):
+    response = client.get('/costars?actor=chris+pratt&limit=3')
+    assert response.json['actor'] == 'Chris Pratt'
+    assert response.json['url'] == '/movies_by_actor?actor=Chris+Pratt'
+    assert len(response.json['costars']) == 3
+
+    response = client.get('/separation?from=Chris+Pratt&to=Zoe+Saldana')
+    assert response.json['degrees'] == 1
+    assert [link['actor'] for link in response.json['path']] == ['Chris Pratt', 'Zoe Saldana']
+
+    assert client.get('/costars?actor=Nobody').status_code == 404
+    assert client.get('/separation?from=Chris+Pratt&to=Nobody').status_code == 404